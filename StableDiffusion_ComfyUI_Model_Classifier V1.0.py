@@ -3,18 +3,23 @@ import os
 import json
 import shutil
 import hashlib
+import struct
+import pickletools
+import zipfile
 import platform
 import pandas as pd
 import subprocess
 import openpyxl
-import gc
-import win32con
-import win32file
+import sqlite3
+import threading
+import uuid
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from PySide6.QtWidgets import (QApplication,QMainWindow,QFileDialog,QVBoxLayout,QWidget,QPushButton,QLabel,QTableWidget,QTableWidgetItem,QHBoxLayout,QLineEdit,QSplitter,QMessageBox,QMenu,QHeaderView,QInputDialog,QAbstractItemView,QSizePolicy,QCompleter,QTextEdit,QDialog,QDialogButtonBox,QProgressDialog)
-from PySide6.QtCore import (Qt,QPoint,QSize,QThread,Signal,QStringListModel,QObject,QBuffer,QByteArray,QIODevice,QTimer)
-from PySide6.QtGui import (QPixmap,QMouseEvent,QImageReader,QDragEnterEvent,QDropEvent,QColor,QTextCursor,QMovie)
+import queue
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from PySide6.QtWidgets import (QApplication,QMainWindow,QFileDialog,QVBoxLayout,QWidget,QPushButton,QLabel,QTableWidget,QTableWidgetItem,QHBoxLayout,QTableView,QLineEdit,QSplitter,QMessageBox,QMenu,QHeaderView,QInputDialog,QAbstractItemView,QSizePolicy,QCompleter,QTextEdit,QDialog,QDialogButtonBox,QProgressDialog)
+from PySide6.QtCore import (Qt,QPoint,QThread,Signal,QStringListModel,QObject,QBuffer,QIODevice,QTimer,QAbstractTableModel,QModelIndex,QSortFilterProxyModel,QRunnable,QThreadPool)
+from PySide6.QtGui import (QPixmap,QImage,QMouseEvent,QImageReader,QDragEnterEvent,QDropEvent,QColor,QTextCursor)
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -31,6 +36,7 @@ CATEGORY_DIR = {
     'LoRA': 'LoRA',
     'TextualInversion': 'TextualInversion',
     'VAE': 'VAE',
+    'ControlNet': 'ControlNet',
     'GGUF': 'GGUF',
     'Unknown': 'Unknown'
 }
@@ -54,28 +60,911 @@ DYNAMIC_IMAGE_EXTS = EXTS["dynamic_img"]
 
 IMAGE_LABEL_STYLE = "background: transparent; border: 2px solid black;"
 
+# 模型目录索引文件（放在模型根目录下），用于增量扫描
+CATALOG_FILENAME = ".model_catalog.sqlite3"
+# 缩略图磁盘缓存（放在模型根目录下）及其容量上限
+THUMBNAIL_CACHE_FILENAME = ".model_thumbnails.sqlite3"
+THUMBNAIL_DISK_BUDGET = 64 * 1024 * 1024
+# 动图缩放帧序列存在同一数据库的单独表中、单独计算容量，大动图不会挤掉表格缩略图
+GIF_FRAMES_DISK_BUDGET = 128 * 1024 * 1024
+# 缓存命中时的最近使用时间先记在内存中，攒够这么多条（或淘汰、关闭时）才一次性写回数据库
+THUMBNAIL_TOUCH_BATCH = 256
+
+# 并行扫描：线程数（网络盘上 stat 很慢，多线程可以重叠等待）和每批返回的模型数
+SCAN_MAX_WORKERS = 8
+SCAN_BATCH_SIZE = 200
+
+# 表格缩略图：边长、后台解码线程数、可视区域上下额外预取的行数、内存缓存的字节上限
+THUMBNAIL_SIZE = 64
+THUMBNAIL_WORKERS = 4
+THUMBNAIL_PREFETCH_ROWS = 20
+THUMBNAIL_MEMORY_BUDGET = 32 * 1024 * 1024
+
+# 搜索框输入防抖（毫秒）
+SEARCH_DEBOUNCE_MS = 150
+
+# 动态预览：帧缩放到的最大边长，以及单个动图解码后帧占用的内存上限（超出部分不再解码，只循环已解码的帧）
+GIF_PREVIEW_SIZE = 240
+GIF_FRAME_BUDGET = 64 * 1024 * 1024
+# 最近查看过的动图缩放帧缓存（内存，按最近使用淘汰）；模型目录打开时同时写入缩略图缓存数据库的 gif_frames 表
+GIF_CACHE_MEMORY_BUDGET = 128 * 1024 * 1024
+
+# 选中一行后，后台预取前后各若干可见行的预览图、图片信息和备注；最多缓存的模型数
+PREVIEW_PREFETCH_ROWS = 3
+PREVIEW_PREFETCH_WORKERS = 2
+PREVIEW_CACHE_ENTRIES = 24
+
+# 备注 JSON 自动保存：停止输入多久后写盘（毫秒）
+JSON_SAVE_DEBOUNCE_MS = 800
+
+# 文件操作引擎：跨设备复制时每次读写的块大小；删除时先改名到同目录下的回收目录，全部成功后再真正删除
+FILE_COPY_CHUNK_SIZE = 4 * 1024 * 1024
+FILE_TRASH_DIRNAME = ".sd_model_trash"
+# 跨设备移动时先把整组文件复制到目标目录下的暂存目录，全部复制完成后再改名提交
+FILE_STAGING_DIRNAME = ".sd_model_staging"
+# 文件操作引擎：非原子任务按 (源设备, 目标设备) 分组调度——同设备改名在线程池中并行执行，
+# 跨设备复制时每对设备同时复制的模型数（机械硬盘建议设为 1）
+FILE_OP_MAX_WORKERS = 8
+FILE_COPY_DEVICE_WORKERS = 1
+
+# 批量 SHA256：总线程数（hashlib 计算时释放 GIL）和每个磁盘设备上同时读取的文件数（机械硬盘建议设为 1）
+SHA256_MAX_WORKERS = min(8, os.cpu_count() or 4)
+SHA256_DEVICE_WORKERS = 2
+# SHA256 每次读取的块大小（每个线程复用同一块缓冲区）
+SHA256_CHUNK_SIZE = 4 * 1024 * 1024
+# 查重抽样：文件头、中、尾各读取的字节数
+DUPLICATE_SAMPLE_SIZE = 64 * 1024
+
+# 按文件头识别模型时允许读取的最大头部长度（safetensors 规范上限为 100MB）
+MODEL_HEADER_LIMIT = 100 * 1024 * 1024
+# 索引结构/识别规则版本，升级后旧索引中的类型、版本会被重新识别
+CATALOG_SCHEMA_VERSION = 4
+
 def win_path(path):
     """返回绝对路径并统一为反斜杠"""
     return os.path.normpath(os.path.abspath(path)).replace("/", "\\")
 
+def is_valid_sha256(value):
+    return len(value) == 64 and all(c in "0123456789abcdefABCDEF" for c in value)
+
+_sha256_buffers = threading.local()
+
+def sha256_file(filepath, is_cancelled=None, on_bytes=None):
+    """计算文件 SHA256：用 readinto 读入每线程复用的大缓冲区，不为每块数据分配新对象。
+    is_cancelled() 返回 True 时中止并返回空字符串；on_bytes(n) 用于汇报读取进度。读取失败时抛出异常"""
+    view = getattr(_sha256_buffers, "view", None)
+    if view is None:
+        view = _sha256_buffers.view = memoryview(bytearray(SHA256_CHUNK_SIZE))
+    h = hashlib.sha256()
+    with open(filepath, 'rb', buffering=0) as f:
+        while True:
+            if is_cancelled and is_cancelled():
+                return ""
+            n = f.readinto(view)
+            if not n:
+                break
+            h.update(view[:n])
+            if on_bytes:
+                on_bytes(n)
+    return h.hexdigest()
+
+def partial_sha256(filepath, size, sample_size=DUPLICATE_SAMPLE_SIZE):
+    """对文件头、中、尾各取一段做哈希，用于在完整哈希之前快速排除内容不同的文件"""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        if size <= sample_size * 3:
+            h.update(f.read())
+        else:
+            for offset in (0, (size - sample_size) // 2, size - sample_size):
+                f.seek(offset)
+                h.update(f.read(sample_size))
+    return h.hexdigest()
+
+def benchmark_sha256(filepath, rounds=3):
+    """对比旧的 8KB 读取循环与 sha256_file 的吞吐量（GB/s），取多轮中的最好成绩"""
+    import time
+    def legacy(path):
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(8192), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    size = os.path.getsize(filepath)
+    results = {}
+    for name, func in (("8KB read()", legacy), ("sha256_file", sha256_file)):
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            digest = func(filepath)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (digest, size / best / 1e9 if best else 0.0)
+    for name, (digest, speed) in results.items():
+        print(f"{name:12s} {speed:6.2f} GB/s  {digest}")
+    return results
+
+def read_safetensors_header(filepath):
+    """只读取 safetensors 文件头（8 字节小端长度 + JSON），返回 ({张量名: 形状}, __metadata__)，不加载任何张量数据"""
+    with open(filepath, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError("文件过短")
+        length = int.from_bytes(prefix, 'little')
+        if not 2 <= length <= MODEL_HEADER_LIMIT:
+            raise ValueError(f"文件头长度异常: {length}")
+        header = json.loads(f.read(length))
+    metadata = header.pop("__metadata__", None) or {}
+    tensors = {name: tuple(info.get("shape", ())) for name, info in header.items() if isinstance(info, dict)}
+    return tensors, metadata
+
+# GGUF 元数据值类型 -> struct 格式；8 为字符串，9 为数组
+GGUF_SCALAR_FORMATS = {0: '<B', 1: '<b', 2: '<H', 3: '<h', 4: '<I', 5: '<i', 6: '<f', 7: '<?', 10: '<Q', 11: '<q', 12: '<d'}
+# ggml 张量类型编号 -> 量化名称
+GGML_TYPE_NAMES = {
+    0: 'F32', 1: 'F16', 2: 'Q4_0', 3: 'Q4_1', 6: 'Q5_0', 7: 'Q5_1', 8: 'Q8_0', 9: 'Q8_1',
+    10: 'Q2_K', 11: 'Q3_K', 12: 'Q4_K', 13: 'Q5_K', 14: 'Q6_K', 15: 'Q8_K',
+    16: 'IQ2_XXS', 17: 'IQ2_XS', 18: 'IQ3_XXS', 19: 'IQ1_S', 20: 'IQ4_NL', 21: 'IQ3_S', 22: 'IQ2_S', 23: 'IQ4_XS',
+    24: 'I8', 25: 'I16', 26: 'I32', 27: 'I64', 28: 'F64', 29: 'IQ1_M', 30: 'BF16', 34: 'TQ1_0', 35: 'TQ2_0',
+}
+# general.architecture -> 版本列显示的名称
+GGUF_ARCH_VERSION = {'sd1': 'SD1.5', 'sd2': 'SD2.0', 'sdxl': 'SDXL', 'sd3': 'SD3', 'flux': 'FLUX'}
+
+class _GGUFReader:
+    """顺序读取 GGUF 头部字段；字符串和数组长度受 MODEL_HEADER_LIMIT 约束，防止损坏文件导致超大读取"""
+    def __init__(self, f):
+        self.f = f
+        self.version = 3
+
+    def unpack(self, fmt):
+        size = struct.calcsize(fmt)
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ValueError("GGUF 文件头不完整")
+        return struct.unpack(fmt, data)[0]
+
+    def count(self):
+        # GGUF v1 的长度/数量字段为 32 位，v2 起为 64 位
+        return self.unpack('<I' if self.version == 1 else '<Q')
+
+    def string(self, keep=True):
+        length = self.count()
+        if length > MODEL_HEADER_LIMIT:
+            raise ValueError(f"GGUF 字符串长度异常: {length}")
+        if not keep:
+            self.f.seek(length, os.SEEK_CUR)
+            return None
+        return self.f.read(length).decode('utf-8', errors='replace')
+
+    def value(self, value_type, keep=True):
+        """读取一个元数据值；数组只保留元素个数，元素以 keep=False 逐个跳过（字符串直接 seek，不读取不解码）"""
+        if value_type == 8:
+            return self.string(keep)
+        if value_type == 9:
+            item_type = self.unpack('<I')
+            length = self.count()
+            if length > MODEL_HEADER_LIMIT:
+                raise ValueError(f"GGUF 数组长度异常: {length}")
+            if item_type in GGUF_SCALAR_FORMATS:
+                self.f.seek(struct.calcsize(GGUF_SCALAR_FORMATS[item_type]) * length, os.SEEK_CUR)
+            else:
+                for _ in range(length):
+                    self.value(item_type, keep=False)
+            return length
+        fmt = GGUF_SCALAR_FORMATS.get(value_type)
+        if fmt is None:
+            raise ValueError(f"未知的 GGUF 值类型: {value_type}")
+        return self.unpack(fmt)
+
+def read_gguf_header(filepath):
+    """只读取 GGUF 文件的元数据和张量信息区（不读取张量数据），返回 (元数据, {张量名: (形状, ggml 类型)})。
+    形状按 PyTorch 顺序返回（GGUF 中维度是从内到外存放的）"""
+    with open(filepath, 'rb', buffering=1024 * 1024) as f:
+        if f.read(4) != b'GGUF':
+            raise ValueError("不是 GGUF 文件")
+        reader = _GGUFReader(f)
+        reader.version = reader.unpack('<I')
+        tensor_count = reader.count()
+        kv_count = reader.count()
+        metadata = {}
+        for _ in range(kv_count):
+            key = reader.string()
+            metadata[key] = reader.value(reader.unpack('<I'))
+        tensors = {}
+        for _ in range(tensor_count):
+            name = reader.string()
+            n_dims = reader.unpack('<I')
+            dims = [reader.count() for _ in range(n_dims)]
+            ggml_type = reader.unpack('<I')
+            reader.unpack('<Q')  # 数据偏移
+            tensors[name] = (tuple(reversed(dims)), ggml_type)
+    return metadata, tensors
+
+def classify_gguf(metadata, tensors):
+    """返回 (版本, 量化类型, 参数量)；量化类型取参数量占比最大的张量类型"""
+    param_count = 0
+    by_type = {}
+    for shape, ggml_type in tensors.values():
+        n = 1
+        for dim in shape:
+            n *= dim
+        param_count += n
+        by_type[ggml_type] = by_type.get(ggml_type, 0) + n
+    quantization = ''
+    if by_type:
+        dominant = max(by_type, key=by_type.get)
+        quantization = GGML_TYPE_NAMES.get(dominant, f"type{dominant}")
+    arch = str(metadata.get('general.architecture', '')).lower()
+    version = GGUF_ARCH_VERSION.get(arch, '')
+    if not version:
+        _, version = classify_tensors({name: shape for name, (shape, _) in tensors.items()})
+    return version or arch.upper(), quantization, param_count
+
+def format_param_count(count):
+    if not count:
+        return ""
+    if count >= 1e9:
+        return f"{count / 1e9:.2f}B"
+    if count >= 1e6:
+        return f"{count / 1e6:.1f}M"
+    return str(count)
+
+# 交叉注意力 (attn2) 的 to_k 输入维度即文本编码器输出维度，可区分 SD1.5 / SD2 / SDXL
+CONTEXT_DIM_VERSION = {768: 'SD1.5', 1024: 'SD2.0', 2048: 'SDXL'}
+
+def _version_from_context_dim(tensors, names):
+    for name in names:
+        shape = tensors[name]
+        if len(shape) >= 2:
+            version = CONTEXT_DIM_VERSION.get(shape[-1])
+            if version:
+                return version
+    return ''
+
+def classify_tensors(tensors, metadata=None):
+    """根据张量名和形状判断 (模型类型, 版本)；无法判断类型时返回 (None, '')"""
+    metadata = metadata or {}
+    names = list(tensors)
+    if not names:
+        return None, ''
+    has = lambda *parts: any(part in name for name in names for part in parts)
+    is_flux = has("double_blocks", "single_blocks", "single_transformer_blocks")
+    to_k = [n for n in names if "attn2" in n and ("to_k" in n) and n.endswith(".weight")]
+
+    if has("lora_up", "lora_down", "lora_A", "lora_B", "hada_w1", "lokr_w1"):
+        if is_flux:
+            return 'LoRA', 'FLUX'
+        if has("lora_te2_", "lora_te1_"):
+            return 'LoRA', 'SDXL'
+        # LoRA 的 down 矩阵形状为 [rank, 输入维度]
+        return 'LoRA', _version_from_context_dim(tensors, [n for n in to_k if "down" in n or "lora_A" in n])
+
+    if has("emb_params", "string_to_param", "clip_g", "clip_l") and len(names) <= 4:
+        if "clip_g" in tensors:
+            return 'TextualInversion', 'SDXL'
+        for name in names:
+            shape = tensors[name]
+            if shape and shape[-1] in CONTEXT_DIM_VERSION:
+                return 'TextualInversion', CONTEXT_DIM_VERSION[shape[-1]]
+        return 'TextualInversion', ''
+
+    if has("control_model.", "controlnet_cond_embedding", "input_hint_block", "controlnet_down_blocks"):
+        if is_flux:
+            return 'ControlNet', 'FLUX'
+        return 'ControlNet', _version_from_context_dim(tensors, to_k)
+
+    if is_flux:
+        return 'Checkpoint', 'FLUX'
+
+    if has("diffusion_model.", "input_blocks.", "down_blocks."):
+        if has("conditioner.embedders.1"):
+            return 'Checkpoint', 'SDXL'
+        return 'Checkpoint', _version_from_context_dim(tensors, to_k)
+
+    if all(n.startswith(("encoder.", "decoder.", "quant_conv.", "post_quant_conv.", "first_stage_model.")) for n in names):
+        # FLUX 的 VAE 潜空间为 16 通道，SD 系列为 4 通道
+        conv_in = tensors.get("decoder.conv_in.weight") or tensors.get("first_stage_model.decoder.conv_in.weight") or ()
+        return 'VAE', 'FLUX' if len(conv_in) >= 2 and conv_in[1] == 16 else ''
+
+    return None, ''
+
+class _PickleGlobal:
+    """pickle 中引用的全局名（只记录名字，绝不导入或调用）"""
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+class _ProbeTensor:
+    __slots__ = ("shape",)
+
+    def __init__(self, shape):
+        self.shape = tuple(shape) if isinstance(shape, (tuple, list)) else ()
+
+def _pickle_reduce(func, args):
+    """模拟 REDUCE：只识别张量重建函数和 OrderedDict，其余对象一律视为不透明的 None"""
+    name = func.name if isinstance(func, _PickleGlobal) else ""
+    if name.endswith(("._rebuild_tensor_v2", "._rebuild_tensor")) and len(args) >= 3:
+        return _ProbeTensor(args[2])
+    if name.endswith("._rebuild_parameter") and args:
+        return args[0]
+    if name == "collections.OrderedDict":
+        return {}
+    return None
+
+def _walk_pickle(stream):
+    """沿 pickle 操作码模拟栈，只还原 dict/list/tuple/基本类型和张量形状，不执行任何 pickle 代码、不读取张量存储"""
+    stack, marks, memo = [], [], {}
+
+    def pop_mark():
+        start = marks.pop()
+        items = stack[start:]
+        del stack[start:]
+        return items
+
+    for opcode, arg, _ in pickletools.genops(stream):
+        name = opcode.name
+        if name in ("PROTO", "FRAME"):
+            continue
+        if name == "STOP":
+            return stack[-1] if stack else None
+        if name == "MARK":
+            marks.append(len(stack))
+        elif name == "EMPTY_DICT":
+            stack.append({})
+        elif name == "EMPTY_LIST":
+            stack.append([])
+        elif name == "EMPTY_TUPLE":
+            stack.append(())
+        elif name == "NONE":
+            stack.append(None)
+        elif name in ("NEWTRUE", "NEWFALSE"):
+            stack.append(name == "NEWTRUE")
+        elif opcode.arg is not None and name not in ("GLOBAL", "INST", "PUT", "BINPUT", "LONG_BINPUT",
+                                                       "GET", "BINGET", "LONG_BINGET", "PERSID", "EXT1", "EXT2", "EXT4"):
+            stack.append(arg)  # 字符串、整数、浮点数、bytes 等字面量
+        elif name in ("TUPLE1", "TUPLE2", "TUPLE3"):
+            n = int(name[-1])
+            items = tuple(stack[-n:])
+            del stack[-n:]
+            stack.append(items)
+        elif name == "TUPLE":
+            stack.append(tuple(pop_mark()))
+        elif name == "LIST":
+            stack.append(pop_mark())
+        elif name == "DICT":
+            items = pop_mark()
+            stack.append(dict(zip(items[::2], items[1::2])))
+        elif name == "APPEND":
+            value = stack.pop()
+            if isinstance(stack[-1], list):
+                stack[-1].append(value)
+        elif name == "APPENDS":
+            items = pop_mark()
+            if isinstance(stack[-1], list):
+                stack[-1].extend(items)
+        elif name == "SETITEM":
+            value = stack.pop()
+            key = stack.pop()
+            if isinstance(stack[-1], dict):
+                stack[-1][key] = value
+        elif name == "SETITEMS":
+            items = pop_mark()
+            if isinstance(stack[-1], dict):
+                stack[-1].update(zip(items[::2], items[1::2]))
+        elif name == "GLOBAL":
+            stack.append(_PickleGlobal(arg.replace(" ", ".")))
+        elif name == "STACK_GLOBAL":
+            attr = stack.pop()
+            module = stack.pop()
+            stack.append(_PickleGlobal(f"{module}.{attr}"))
+        elif name in ("REDUCE", "NEWOBJ"):
+            args = stack.pop()
+            func = stack.pop()
+            stack.append(_pickle_reduce(func, args if isinstance(args, tuple) else ()))
+        elif name == "BUILD":
+            stack.pop()
+        elif name == "BINPERSID":
+            stack[-1] = None  # 张量存储的引用，不读取
+        elif name == "PERSID":
+            stack.append(None)
+        elif name in ("PUT", "BINPUT", "LONG_BINPUT"):
+            memo[arg] = stack[-1]
+        elif name == "MEMOIZE":
+            memo[len(memo)] = stack[-1]
+        elif name in ("GET", "BINGET", "LONG_BINGET"):
+            stack.append(memo[arg])
+        elif name == "POP":
+            stack.pop()
+        elif name == "POP_MARK":
+            pop_mark()
+        elif name == "DUP":
+            stack.append(stack[-1])
+        else:
+            raise ValueError(f"不支持的 pickle 操作码: {name}")
+    raise ValueError("pickle 数据不完整")
+
+def _flatten_tensors(obj, prefix="", out=None, depth=0):
+    """把嵌套 dict 展开为 {以点连接的键名: 形状}"""
+    out = {} if out is None else out
+    if isinstance(obj, dict) and depth < 4:
+        for key, value in obj.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, _ProbeTensor):
+                out[name] = value.shape
+            elif isinstance(value, dict):
+                _flatten_tensors(value, name + ".", out, depth + 1)
+    return out
+
+def read_pickle_tensors(filepath):
+    """不反序列化地读取 .ckpt/.pt/.pth/.bin 中的张量名和形状。
+    zip 格式（torch>=1.6）只读取中央目录和 data.pkl；旧格式依次跳过 magic/protocol/sys_info 三段 pickle"""
+    if zipfile.is_zipfile(filepath):
+        with zipfile.ZipFile(filepath) as zf:
+            info = next((i for i in zf.infolist() if i.filename == "data.pkl" or i.filename.endswith("/data.pkl")), None)
+            if info is None:
+                raise ValueError("压缩包中没有 data.pkl")
+            if info.file_size > MODEL_HEADER_LIMIT:
+                raise ValueError(f"data.pkl 过大: {info.file_size}")
+            with zf.open(info) as stream:
+                obj = _walk_pickle(stream)
+    else:
+        with open(filepath, 'rb', buffering=1024 * 1024) as f:
+            for _ in range(3):
+                _walk_pickle(f)
+            obj = _walk_pickle(f)
+    if isinstance(obj, dict) and isinstance(obj.get("state_dict"), dict):
+        obj = obj["state_dict"]
+    return _flatten_tensors(obj)
+
+def classify_model_file(filepath):
+    """识别模型 (类型, 版本, 量化类型, 参数量)：优先读取文件头，读取失败或无法判断时回退到按文件名猜测"""
+    fname = os.path.basename(filepath)
+    m_type, m_ver, quantization, param_count = None, '', '', 0
+    try:
+        lower = fname.lower()
+        if lower.endswith('.safetensors'):
+            m_type, m_ver = classify_tensors(*read_safetensors_header(filepath))
+        elif lower.endswith('.gguf'):
+            m_type = 'GGUF'
+            m_ver, quantization, param_count = classify_gguf(*read_gguf_header(filepath))
+        elif lower.endswith(('.ckpt', '.pt', '.pth', '.bin', '.th')):
+            m_type, m_ver = classify_tensors(read_pickle_tensors(filepath))
+    except Exception as e:
+        print(f"读取模型文件头失败: {filepath}, 错误: {e}")
+    if m_type is None:
+        m_type = ModelClassifierGUI.detect_model_type_static(fname)
+    return m_type, m_ver or ModelClassifierGUI.detect_model_version_static(fname), quantization, param_count
+
+class ModelCatalog:
+    """模型目录的持久化索引（SQLite），按路径记录 size/mtime/inode，重新扫描时只处理新增、变更、删除的文件"""
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.db_path = os.path.join(model_dir, CATALOG_FILENAME)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < CATALOG_SCHEMA_VERSION:
+                # 识别规则或字段已更新：丢弃旧的模型记录，下次扫描时重新识别（哈希缓存保留）
+                self.conn.execute("DROP TABLE IF EXISTS models")
+                self.conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS models ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, "
+                "model_type TEXT, model_version TEXT, sha256 TEXT, quantization TEXT, param_count INTEGER)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, sha256 TEXT)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, notes TEXT)"
+            )
+
+    def load_all(self):
+        """返回 {path: (size, mtime_ns, inode, model_type, model_version, sha256, quantization, param_count)}"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, size, mtime_ns, inode, model_type, model_version, sha256, quantization, param_count FROM models"
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def upsert_many(self, records):
+        """records: [(path, size, mtime_ns, inode, model_type, model_version, sha256, quantization, param_count)]"""
+        if not records:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+
+    def remove_many(self, paths):
+        if not paths:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM models WHERE path = ?", [(p,) for p in paths])
+
+    def load_hashes(self):
+        """返回 {path: (size, mtime_ns, inode, sha256)}"""
+        with self._lock:
+            rows = self.conn.execute("SELECT path, size, mtime_ns, inode, sha256 FROM hashes").fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def upsert_hash(self, path, size, mtime_ns, inode, sha256):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)", (path, size, mtime_ns, inode, sha256))
+
+    def load_notes(self):
+        """返回 {备注 JSON 路径: (size, mtime_ns, 备注文本)}"""
+        with self._lock:
+            rows = self.conn.execute("SELECT path, size, mtime_ns, notes FROM notes").fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def upsert_notes_many(self, records):
+        """records: [(path, size, mtime_ns, notes)]"""
+        if not records:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?)", records)
+
+    def remove_notes_many(self, paths):
+        if not paths:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM notes WHERE path = ?", [(p,) for p in paths])
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class Sha256Cache:
+    """SHA256 缓存：记录计算哈希时文件的 size/mtime_ns/inode，文件未变化时一次 stat 即可确认哈希仍然有效。
+    缓存未命中时，只有不早于模型文件的 .sha256 才会被采信，否则重新计算"""
+    def __init__(self, catalog=None):
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._entries = catalog.load_hashes() if catalog else {}  # {规范化路径: (size, mtime_ns, inode, sha256)}
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _matches(entry, st):
+        """size/mtime 必须一致；Windows 上 os.DirEntry.stat() 的 st_ino 恒为 0，
+        任一侧为 0 时不比较 inode，否则扫描与 os.stat 写入的条目会互相覆盖"""
+        if entry[:2] != (st.st_size, st.st_mtime_ns):
+            return False
+        return not entry[2] or not st.st_ino or entry[2] == st.st_ino
+
+    def lookup(self, path, st=None, check_sidecar=True):
+        """返回仍然有效的哈希值，没有则返回空字符串。st 为调用方已取得的 stat 结果；
+        check_sidecar 为 False（已知没有 .sha256）时缓存未命中即返回，不再访问磁盘"""
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return ""
+        return self._lookup(path, st, check_sidecar)
+
+    def _lookup(self, path, st, check_sidecar=True):
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+        if entry and self._matches(entry, st):
+            return entry[3]
+        if not check_sidecar:
+            return ""
+        sha_path = os.path.splitext(path)[0] + ".sha256"
+        try:
+            if os.stat(sha_path).st_mtime_ns < st.st_mtime_ns:
+                return ""  # 模型在写入 .sha256 之后被修改过
+            with open(sha_path, 'r') as f:
+                hashv = f.read().strip()
+        except OSError:
+            return ""
+        if not is_valid_sha256(hashv):
+            return ""
+        self._store(path, st, hashv)
+        return hashv
+
+    def _store(self, path, st, hashv):
+        key = self._key(path)
+        with self._lock:
+            self._entries[key] = (st.st_size, st.st_mtime_ns, st.st_ino, hashv)
+        if self.catalog:
+            try:
+                self.catalog.upsert_hash(key, st.st_size, st.st_mtime_ns, st.st_ino, hashv)
+            except Exception as e:
+                print(f"写入哈希缓存失败: {path}, 错误: {e}")
+
+    def store(self, path, hashv):
+        """记录刚计算出的哈希值（按文件当前状态）"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._store(path, st, hashv)
+
+    def get_or_compute(self, path, is_cancelled=None, on_bytes=None):
+        """返回 (哈希值, 是否来自缓存)。需要重新计算时同时写入 .sha256，取消时返回空字符串。读取失败时抛出异常"""
+        st = os.stat(path)
+        hashv = self._lookup(path, st)
+        if hashv:
+            if on_bytes:
+                on_bytes(st.st_size)
+            return hashv, True
+        hashv = sha256_file(path, is_cancelled, on_bytes)
+        if not hashv:
+            return "", False
+        with open(os.path.splitext(path)[0] + ".sha256", 'w') as f:
+            f.write(hashv)
+        self._store(path, st, hashv)
+        return hashv, False
+
+class ThumbnailDiskCache:
+    """缩略图磁盘缓存：以 (预览图路径, mtime, 大小) 为键保存 PNG 小图，超出容量时按最近使用时间淘汰。
+    table 区分同一数据库中容量各自独立的缓存（表格缩略图 / 动图帧序列）"""
+    def __init__(self, model_dir, budget=THUMBNAIL_DISK_BUDGET, table="thumbs"):
+        self.model_dir = model_dir
+        self.budget = budget
+        self.table = table
+        self.db_path = os.path.join(model_dir, THUMBNAIL_CACHE_FILENAME)
+        self._lock = threading.Lock()
+        self._clock = 0
+        self._touched = {}  # {key: last_used}，尚未写回数据库的命中记录
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, data BLOB, nbytes INTEGER, last_used INTEGER)"
+            )
+            row = self.conn.execute(f"SELECT COALESCE(SUM(nbytes), 0), COALESCE(MAX(last_used), 0) FROM {table}").fetchone()
+        self.total_bytes, self._clock = row
+
+    @staticmethod
+    def make_key(path):
+        """返回缓存键；文件不存在时返回 None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return f"{os.path.normcase(os.path.abspath(path))}|{st.st_mtime_ns}|{st.st_size}"
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(f"SELECT data FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._touched[key] = self._clock
+            if len(self._touched) >= THUMBNAIL_TOUCH_BATCH:
+                with self.conn:
+                    self._flush_touched()
+        return row[0]
+
+    def _flush_touched(self):
+        """把内存中的最近使用时间写回（调用方持有 self._lock 并负责提交事务）"""
+        if not self._touched:
+            return
+        self.conn.executemany(f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                              [(clock, key) for key, clock in self._touched.items()])
+        self._touched.clear()
+
+    def put(self, key, data):
+        with self._lock, self.conn:
+            old = self.conn.execute(f"SELECT nbytes FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._clock += 1
+            self._touched.pop(key, None)
+            self.conn.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)", (key, sqlite3.Binary(data), len(data), self._clock))
+            self.total_bytes += len(data)
+            if self.total_bytes > self.budget:
+                self._evict()
+
+    def _evict(self):
+        # 淘汰到容量的 90%，避免每次写入都触发淘汰；先写回命中记录，按真实的最近使用顺序淘汰
+        self._flush_touched()
+        target = self.budget * 9 // 10
+        evicted = []
+        for key, nbytes in self.conn.execute(f"SELECT key, nbytes FROM {self.table} ORDER BY last_used"):
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= nbytes
+        self.conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+
+    def close(self):
+        with self._lock:
+            try:
+                with self.conn:
+                    self._flush_touched()
+            except sqlite3.Error as e:
+                print(f"写回缩略图使用记录失败: {e}")
+            self.conn.close()
+
+class SidecarIndex:
+    """关联文件索引：每个目录只 scandir 一次，记录 {normcase(文件名): 文件名}，
+    之后判断 "模型主文件名 + 后缀" 是否存在只需查字典。由文件监控和本程序的文件操作保持最新"""
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dir_key(dir_path):
+        return os.path.normcase(os.path.normpath(os.path.abspath(dir_path)))
+
+    def _names(self, dir_path):
+        key = self._dir_key(dir_path)
+        with self._lock:
+            names = self._dirs.get(key)
+        if names is None:
+            names = {}
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        names[os.path.normcase(entry.name)] = entry.name
+            except OSError:
+                pass
+            with self._lock:
+                names = self._dirs.setdefault(key, names)
+        return names
+
+    def seed(self, dir_path, names):
+        """用扫描时已经得到的目录内容填充索引，避免再次 scandir"""
+        with self._lock:
+            self._dirs.setdefault(self._dir_key(dir_path), dict(names))
+
+    def exists(self, path):
+        dir_path, name = os.path.split(path)
+        return os.path.normcase(name) in self._names(dir_path)
+
+    def existing(self, base_path, exts):
+        """按 exts 顺序返回 base_path + ext 中实际存在的路径"""
+        dir_path, base = os.path.split(base_path)
+        names = self._names(dir_path)
+        return [base_path + ext for ext in exts if os.path.normcase(base + ext) in names]
+
+    def first(self, base_path, exts):
+        found = self.existing(base_path, exts)
+        return found[0] if found else None
+
+    def add(self, path):
+        dir_path, name = os.path.split(path)
+        with self._lock:
+            names = self._dirs.get(self._dir_key(dir_path))
+            if names is not None:
+                names[os.path.normcase(name)] = name
+
+    def discard(self, path):
+        dir_path, name = os.path.split(path)
+        with self._lock:
+            names = self._dirs.get(self._dir_key(dir_path))
+            if names is not None:
+                names.pop(os.path.normcase(name), None)
+
+    def moved(self, src, dst):
+        self.discard(src)
+        self.add(dst)
+
+    def invalidate(self, dir_path=None):
+        """丢弃目录（及其子目录）的索引，下次查询时重新 scandir；不传参数时清空全部"""
+        with self._lock:
+            if dir_path is None:
+                self._dirs.clear()
+                return
+            key = self._dir_key(dir_path)
+            for k in [k for k in self._dirs if k == key or k.startswith(key + os.sep)]:
+                del self._dirs[k]
+
+class JsonWriteBehind(QObject):
+    """备注 JSON 的后台延迟写入：同一文件在防抖时间内的多次修改只写最后一次，
+    写入在后台线程中以“临时文件 + os.replace”原子完成；内容全空时删除文件"""
+    written = Signal(str, bool)  # (路径, 是否为删除)
+    failed = Signal(str, str)    # (路径, 错误信息)
+
+    def __init__(self, delay_ms=JSON_SAVE_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.delay_ms = delay_ms
+        self._timers = {}   # {路径: QTimer}，仅在 GUI 线程访问
+        self._pending = {}  # {路径: 待写入数据}，防抖中
+        self._ready = {}    # {路径: 待写入数据}，已提交给后台线程
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def schedule(self, path, data):
+        self._pending[path] = data
+        timer = self._timers.get(path)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda p=path: self._submit(p))
+            self._timers[path] = timer
+        timer.start(self.delay_ms)
+
+    def _submit(self, path):
+        timer = self._timers.pop(path, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        data = self._pending.pop(path, None)
+        if data is None:
+            return
+        with self._lock:
+            self._ready[path] = data
+        self._queue.put(path)
+
+    def flush(self, wait=False):
+        """立即提交所有防抖中的写入；wait=True 时阻塞到后台写完（关闭窗口时使用）"""
+        for path in list(self._pending):
+            self._submit(path)
+        if wait:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                with self._lock:
+                    data = self._ready.pop(path, None)
+                if data is None:
+                    continue  # 已被同一路径更早的队列项写入
+                deleted = self._write(path, data)
+                if deleted is not None:
+                    self.written.emit(path, deleted)
+            except Exception as e:
+                self.failed.emit(path, str(e))
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(path, data):
+        """返回 True 表示删除了文件，False 表示写入了文件，None 表示无需操作"""
+        if not any(data.values()):
+            if not os.path.exists(path):
+                return None
+            os.remove(path)
+            return True
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return False
+
 class PreviewImageWatcher(FileSystemEventHandler):
     def __init__(self, gui):
         super().__init__()
         self.gui = gui
 
     def on_any_event(self, event):
-        row = self.gui.table.currentRow()
-        if row < 0:
+        self._update_sidecars(event)
+        rec = self.gui.current_record
+        if rec is None:
             return
-        filename = self.gui.table.item(row, 1).text()
-        orig_path = self.gui.table.item(row, 3).text()
-        base_path = os.path.splitext(os.path.join(orig_path, filename))[0]
+        base_path = rec.base_path
         for ext in PREVIEW_IMAGE_EXTS:
             preview_path = base_path + ext
             if os.path.abspath(event.src_path) == os.path.abspath(preview_path):
                 self.gui.refresh_preview_signal.emit()
                 break
 
+    def _update_sidecars(self, event):
+        sidecars = self.gui.sidecars
+        dest_path = getattr(event, "dest_path", "")
+        if event.is_directory:
+            if event.event_type in ("deleted", "moved"):
+                sidecars.invalidate(event.src_path)
+            if dest_path:
+                sidecars.invalidate(dest_path)
+            return
+        if event.event_type == "created":
+            sidecars.add(event.src_path)
+        elif event.event_type == "deleted":
+            sidecars.discard(event.src_path)
+        elif event.event_type == "moved":
+            sidecars.moved(event.src_path, dest_path)
+
 class ImageLabel(QLabel):
     def __init__(self, parent=None, preview_type="static"):
         super().__init__(parent)
@@ -127,9 +1016,10 @@ class ImageLabel(QLabel):
         self.left_btn.move(0, (h - self.left_btn.height()) // 2)
         self.right_btn.move(self.width() - self.right_btn.width(), (h - self.right_btn.height()) // 2)
 
-    def set_preview_images(self, paths, index=0):
-        """设置可切换的图片路径列表，并显示第index张"""
+    def set_preview_images(self, paths, index=0, prefetched=None):
+        """设置可切换的图片路径列表，并显示第index张；prefetched 为预取好的 {路径: (已缩放 QPixmap, 宽, 高, 字节数)}"""
         self.preview_paths = paths
+        self.prefetched = prefetched or {}
         self.current_index = index if 0 <= index < len(paths) else 0
         self.update_image()
         # 箭头按钮显示逻辑
@@ -149,9 +1039,11 @@ class ImageLabel(QLabel):
             self.right_btn.hide()
             return
         path = self.preview_paths[self.current_index]
-        pixmap = QPixmap(path)
+        entry = getattr(self, "prefetched", {}).get(path)
+        pixmap = entry[0] if entry else QPixmap(path)
         if not pixmap.isNull():
-            pixmap = pixmap.scaled(240, 240, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            if not entry:
+                pixmap = pixmap.scaled(240, 240, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             self.setPixmap(pixmap)
             self.setText("")
         else:
@@ -362,48 +1254,497 @@ class ImageLabel(QLabel):
             btn_keep_old.clicked.connect(keep_old)
             btn_keep_new.clicked.connect(keep_new)
             ret = dlg.exec()
-            # 释放GifPlayer资源，防止文件占用
-            def safe_release_gifplayer(player):
-                try:
-                    if player:
-                        player.setMovie(None)
-                        if player.movie:
-                            player.movie.stop()
-                            player.movie.deleteLater()
-                            player.movie = None
-                        if player.buffer:
-                            player.buffer.close()
-                            player.buffer.deleteLater()
-                            player.buffer = None
-                        # 不要手动清理 byte_array
-                except Exception as e:
-                    print(f"释放GifPlayer资源异常: {e}")
-
-            safe_release_gifplayer(old_gif_player)
-            safe_release_gifplayer(new_gif_player)
+            # 停止 GifPlayer 播放和后台解码
+            for player in (old_gif_player, new_gif_player):
+                if player:
+                    player.release()
             
             if ret == 2:
                 shutil.copy2(src_path, preview_path)
+                self._add_sidecar(preview_path)
                 if self.parent_gui:
                     self.parent_gui.log(f"覆盖预览图: {preview_path}")
         else:
             shutil.copy2(src_path, preview_path)
+            self._add_sidecar(preview_path)
             if self.parent_gui:
                 self.parent_gui.log(f"保存预览图: {preview_path}")
 # 刷新预览和表格
         if self.parent_gui:
             self.parent_gui.refresh_preview_and_table()
 
-class ModelTableWidget(QTableWidget):  
+    def _add_sidecar(self, path):
+        # parent_gui 可能是主窗口或查重对话框，关联文件索引不一定存在
+        sidecars = getattr(self.parent_gui, "sidecars", None)
+        if sidecars is not None:
+            sidecars.add(path)
+
+class ModelRecord:
+    """表格中的一个模型（列式数据，使用 __slots__ 保持内存占用小且固定）"""
+    __slots__ = ("filename", "orig_path", "moved_path", "size_bytes", "size_str",
+                 "model_type", "model_version", "quantization", "param_count", "sha256", "preview_ext", "notes")
+
+    def __init__(self, filename, orig_path, size_bytes, size_str, model_type, model_version, sha256="", preview_path=None,
+                 quantization="", param_count=0, notes=""):
+        self.filename = filename
+        self.orig_path = orig_path
+        self.moved_path = ""
+        self.size_bytes = size_bytes
+        self.size_str = size_str
+        self.model_type = model_type
+        self.model_version = model_version
+        self.quantization = quantization
+        self.param_count = param_count
+        self.sha256 = sha256
+        self.preview_path = preview_path
+        self.notes = notes  # 备注 JSON 中描述、笔记、VAE 的合并文本，仅用于搜索
+
+    @property
+    def dir_path(self):
+        """模型当前所在目录（移动过则为新目录）"""
+        return self.moved_path or self.orig_path
+
+    @property
+    def full_path(self):
+        return os.path.join(self.dir_path, self.filename)
+
+    @property
+    def base_path(self):
+        return os.path.splitext(self.full_path)[0]
+
+    @property
+    def preview_path(self):
+        """预览图只记录后缀（如 .preview.png），重命名、移动后路径自动跟随模型"""
+        return self.base_path + self.preview_ext if self.preview_ext else None
+
+    @preview_path.setter
+    def preview_path(self, path):
+        self.preview_ext = os.path.basename(path)[len(os.path.splitext(self.filename)[0]):] if path else ""
+
+class ThumbnailSignals(QObject):
+    loaded = Signal(str, QImage)
+
+class ThumbnailTask(QRunnable):
+    """在线程池中解码缩略图：先查磁盘缓存，未命中时用 QImageReader.setScaledSize 让解码器直接输出小图，不生成原尺寸图像"""
+    def __init__(self, path, signals, disk_cache=None):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+        self.disk_cache = disk_cache
+
+    def run(self):
+        image = QImage()
+        key = self.disk_cache.make_key(self.path) if self.disk_cache else None
+        if key:
+            try:
+                data = self.disk_cache.get(key)
+                if data is not None:
+                    image.loadFromData(data, "PNG")
+                    self.signals.loaded.emit(self.path, image)
+                    return
+            except Exception as e:
+                print(f"读取缩略图缓存失败: {self.path}, 错误: {e}")
+        try:
+            reader = QImageReader(self.path)
+            reader.setAutoTransform(True)
+            size = reader.size()
+            if size.isValid():
+                size.scale(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.KeepAspectRatio)
+                reader.setScaledSize(size)
+            image = reader.read()
+        except Exception as e:
+            print(f"缩略图解码失败: {self.path}, 错误: {e}")
+        if key and not image.isNull():
+            try:
+                buffer = QBuffer()
+                buffer.open(QIODevice.WriteOnly)
+                image.save(buffer, "PNG")
+                self.disk_cache.put(key, bytes(buffer.data()))
+            except Exception as e:
+                print(f"写入缩略图缓存失败: {self.path}, 错误: {e}")
+        self.signals.loaded.emit(self.path, image)
+
+class ThumbnailLoader(QObject):
+    """表格缩略图的异步加载器：只为请求到的（可见或即将可见的）行解码，结果通过 thumbnail_ready 通知。
+    内存中按字节数做 LRU 缓存，磁盘缓存（ThumbnailDiskCache）作为第二层"""
+    thumbnail_ready = Signal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setColumnCount(9)
-        self.setHorizontalHeaderLabels(["图片", "文件名", "大小", "原路径", "类型", "版本", "已移动路径", "SHA256(前十位)", "SHA256"])
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(THUMBNAIL_WORKERS)
+        self._signals = ThumbnailSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._pending = set()
+        self._cache = OrderedDict()  # {预览图路径: QPixmap}，空 QPixmap 表示解码失败
+        self._cache_bytes = 0
+        self._placeholder = None
+        self.disk_cache = None
+
+    def placeholder(self):
+        if self._placeholder is None:
+            self._placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+            self._placeholder.fill(QColor("#e8e8e8"))
+        return self._placeholder
+
+    def get(self, path):
+        """返回已缓存的缩略图，未加载时返回 None"""
+        pixmap = self._cache.get(path)
+        if pixmap is not None:
+            self._cache.move_to_end(path)
+        return pixmap
+
+    def request(self, path):
+        if not path or path in self._pending or path in self._cache:
+            return
+        self._pending.add(path)
+        self.pool.start(ThumbnailTask(path, self._signals, self.disk_cache))
+
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+    def invalidate(self, path):
+        pixmap = self._cache.pop(path, None)
+        if pixmap is not None:
+            self._cache_bytes -= self._pixmap_bytes(pixmap)
+
+    def clear(self):
+        self.pool.clear()
+        self._pending.clear()
+        self._cache.clear()
+        self._cache_bytes = 0
+
+    def _on_loaded(self, path, image):
+        if path not in self._pending:
+            return  # 已被 clear/invalidate 丢弃
+        self._pending.discard(path)
+        self.invalidate(path)
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        self._cache[path] = pixmap
+        self._cache_bytes += self._pixmap_bytes(pixmap)
+        while self._cache_bytes > THUMBNAIL_MEMORY_BUDGET and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= self._pixmap_bytes(evicted)
+        self.thumbnail_ready.emit(path)
+
+class ModelSearchIndex:
+    """内存搜索索引：对文件名、哈希、类型、版本、备注的小写文本建立三元组倒排表。
+    查询时取各三元组记录集合的交集，再对少量候选做子串校验"""
+    def __init__(self):
+        self._texts = {}  # {id(record): 小写文本}
+        self._grams = {}  # {三元组: {id(record)}}
+        self.version = 0  # 每次变更递增，供过滤代理判断缓存的结果是否过期
+
+    @staticmethod
+    def _text(rec):
+        return "\n".join((rec.filename, rec.sha256, rec.model_type, rec.model_version, rec.notes)).lower()
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, rec):
+        text = self._text(rec)
+        key = id(rec)
+        self._texts[key] = text
+        for gram in self._trigrams(text):
+            self._grams.setdefault(gram, set()).add(key)
+        self.version += 1
+
+    def remove(self, rec):
+        key = id(rec)
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for gram in self._trigrams(text):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(key)
+                if not ids:
+                    del self._grams[gram]
+        self.version += 1
+
+    def update(self, rec):
+        if self._texts.get(id(rec)) != self._text(rec):
+            self.remove(rec)
+            self.add(rec)
+
+    def clear(self):
+        self._texts.clear()
+        self._grams.clear()
+        self.version += 1
+
+    def search(self, query):
+        """返回匹配的 id(record) 集合"""
+        query = query.lower()
+        if len(query) < 3:
+            return {key for key, text in self._texts.items() if query in text}
+        candidates = None
+        for gram in sorted(self._trigrams(query), key=lambda g: len(self._grams.get(g, ()))):
+            ids = self._grams.get(gram)
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return {key for key in candidates if query in self._texts[key]}
+
+class ModelStats:
+    """统计计数器：总数、各类型数量、已有哈希数、各类型总字节数，随记录增删改增量维护"""
+    def __init__(self):
+        self._entries = {}  # {id(record): (类型, 是否有哈希, 字节数)}，变更时用于扣除旧值
+        self.total = 0
+        self.hashed = 0
+        self.type_count = {}
+        self.type_bytes = {}
+
+    @staticmethod
+    def _entry(rec):
+        return (rec.model_type, bool(rec.sha256), rec.size_bytes)
+
+    def _apply(self, entry, sign):
+        model_type, hashed, size = entry
+        self.total += sign
+        self.hashed += sign if hashed else 0
+        count = self.type_count.get(model_type, 0) + sign
+        if count:
+            self.type_count[model_type] = count
+            self.type_bytes[model_type] = self.type_bytes.get(model_type, 0) + sign * size
+        else:
+            self.type_count.pop(model_type, None)
+            self.type_bytes.pop(model_type, None)
+
+    def add(self, rec):
+        entry = self._entry(rec)
+        self._entries[id(rec)] = entry
+        self._apply(entry, 1)
+
+    def remove(self, rec):
+        entry = self._entries.pop(id(rec), None)
+        if entry is not None:
+            self._apply(entry, -1)
+
+    def update(self, rec):
+        old = self._entries.get(id(rec))
+        new = self._entry(rec)
+        if old is not None and old != new:
+            self._apply(old, -1)
+            self._apply(new, 1)
+            self._entries[id(rec)] = new
+
+    def clear(self):
+        self._entries.clear()
+        self.total = 0
+        self.hashed = 0
+        self.type_count.clear()
+        self.type_bytes.clear()
+
+class ModelTableModel(QAbstractTableModel):
+    HEADERS = ["图片", "文件名", "大小", "原路径", "类型", "版本", "量化", "参数量", "已移动路径", "SHA256(前十位)", "SHA256"]
+    SORT_ROLE = Qt.ItemDataRole.UserRole
+    RECORD_ROLE = Qt.ItemDataRole.UserRole + 1
+    stats_changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self._rows = {}  # {id(record): 源行号}，排序后重建
+        self.search_index = ModelSearchIndex()
+        self.stats = ModelStats()
+        self.thumbnails = ThumbnailLoader(self)
+        self.thumbnails.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self._thumbnail_waiting = {}  # {预览图路径: [等待缩略图的记录]}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _column_text(self, rec, col):
+        if col == 1:
+            return rec.filename
+        if col == 2:
+            return rec.size_str
+        if col == 3:
+            return rec.orig_path
+        if col == 4:
+            return rec.model_type
+        if col == 5:
+            return rec.model_version
+        if col == 6:
+            return rec.quantization
+        if col == 7:
+            return format_param_count(rec.param_count)
+        if col == 8:
+            return rec.moved_path
+        if col == 9:
+            return rec.sha256[:10]
+        if col == 10:
+            return rec.sha256
+        return ""
+
+    def _sort_value(self, rec, col):
+        if col == 2:
+            return rec.size_bytes
+        if col == 7:
+            return rec.param_count
+        return self._column_text(rec, col)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """用 Python 排序键一次性排好记录，再把视图中的持久索引（选中、当前行）映射到新行号"""
+        if not 0 <= column < len(self.HEADERS):
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_records = [self.records[i.row()] for i in old_indexes]
+        self.records.sort(key=lambda rec: self._sort_value(rec, column), reverse=order == Qt.SortOrder.DescendingOrder)
+        self._rows = {id(r): i for i, r in enumerate(self.records)}
+        self.changePersistentIndexList(old_indexes, [self.index(self._rows[id(r)], i.column()) for r, i in zip(old_records, old_indexes)])
+        self.layoutChanged.emit()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        rec = self.records[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._column_text(rec, col) if col else None
+        if role == Qt.ItemDataRole.DecorationRole and col == 0:
+            return self.thumbnail_for(rec)
+        if role == Qt.ItemDataRole.ToolTipRole and col == 1:
+            return rec.filename
+        if role == self.SORT_ROLE:
+            return self._sort_value(rec, col)
+        if role == self.RECORD_ROLE:
+            return rec
+        return None
+
+    def thumbnail_for(self, rec):
+        """返回缩略图；尚未加载时发起异步请求并先返回占位图"""
+        if not rec.preview_path:
+            return None
+        pixmap = self.thumbnails.get(rec.preview_path)
+        if pixmap is not None:
+            return pixmap if not pixmap.isNull() else None
+        waiting = self._thumbnail_waiting.setdefault(rec.preview_path, [])
+        if rec not in waiting:
+            waiting.append(rec)
+        self.thumbnails.request(rec.preview_path)
+        return self.thumbnails.placeholder()
+
+    def refresh_thumbnail(self, rec, old_preview_path=None):
+        """预览图文件变化后丢弃旧缩略图并重新加载"""
+        for path in (old_preview_path, rec.preview_path):
+            if path:
+                self.thumbnails.invalidate(path)
+        row = self.source_row(rec)
+        if row >= 0:
+            self.search_index.update(rec)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+
+    def _on_thumbnail_ready(self, path):
+        for rec in self._thumbnail_waiting.pop(path, []):
+            row = self.source_row(rec)
+            if row >= 0:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, 0))
+
+    def append_records(self, records):
+        if not records:
+            return
+        start = len(self.records)
+        self.beginInsertRows(QModelIndex(), start, start + len(records) - 1)
+        for i, rec in enumerate(records, start):
+            self.records.append(rec)
+            self._rows[id(rec)] = i
+            self.search_index.add(rec)
+            self.stats.add(rec)
+        self.endInsertRows()
+        self.stats_changed.emit()
+
+    def remove_records(self, records):
+        rows = sorted((self._rows[id(r)] for r in records if id(r) in self._rows), reverse=True)
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self.search_index.remove(self.records[row])
+            self.stats.remove(self.records[row])
+            del self.records[row]
+            self.endRemoveRows()
+        if rows:
+            self._rows = {id(r): i for i, r in enumerate(self.records)}
+            self.stats_changed.emit()
+        return len(rows)
+
+    def clear(self):
+        self.beginResetModel()
+        self.records = []
+        self._rows = {}
+        self.search_index.clear()
+        self.stats.clear()
+        self._thumbnail_waiting = {}
+        self.thumbnails.clear()
+        self.endResetModel()
+        self.stats_changed.emit()
+
+    def source_row(self, rec):
+        return self._rows.get(id(rec), -1)
+
+    def record_changed(self, rec):
+        """记录字段被修改后通知视图刷新该行；搜索索引随之更新，版本号变化后过滤代理会重新匹配"""
+        row = self.source_row(rec)
+        if row >= 0:
+            self.stats.update(rec)
+            self.search_index.update(rec)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+            self.stats_changed.emit()
+
+class ModelFilterProxy(QSortFilterProxyModel):
+    """过滤代理：排序交给源模型一次完成，代理本身不排序，显示/隐藏行时无需逐行比较"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filter_text = ""
+        self._matches = None
+        self._matches_version = -1
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def set_filter_text(self, text):
+        self.filter_text = text.lower()
+        self._matches_version = -1
+        # invalidate() 直接丢弃映射并发出一次 layoutChanged，而不是按行区间逐段插入/删除，
+        # 大量行同时显示/隐藏时视图只需刷新一次
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.filter_text:
+            return True
+        model = self.sourceModel()
+        index = model.search_index
+        if self._matches_version != index.version:
+            self._matches = index.search(self.filter_text)
+            self._matches_version = index.version
+        return id(model.records[source_row]) in self._matches
+
+class ModelTableView(QTableView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model_data = ModelTableModel(self)
+        self.proxy = ModelFilterProxy(self)
+        self.proxy.setSourceModel(self.model_data)
+        self.setModel(self.proxy)
         self.setSortingEnabled(True)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.horizontalHeader().setStretchLastSection(True)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.setColumnWidth(0, 64)  
         self.verticalHeader().setDefaultSectionSize(30)
         self.setColumnWidth(1, 180) 
@@ -411,196 +1752,1087 @@ class ModelTableWidget(QTableWidget):
         self.setColumnWidth(3, 250) 
         self.setColumnWidth(4, 90)  
         self.setColumnWidth(5, 40)  
-        self.setColumnWidth(6, 250) 
-        self.setColumnWidth(7, 100) 
-        self.setColumnWidth(8, 200) 
+        self.setColumnWidth(6, 60)  
+        self.setColumnWidth(7, 60)  
+        self.setColumnWidth(8, 250) 
+        self.setColumnWidth(9, 100) 
+        self.setColumnWidth(10, 200) 
+        # 滚动或插入行后，合并为一次预取可视区域附近的缩略图
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(50)
+        self._prefetch_timer.timeout.connect(self._prefetch_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self._prefetch_timer.start)
+        self.proxy.rowsInserted.connect(self._prefetch_timer.start)
+        self.proxy.layoutChanged.connect(self._prefetch_timer.start)
+
+    def _prefetch_thumbnails(self):
+        count = self.proxy.rowCount()
+        if not count:
+            return
+        first = self.rowAt(0)
+        last = self.rowAt(self.viewport().height() - 1)
+        first = 0 if first < 0 else first
+        last = count - 1 if last < 0 else last
+        for row in range(max(first - THUMBNAIL_PREFETCH_ROWS, 0), min(last + THUMBNAIL_PREFETCH_ROWS, count - 1) + 1):
+            rec = self.record_at(self.proxy.index(row, 0))
+            if rec:
+                self.model_data.thumbnail_for(rec)
+
+    def record_at(self, index):
+        """根据视图中的索引返回模型记录"""
+        if not index.isValid():
+            return None
+        return self.proxy.data(index, ModelTableModel.RECORD_ROLE)
+
+    def current_record(self):
+        return self.record_at(self.currentIndex())
+
+    def selected_records(self):
+        """按视图显示顺序返回所有选中的记录"""
+        rows = sorted(set(idx.row() for idx in self.selectionModel().selectedRows()))
+        return [self.record_at(self.proxy.index(row, 0)) for row in rows]
+
+    def all_records(self):
+        return list(self.model_data.records)
+
+    def find_record(self, full_path):
+        key = os.path.normcase(os.path.normpath(full_path))
+        for rec in self.model_data.records:
+            if os.path.normcase(os.path.normpath(rec.full_path)) == key:
+                return rec
+        return None
+
+class Sha256BatchWorker(QThread):
+    """批量 SHA256：线程池并行计算，按磁盘设备 (st_dev) 限制并发，避免机械硬盘来回寻道"""
+    progress_changed = Signal(int, int, int, str, str)  # 已完成数, 总数, file_list 下标, 哈希值, 文件名
+    bytes_progress = Signal(int)  # 按字节计算的总体进度（千分比）
+    finished = Signal(int, int)
+
+    def __init__(self, file_list, cache=None, max_workers=SHA256_MAX_WORKERS, device_workers=SHA256_DEVICE_WORKERS, parent=None):
+        super().__init__(parent)
+        self.file_list = file_list
+        self.cache = cache or Sha256Cache()
+        self.max_workers = max(1, max_workers)
+        self.device_workers = max(1, device_workers)
+        self._is_cancelled = False
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._done_bytes = 0
+        self._last_permille = -1
+
+    def run(self):
+        new_count = 0
+        skip_count = 0
+        done = 0
+        total = len(self.file_list)
+        queues = {}  # {st_dev: deque[(下标, 路径, 大小)]}
+        for idx, (_, full_path) in enumerate(self.file_list):
+            try:
+                st = os.stat(full_path)
+                dev, size = st.st_dev, st.st_size
+            except OSError:
+                dev, size = None, 0
+            self._total_bytes += size
+            queues.setdefault(dev, deque()).append((idx, full_path, size))
+        running = {}  # {future: (st_dev, 下标, 路径)}
+        per_device = dict.fromkeys(queues, 0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                if not self._is_cancelled:
+                    for dev, pending in queues.items():
+                        while pending and per_device[dev] < self.device_workers and len(running) < self.max_workers:
+                            idx, full_path, size = pending.popleft()
+                            future = pool.submit(self.process_file, full_path, size)
+                            running[future] = (dev, idx, full_path)
+                            per_device[dev] += 1
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    dev, idx, full_path = running.pop(future)
+                    per_device[dev] -= 1
+                    hashv, reused = future.result()
+                    if self._is_cancelled and not hashv:
+                        continue  # 取消时中断的文件不计入结果
+                    done += 1
+                    if reused:
+                        skip_count += 1
+                    else:
+                        new_count += 1
+                    self.progress_changed.emit(done, total, idx, hashv, os.path.basename(full_path))
+        self.finished.emit(new_count, skip_count)
+
+    def process_file(self, full_path, size):
+        """在线程池中处理单个文件，返回 (哈希值, 是否复用了缓存或已有的 .sha256)"""
+        try:
+            return self.cache.get_or_compute(full_path, lambda: self._is_cancelled, self._add_bytes)
+        except PermissionError:
+            print(f"权限不足，无法读取文件: {full_path}")
+        except Exception as e:
+            print(f"读取文件出错: {full_path}，原因: {e}")
+        return "", False
+
+    def _add_bytes(self, n):
+        with self._lock:
+            self._done_bytes += n
+            permille = self._done_bytes * 1000 // self._total_bytes if self._total_bytes else 1000
+            if permille == self._last_permille:
+                return
+            self._last_permille = permille
+        self.bytes_progress.emit(permille)
+
+    def cancel(self):
+        self._is_cancelled = True
+
+class SingleSha256Worker(QThread):  
+    finished = Signal(str, str)
+
+    def __init__(self, full_path, filename, parent=None):
+        super().__init__(parent)
+        self.full_path = full_path
+        self.filename = filename
+
+    def run(self):  
+        try:
+            hashv = sha256_file(self.full_path)
+        except Exception:
+            hashv = ""
+        self.finished.emit(hashv, self.filename)
+
+class DuplicateFinderWorker(QThread):
+    """分级查重：按字节大小分组 → 头/中/尾抽样哈希 → 只对仍然相同的候选文件计算完整 SHA256"""
+    progress = Signal(int, int, str)  # 当前, 总数, 阶段说明
+    finished = Signal(list, bool)  # 重复文件分组, 是否已取消
+
+    def __init__(self, paths, cache, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.cache = cache
+        self._sizes = {}
+        self._is_cancelled = False
+
+    def run(self):
+        groups = self.find_groups()
+        self.finished.emit(groups if not self._is_cancelled else [], self._is_cancelled)
+
+    def find_groups(self):
+        by_size = {}
+        for path in self.paths:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            self._sizes[path] = size
+            by_size.setdefault(size, []).append(path)
+        groups = [files for files in by_size.values() if len(files) > 1]
+        groups = self._refine(groups, lambda p: partial_sha256(p, self._sizes[p]), "抽样比对")
+        groups = self._refine(groups, lambda p: self.cache.get_or_compute(p, lambda: self._is_cancelled)[0], "计算完整SHA256")
+        return groups
+
+    def _refine(self, groups, key_func, stage):
+        """按 key_func 把每组再细分，丢弃只剩一个文件的分组"""
+        total = sum(len(files) for files in groups)
+        done = 0
+        result = []
+        for files in groups:
+            buckets = {}
+            for path in files:
+                if self._is_cancelled:
+                    return []
+                try:
+                    key = key_func(path)
+                except Exception as e:
+                    print(f"查重读取文件失败: {path}, 错误: {e}")
+                    key = None
+                done += 1
+                self.progress.emit(done, total, stage)
+                if key:
+                    buckets.setdefault(key, []).append(path)
+            result.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+        return result
+
+    def cancel(self):
+        self._is_cancelled = True
+
+class FileOpCancelled(Exception):
+    pass
+
+class FileOpGroup:
+    """一个模型及其全部关联文件的一次操作（move / rename / delete），要么全部完成，要么全部回滚。
+    pairs 为 [(源路径, 目标路径)]，delete 时目标路径为 None；data 供调用方保存更新表格所需的信息"""
+    __slots__ = ("kind", "rec", "pairs", "data", "ok", "error", "done", "devices", "sha256")
+
+    def __init__(self, kind, rec, pairs, data=None):
+        self.kind = kind
+        self.rec = rec
+        self.pairs = pairs
+        self.data = data
+        self.ok = False
+        self.error = ""
+        self.done = []  # 已完成的 (源, 目标)，用于回滚
+        self.devices = None  # 任务开始时解析：跨设备时为 (源设备, 目标设备)，同设备为 None
+        self.sha256 = ""     # 跨设备移动模型时在复制过程中顺带算出的哈希值
+
+class FileOperationEngine(QObject):
+    """文件操作引擎：任务在后台线程中按提交顺序执行，GUI 线程只接收信号。
+    每个任务由若干 FileOpGroup 组成，按字节报告进度，可取消；atomic 任务中任一组失败时回滚整个任务。
+    非 atomic 任务中各组互不依赖，按 (源设备, 目标设备) 分组调度：同设备改名并行执行，跨设备复制每对设备限制并发数"""
+    progress = Signal(int, object, object, str)  # (任务号, 已处理字节, 总字节, 当前文件名)
+    group_finished = Signal(int, object)         # (任务号, FileOpGroup)
+    job_finished = Signal(int, bool)             # (任务号, 是否已取消)
+
+    def __init__(self, parent=None, max_workers=FILE_OP_MAX_WORKERS, copy_workers=FILE_COPY_DEVICE_WORKERS):
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers)
+        self.copy_workers = max(1, copy_workers)
+        self._queue = queue.Queue()
+        self._cancelled = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._trash_lock = threading.Lock()  # 并行删除同目录模型时，回收目录的创建与清理需互斥
+        self.sha256_cache = Sha256Cache()  # 跨设备移动时用于校验和记录哈希，由界面替换为当前目录的缓存
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, groups, atomic=False):
+        self._next_id += 1
+        job_id = self._next_id
+        self._cancelled[job_id] = threading.Event()
+        self._queue.put((job_id, groups, atomic))
+        return job_id
+
+    def cancel(self, job_id):
+        event = self._cancelled.get(job_id)
+        if event:
+            event.set()
+
+    def _run(self):
+        while True:
+            job_id, groups, atomic = self._queue.get()
+            cancelled = self._cancelled[job_id]
+            self._total = 0
+            for group in groups:
+                group.devices = self._device_lane(group)
+                for src, _ in group.pairs:
+                    try:
+                        self._total += os.path.getsize(src)
+                    except OSError:
+                        pass
+            self._done_bytes = 0
+            self._job_id = job_id
+            if atomic:
+                self._run_atomic(job_id, groups, cancelled)
+            else:
+                self._run_scheduled(job_id, groups, cancelled)
+            self.job_finished.emit(job_id, cancelled.is_set())
+            del self._cancelled[job_id]
+
+    def _run_atomic(self, job_id, groups, cancelled):
+        for index, group in enumerate(groups):
+            self._run_group(group, cancelled)
+            if not group.ok:
+                # 整个任务回滚：已完成的组按相反顺序还原
+                for previous in reversed(groups[:index]):
+                    self._rollback(previous)
+                    previous.ok = False
+                    previous.error = previous.error or "已回滚"
+                for later in groups[index + 1:]:
+                    later.error = "已回滚"
+                break
+        for group in groups:
+            self.group_finished.emit(job_id, group)
+
+    def _run_scheduled(self, job_id, groups, cancelled):
+        lanes = {}  # {(源设备, 目标设备) 或 None: deque[FileOpGroup]}，None 表示只需同设备改名
+        for group in groups:
+            lanes.setdefault(group.devices, deque()).append(group)
+        # 跨设备复制耗时长，先占用线程；改名瞬间完成，用剩余线程并行处理
+        order = sorted(lanes, key=lambda lane: lane is None)
+        running = {}  # {future: (lane, FileOpGroup)}
+        per_lane = dict.fromkeys(lanes, 0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                for lane in order:
+                    pending = lanes[lane]
+                    limit = self.max_workers if lane is None else self.copy_workers
+                    while pending and per_lane[lane] < limit and len(running) < self.max_workers:
+                        group = pending.popleft()
+                        running[pool.submit(self._run_group, group, cancelled)] = (lane, group)
+                        per_lane[lane] += 1
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    lane, group = running.pop(future)
+                    per_lane[lane] -= 1
+                    self.group_finished.emit(job_id, group)
+
+    @staticmethod
+    def _device_lane(group):
+        """返回组中第一对跨设备文件的 (源设备, 目标设备)；全部在同一设备上（或是删除操作）时返回 None"""
+        for src, dst in group.pairs:
+            if dst is None:
+                continue
+            try:
+                src_dev = os.stat(src).st_dev
+                dst_dev = os.stat(os.path.dirname(dst) or ".").st_dev
+            except OSError:
+                continue
+            if src_dev != dst_dev:
+                return (src_dev, dst_dev)
+        return None
 
-class Sha256BatchWorker(QThread):  
-    progress_changed = Signal(int, int, str, str, str)
-    finished = Signal(int, int)
+    def _run_group(self, group, cancelled):
+        try:
+            if cancelled.is_set():
+                raise FileOpCancelled()
+            self._execute(group, cancelled)
+            group.ok = True
+        except FileOpCancelled:
+            group.error = "；".join(filter(None, ["已取消", group.error]))
+        except Exception as e:
+            group.error = "；".join(filter(None, [str(e), group.error]))
 
-    def __init__(self, file_list, parent=None):  
-        super().__init__(parent)  
-        self.file_list = file_list
-        self._is_cancelled = False
+    def _execute(self, group, cancelled):
+        pairs = group.pairs
+        if not pairs:
+            return
+        if group.kind == "delete":
+            # 同目录下改名是 O(1) 的，失败时可原样还原
+            trash_dir = self._make_work_dir(os.path.dirname(pairs[0][0]), FILE_TRASH_DIRNAME)
+            try:
+                for src, _ in pairs:
+                    dst = os.path.join(trash_dir, os.path.basename(src))
+                    self._transfer(src, dst, cancelled)
+                    group.done.append((src, dst))
+            except BaseException:
+                self._rollback(group)
+                self._remove_work_dir(trash_dir)
+                raise
+            self._purge(trash_dir, [dst for _, dst in group.done])
+        elif group.devices is None:
+            # 同一设备：逐个 os.rename，与文件大小无关，失败时改名还原
+            try:
+                for src, dst in pairs:
+                    self._transfer(src, dst, cancelled)
+                    group.done.append((src, dst))
+            except BaseException:
+                self._rollback(group)
+                raise
+        else:
+            self._execute_staged(group, cancelled)
 
-    def run(self):  
-        new_count = 0
-        skip_count = 0
-        total = len(self.file_list)
-        for idx, (row, full_path) in enumerate(self.file_list):
-            if self._is_cancelled:
-                break
-            sha_path = os.path.splitext(full_path)[0] + ".sha256"
-            hashv = ""
-            if os.path.exists(sha_path):
+    def _execute_staged(self, group, cancelled):
+        """跨设备移动：整组文件先复制到目标设备上的暂存目录，全部成功后在目标设备内改名提交，
+        再把源文件改名到源目录下的回收目录，最后才删除。任一步失败都会还原，源和目标都不会只剩半组文件。
+        模型文件在复制时顺带计算 SHA256：与已记录的哈希不一致时不提交、保留源文件，一致或没有记录时在目标处写入 .sha256"""
+        staging_dirs = {}  # {目标目录: 暂存目录}
+        staged = []        # [(源, 暂存路径, 目标)]，源为 None 表示新生成的 .sha256
+        digests = []       # [(源, 目标, 复制时算出的哈希)]
+        trashed = []       # [(源, 回收路径)]
+        trash_dir = None
+        try:
+            for src, dst in group.pairs:
+                if os.path.exists(dst):
+                    raise FileExistsError(f"目标文件已存在: {dst}")
+                dst_dir = os.path.dirname(dst)
+                if dst_dir not in staging_dirs:
+                    staging_dirs[dst_dir] = self._make_work_dir(dst_dir, FILE_STAGING_DIRNAME)
+                tmp = os.path.join(staging_dirs[dst_dir], os.path.basename(dst))
+                is_model = group.kind == "move" and os.path.splitext(src)[1].lower() in EXTS["supported"]
+                h = hashlib.sha256() if is_model else None
+                self._copy(src, tmp, cancelled, h)
+                staged.append((src, tmp, dst))
+                if h is not None:
+                    digests.append((src, dst, h.hexdigest()))
+            if cancelled.is_set():
+                raise FileOpCancelled()
+            for src, dst, hashv in digests:
+                self._stage_sha256(src, dst, hashv, staged, staging_dirs)
+            # 提交：暂存目录与目标在同一设备上，改名瞬间完成
+            for src, tmp, dst in staged:
+                if os.path.exists(dst):
+                    raise FileExistsError(f"目标文件已存在: {dst}")
+                os.rename(tmp, dst)
+                group.done.append((src, dst))
+            trash_dir = self._make_work_dir(os.path.dirname(group.pairs[0][0]), FILE_TRASH_DIRNAME)
+            for src, _, _ in staged:
+                if src is None:
+                    continue
+                path = os.path.join(trash_dir, os.path.basename(src))
+                os.rename(src, path)
+                trashed.append((src, path))
+        except BaseException:
+            errors = []
+            for src, path in reversed(trashed):
                 try:
-                    with open(sha_path, 'r') as f:
-                        exist_hash = f.read().strip()
+                    os.rename(path, src)
+                except OSError as e:
+                    errors.append(f"{path}: {e}")
+                    trash_dir = None  # 保留回收目录，源文件仍可从中找回
+            if errors:
+                # 有源文件没能从回收目录还原：已提交到目标处的文件是唯一完整的副本，不能删除
+                group.error = f"还原失败: {'; '.join(errors)}；已保留目标处的文件"
+                committed = {dst for _, dst in group.done}
+                self._purge(None, [tmp for _, tmp, dst in staged if dst not in committed])
+            else:
+                self._purge(None, [dst for _, dst in group.done] + [tmp for _, tmp, _ in staged])
+                group.done = []
+            if trash_dir:
+                self._remove_work_dir(trash_dir)
+            for staging_dir in staging_dirs.values():
+                self._remove_work_dir(staging_dir)
+            raise
+        for staging_dir in staging_dirs.values():
+            self._remove_work_dir(staging_dir)
+        self._purge(trash_dir, [path for _, path in trashed])
+        for _, dst, hashv in digests:
+            self.sha256_cache.store(dst, hashv)
+            group.sha256 = hashv
+
+    def _stage_sha256(self, src, dst, hashv, staged, staging_dirs):
+        """用复制时算出的哈希校验源文件已记录的哈希（缓存或 .sha256），并在暂存目录中写好目标的 .sha256"""
+        expected = self.sha256_cache.lookup(src)
+        if expected and expected.lower() != hashv:
+            raise OSError(f"SHA256 校验失败，已保留源文件: {os.path.basename(src)}（记录 {expected}，复制时读到 {hashv}）")
+        sha_src = os.path.normcase(os.path.splitext(src)[0] + ".sha256")
+        sha_dst = os.path.splitext(dst)[0] + ".sha256"
+        for s, tmp, _ in staged:
+            if s and os.path.normcase(s) == sha_src:
+                break
+        else:
+            if os.path.exists(sha_dst):
+                raise FileExistsError(f"目标文件已存在: {sha_dst}")
+            tmp = os.path.join(staging_dirs[os.path.dirname(dst)], os.path.basename(sha_dst))
+            staged.append((None, tmp, sha_dst))
+        # 总是重写：内容与模型一致，且修改时间不早于模型，目标处的哈希缓存可直接采信
+        with open(tmp, 'w') as f:
+            f.write(hashv)
 
-                    if len(exist_hash) == 64 and all(c in "0123456789abcdefABCDEF" for c in exist_hash):
-                        hashv = exist_hash
+    def _make_work_dir(self, parent, name):
+        """在 parent 下创建 name/<随机名> 临时目录（与 parent 同设备，改名进出都是 O(1)）"""
+        path = os.path.join(parent, name, uuid.uuid4().hex)
+        with self._trash_lock:
+            os.makedirs(path)
+        return path
 
-                        self.progress_changed.emit(idx+1, total, hashv[:10], hashv, os.path.basename(full_path))
-                        skip_count += 1
-                        continue
-                except Exception:
-                    self.log(f"读取现有哈希值失败: {sha_path}, 错误: {e}")
+    def _remove_work_dir(self, work_dir):
+        with self._trash_lock:
+            for path in (work_dir, os.path.dirname(work_dir)):
+                try:
+                    os.rmdir(path)
+                except OSError:
                     pass
-            hashv = self.calc_sha256(full_path)
+
+    def _purge(self, work_dir, paths):
+        """删除已移出原位置的文件；此时操作已完成，删除失败只会在临时目录中留下残余文件"""
+        for path in paths:
             try:
-                with open(sha_path, 'w') as f:
-                    f.write(hashv)
-            except Exception:
-                hashv = ""
-            self.progress_changed.emit(idx+1, total, hashv[:10], hashv, os.path.basename(full_path))
-            new_count += 1
-        self.finished.emit(new_count, skip_count)
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"删除临时文件失败: {path}，原因: {e}")
+        if work_dir:
+            self._remove_work_dir(work_dir)
 
-    def calc_sha256(self, filepath):  
-        h = hashlib.sha256()
+    def _rollback(self, group):
+        errors = []
+        for src, dst in reversed(group.done):
+            try:
+                if src is None:
+                    os.remove(dst)  # 操作中新生成的文件
+                elif os.path.exists(dst):
+                    self._transfer(dst, src, None)
+            except Exception as e:
+                errors.append(f"{dst}: {e}")
+        group.done = []
+        if errors:
+            group.error = f"{group.error}；回滚失败: {'; '.join(errors)}" if group.error else f"回滚失败: {'; '.join(errors)}"
+
+    def _report(self, nbytes, name):
+        with self._lock:
+            self._done_bytes += nbytes
+            done = self._done_bytes
+        self.progress.emit(self._job_id, done, self._total, name)
+
+    def _transfer(self, src, dst, cancelled):
+        """与 shutil.move 相同：能改名就改名，否则分块复制后删除源文件（仅用于回滚和同设备组中的个别跨设备文件）"""
+        if os.path.exists(dst):
+            raise FileExistsError(f"目标文件已存在: {dst}")
+        size = os.path.getsize(src)
         try:
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            return h.hexdigest()
-        except PermissionError:
-            self.log(f"权限不足，无法读取文件: {filepath}")
-            return ""
-        except Exception as e:
-            self.log(f"读取文件出错: {filepath}，原因: {e}")
-            return ""
+            os.rename(src, dst)
+            if cancelled is not None:
+                self._report(size, os.path.basename(src))
+            return
+        except OSError:
+            pass
+        self._copy(src, dst, cancelled)
+        os.remove(src)
+
+    def _copy(self, src, dst, cancelled, h=None):
+        """分块复制并按字节报告进度，h 不为空时用读入的数据同时更新哈希；中途取消或失败会删除不完整的目标文件"""
+        created = False
+        try:
+            with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+                created = True
+                buf = bytearray(FILE_COPY_CHUNK_SIZE)
+                view = memoryview(buf)
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise FileOpCancelled()
+                    n = fsrc.readinto(buf)
+                    if not n:
+                        break
+                    fdst.write(view[:n])
+                    if h is not None:
+                        h.update(view[:n])
+                    if cancelled is not None:
+                        self._report(n, os.path.basename(src))
+            shutil.copystat(src, dst)
+        except BaseException:
+            if created:
+                try:
+                    os.remove(dst)
+                except OSError:
+                    pass
+            raise
+
+class ParallelDirScanner:
+    """基于 os.scandir 的并行目录遍历：子目录在有界线程池中并发扫描，大小/修改时间直接取自 DirEntry.stat()。
+    sidecar_exts 中扩展名的文件也记录 stat，供调用方判断关联文件是否变化"""
+    def __init__(self, root, exts, max_workers=SCAN_MAX_WORKERS, batch_size=SCAN_BATCH_SIZE, sidecar_exts=()):
+        self.root = root
+        self.exts = set(exts)
+        self.sidecar_exts = set(sidecar_exts)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._is_cancelled = False
+        self._results = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
 
     def cancel(self):
         self._is_cancelled = True
 
-class SingleSha256Worker(QThread):  
-    finished = Signal(str, str)
+    def _submit(self, executor, path):
+        # 取消后 scan() 会关闭线程池，不再提交新目录
+        if self._is_cancelled:
+            return
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            executor.submit(self._scan_dir, executor, path)
+        except RuntimeError:
+            # 检查与提交之间线程池已关闭：这个目录不会再放入结果
+            with self._pending_lock:
+                self._pending -= 1
 
-    def __init__(self, full_path, filename, parent=None):
-        super().__init__(parent)
-        self.full_path = full_path
-        self.filename = filename
+    def _scan_dir(self, executor, path):
+        found = []
+        names = {}
+        sidecar_stats = {}  # {normcase(文件名): stat结果}
+        try:
+            if not self._is_cancelled:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in (FILE_TRASH_DIRNAME, FILE_STAGING_DIRNAME):
+                                    self._submit(executor, entry.path)
+                                continue
+                        except OSError:
+                            continue
+                        names[os.path.normcase(entry.name)] = entry.name
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if ext in self.exts:
+                            try:
+                                st = entry.stat()
+                            except OSError:
+                                st = None
+                            found.append((entry.name, st))
+                        elif ext in self.sidecar_exts:
+                            try:
+                                sidecar_stats[os.path.normcase(entry.name)] = entry.stat()
+                            except OSError:
+                                pass
+        except OSError:
+            pass
+        finally:
+            # 每个目录只放入一条消息（出错时也一样），消费端据此统计未完成的目录数
+            self._results.put((path, found, names, sidecar_stats))
 
-    def run(self):  
-        import hashlib  
-        h = hashlib.sha256()
+    def scan(self):
+        """生成器：按批返回 [(目录, 文件名, stat结果, 目录内文件名映射, 关联文件stat映射)]，遍历仍在进行时即可消费"""
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            with open(self.full_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            hashv = h.hexdigest()
-        except Exception:
-            hashv = ""
-        self.finished.emit(hashv, self.filename)
+            self._submit(executor, self.root)
+            batch = []
+            while True:
+                with self._pending_lock:
+                    if self._pending == 0:
+                        break
+                path, found, names, sidecar_stats = self._results.get()
+                with self._pending_lock:
+                    self._pending -= 1
+                if self._is_cancelled:
+                    continue
+                for name, st in found:
+                    batch.append((path, name, st, names, sidecar_stats))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch and not self._is_cancelled:
+                yield batch
+        finally:
+            self._is_cancelled = True
+            executor.shutdown(wait=False)
 
 class ScanWorker(QThread):  
     progress = Signal(int, int, str)
-    finished = Signal(list, list)
+    batch_ready = Signal(list)
+    finished = Signal(bool)
 
-    def __init__(self, model_dir):
+    def __init__(self, model_dir, catalog=None, sidecars=None, sha256_cache=None):
         super().__init__()
         self.model_dir = model_dir
+        self.catalog = catalog
+        self.sidecars = sidecars
+        self.sha256_cache = sha256_cache or Sha256Cache(catalog)
         self._is_cancelled = False  
+        self.stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+
+    @staticmethod
+    def find_preview_in_names(root, base_name, names):
+        """在目录文件名集合中查找预览图（names 为 {normcase(文件名): 文件名}），不产生磁盘IO"""
+        for ext in PREVIEW_IMAGE_EXTS:
+            name = names.get(os.path.normcase(base_name + ext))
+            if name:
+                return os.path.join(root, name)
+        return None
+
+    @staticmethod
+    def read_notes_in_names(root, base_name, names):
+        """读取备注 JSON 中的描述、笔记、VAE 文本（用于搜索）"""
+        name = names.get(os.path.normcase(base_name + ".json"))
+        if not name:
+            return ""
+        try:
+            with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return "\n".join(str(data.get(k, "")) for k in ("description", "notes", "vae"))
+        except Exception:
+            return ""
+
+    def notes_for(self, root, base_name, names, sidecar_stats, cached_notes, notes_updates):
+        """备注文本：.json 的大小和修改时间与索引中一致时直接复用，否则重新读取并记入 notes_updates"""
+        key = os.path.normcase(base_name + ".json")
+        name = names.get(key)
+        st = sidecar_stats.get(key)
+        if not name or st is None:
+            return ""
+        json_path = os.path.join(root, name)
+        self._seen_notes.add(json_path)
+        fingerprint = (st.st_size, st.st_mtime_ns)
+        entry = cached_notes.get(json_path)
+        if entry and tuple(entry[:2]) == fingerprint:
+            return entry[2]
+        notes = self.read_notes_in_names(root, base_name, names)
+        notes_updates.append((json_path, *fingerprint, notes))
+        return notes
 
     def run(self):  
-        files_to_scan = []
-        for root, _, files in os.walk(self.model_dir):
-            for f in files:
+        cached = {}
+        cached_notes = {}
+        if self.catalog:
+            try:
+                cached = self.catalog.load_all()
+                cached_notes = self.catalog.load_notes()
+            except Exception as e:
+                print(f"读取模型索引失败: {e}")
+        self._seen_notes = set()
+        self.scanner = ParallelDirScanner(self.model_dir, SUPPORTED_EXTS, sidecar_exts=(".json",))
+        seen_paths = set()
+        idx = 0
+        classifier = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS)
+        for batch in self.scanner.scan():
+            scan_results = []
+            catalog_updates = []
+            notes_updates = []
+            # 新增或变更的文件需要读取文件头识别类型，先在线程池中并行提交
+            classified = {}
+            for root, f, st, names, _ in batch:
+                full_path = os.path.join(root, f)
+                record = cached.get(full_path)
+                if st is None or not record or tuple(record[:3]) != (st.st_size, st.st_mtime_ns, st.st_ino):
+                    classified[full_path] = classifier.submit(classify_model_file, full_path)
+            for root, f, st, names, sidecar_stats in batch:
                 if self._is_cancelled:
-                    self.finished.emit([], [])
-                    return
-                ext = os.path.splitext(f)[1].lower()
-                if ext in SUPPORTED_EXTS:
-                    files_to_scan.append((root, f))
-        scan_results = []
-        filenames = []
-        total = len(files_to_scan)
-        for idx, (root, f) in enumerate(files_to_scan):
+                    break
+                full_path = os.path.join(root, f) 
+                base_name = os.path.splitext(f)[0]
+                seen_paths.add(full_path)
+                if self.sidecars:
+                    self.sidecars.seed(root, names)
+                if st is not None:
+                    size_bytes = st.st_size
+                    size_str = ModelClassifierGUI.format_file_size_static(st.st_size)
+                    fingerprint = (st.st_size, st.st_mtime_ns, st.st_ino)
+                else:
+                    size_bytes = -1
+                    size_str = "N/A"
+                    fingerprint = None
+                # 哈希值经 Sha256Cache 校验：缓存按 size/mtime/inode 命中，或 .sha256 不早于模型文件才采信
+                has_sha = os.path.normcase(base_name + ".sha256") in names
+                sha256_val = self.sha256_cache.lookup(full_path, st, check_sidecar=has_sha) if st is not None else ""
+                record = cached.get(full_path)
+                if fingerprint and record and tuple(record[:3]) == fingerprint:
+                    # 未变更：直接复用索引中的类型和版本
+                    m_type, m_ver = record[3], record[4]
+                    m_quant, m_params = record[6] or "", record[7] or 0
+                    if sha256_val != (record[5] or ""):
+                        catalog_updates.append((full_path, *fingerprint, m_type, m_ver, sha256_val, m_quant, m_params))
+                    self.stats["unchanged"] += 1
+                else:
+                    m_type, m_ver, m_quant, m_params = classified[full_path].result()
+                    if fingerprint:
+                        catalog_updates.append((full_path, *fingerprint, m_type, m_ver, sha256_val, m_quant, m_params))
+                    self.stats["changed" if record else "added"] += 1
+                preview_path = self.find_preview_in_names(root, base_name, names)
+                notes = self.notes_for(root, base_name, names, sidecar_stats, cached_notes, notes_updates)
+                scan_results.append((full_path, f, m_type, m_ver, size_bytes, size_str, sha256_val, preview_path, m_quant, m_params, notes))
+                idx += 1
             if self._is_cancelled:
-                self.finished.emit([], [])
-                return
-            full_path = os.path.join(root, f) 
-            m_type = ModelClassifierGUI.detect_model_type_static(f)
-            m_ver = ModelClassifierGUI.detect_model_version_static(f) 
+                break
+            if self.catalog:
+                try:
+                    self.catalog.upsert_many(catalog_updates)
+                    self.catalog.upsert_notes_many(notes_updates)
+                except Exception as e:
+                    print(f"写入模型索引失败: {e}")
+            # 每批结果立即交给界面追加，不在工作线程中累积完整列表
+            self.batch_ready.emit(scan_results)
+            # 遍历尚未结束，总数未知：按批汇报已发现的数量
+            self.progress.emit(idx, 0, batch[-1][1])
+        classifier.shutdown(cancel_futures=True)
+        if self._is_cancelled:
+            self.finished.emit(True)
+            return
+        if self.catalog:
+            removed = [p for p in cached if p not in seen_paths]
+            self.stats["removed"] = len(removed)
             try:
-                size_bytes = os.path.getsize(full_path)
-                size_str = ModelClassifierGUI.format_file_size_static(size_bytes)
+                self.catalog.remove_many(removed)
+                self.catalog.remove_notes_many([p for p in cached_notes if p not in self._seen_notes])
             except Exception as e:
-                self.log(f"获取文件大小失败: {full_path}, 错误: {e}")
-                size_str = "N/A"
-            scan_results.append((full_path, f, m_type, m_ver, size_str, idx))
-            filenames.append(f)
-            self.progress.emit(idx+1, total, f)
-        self.finished.emit(scan_results, filenames)
+                print(f"写入模型索引失败: {e}")
+        self.finished.emit(False)
 
     def cancel(self):
         self._is_cancelled = True
+        if getattr(self, "scanner", None):
+            self.scanner.cancel()
+
+class GifDecodeSignals(QObject):
+    frame_ready = Signal(int, QImage, int)  # (解码序号, 已缩放的帧, 显示毫秒数)
+    finished = Signal(int, bool)            # (解码序号, 是否至少解出一帧)
+
+def iter_gif_frames(path, max_size, budget, cancelled=None, disk_cache=None, key=None):
+    """逐帧产出已缩放的 (QImage, 毫秒)。优先读取缩略图缓存数据库中的帧；否则用 QImageReader 直接从文件
+    读取并缩放，帧总大小达到预算后停止，读完即关闭文件。解码结束（读到最后一帧或达到预算截断）后写回缓存数据库，
+    截断结果与重新解码得到的相同，可直接复用；中途取消时不写回"""
+    if disk_cache and key:
+        try:
+            blob = disk_cache.get(key)
+        except Exception as e:
+            print(f"读取动图帧缓存失败: {path}, 错误: {e}")
+            blob = None
+        if blob:
+            yield from GifFrameCache.unpack(blob)
+            return
+    decoded = []
+    reader = QImageReader(path)
+    size = reader.size()
+    if size.isValid() and (size.width() > max_size or size.height() > max_size):
+        reader.setScaledSize(size.scaled(max_size, max_size, Qt.KeepAspectRatio))
+    used = 0
+    while used < budget and not (cancelled and cancelled.is_set()):
+        image = reader.read()
+        if image.isNull():
+            break
+        delay = reader.nextImageDelay()
+        delay = delay if delay > 0 else 100
+        decoded.append((image, delay))
+        used += image.sizeInBytes()
+        yield image, delay
+    del reader  # 释放文件句柄
+    if decoded and disk_cache and key and not (cancelled and cancelled.is_set()):
+        try:
+            disk_cache.put(key, GifFrameCache.pack(decoded))
+        except Exception as e:
+            print(f"写入动图帧缓存失败: {path}, 错误: {e}")
+
+class GifDecodeTask(QRunnable):
+    """后台逐帧解码动图，每解出一帧就发给 GifPlayer，边解码边播放"""
+    def __init__(self, token, path, max_size, budget, signals, cancelled, disk_cache=None, key=None):
+        super().__init__()
+        self.token = token
+        self.path = path
+        self.max_size = max_size
+        self.budget = budget
+        self.signals = signals
+        self.cancelled = cancelled
+        self.disk_cache = disk_cache
+        self.key = key
+
+    def run(self):
+        frames = 0
+        try:
+            for image, delay in iter_gif_frames(self.path, self.max_size, self.budget, self.cancelled,
+                                                self.disk_cache, self.key):
+                self.signals.frame_ready.emit(self.token, image, delay)
+                frames += 1
+        finally:
+            self.signals.finished.emit(self.token, frames > 0)
+
+class GifFrameCache:
+    """已缩放动图帧序列的 LRU 缓存：{键: ([(QPixmap, 毫秒)], 字节数)}，只在 GUI 线程访问。
+    disk_cache 不为空时，GifDecodeTask 还会把完整帧序列以 PNG 形式存入缩略图缓存数据库的 gif_frames 表"""
+    def __init__(self, budget=GIF_CACHE_MEMORY_BUDGET):
+        self.budget = budget
+        self.disk_cache = None
+        self._frames = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def make_key(path, max_size):
+        key = ThumbnailDiskCache.make_key(path)
+        return f"gif|{key}|{max_size}" if key else None
+
+    def get(self, key):
+        entry = self._frames.get(key)
+        if entry is None:
+            return None
+        self._frames.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, frames):
+        nbytes = sum(p.width() * p.height() * 4 for p, _ in frames)
+        if nbytes > self.budget:
+            return
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._frames[key] = (list(frames), nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.budget:
+            _, (_, evicted) = self._frames.popitem(last=False)
+            self._bytes -= evicted
+
+    def keys(self):
+        return set(self._frames)
+
+    def clear(self):
+        self._frames.clear()
+        self._bytes = 0
+
+    @staticmethod
+    def pack(frames):
+        """[(QImage, 毫秒)] -> 二进制：每帧为 <毫秒, 长度> 加 PNG 数据"""
+        parts = []
+        for image, delay in frames:
+            buffer = QBuffer()
+            buffer.open(QIODevice.WriteOnly)
+            image.save(buffer, "PNG")
+            data = bytes(buffer.data())
+            parts.append(struct.pack("<II", delay, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @staticmethod
+    def unpack(blob):
+        frames = []
+        pos = 0
+        while pos + 8 <= len(blob):
+            delay, length = struct.unpack_from("<II", blob, pos)
+            pos += 8
+            image = QImage()
+            image.loadFromData(blob[pos:pos + length], "PNG")
+            pos += length
+            frames.append((image, delay))
+        return frames
 
 class GifPlayer(QLabel):
-    def __init__(self, gif_path: str, parent=None):
+    """动图播放：帧由 GifDecodeTask 在后台解码，边解码边播放，用 QTimer 按帧时长切换。
+    target 为实际显示帧的标签（默认是自身）"""
+    failed = Signal(str)
+
+    def __init__(self, gif_path=None, parent=None, target=None, max_size=GIF_PREVIEW_SIZE, cache=None):
         super().__init__(parent)
         self.setAlignment(Qt.AlignCenter)
-        self.byte_array = None
-        self.buffer = None
-        self.movie = None
-        self.set_gif(gif_path)
+        self.target = target if target is not None else self
+        self.cache = cache
+        self._cache_key = None
+        if target is not None:
+            self.hide()
+        self.max_size = max_size
+        self.path = ""
+        self.frames = []  # [(QPixmap, 毫秒)]
+        self._index = 0
+        self._token = 0
+        self._cancelled = None
+        self._decoding = False
+        self._waiting = False  # 已播放到最后一帧，等待后续帧解码
+        self._signals = GifDecodeSignals()  # 不设父对象，后台任务持有引用，播放器销毁后也可安全发射
+        self._signals.frame_ready.connect(self._on_frame)
+        self._signals.finished.connect(self._on_finished)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._next_frame)
+        if gif_path:
+            self.set_gif(gif_path)
 
     def set_gif(self, gif_path):
-        # 先安全释放旧资源
-        self._release_movie()
-        from PySide6.QtGui import QImageReader
-        reader = QImageReader(gif_path)
-        size = reader.size()
-        width, height = size.width(), size.height()
-        max_width, max_height = 240, 240
-        w, h = width, height
-        if h > max_height:
-            w = int(w * max_height / h)
-            h = max_height
-        if w > max_width:
-            h = int(h * max_width / w)
-            w = max_width
+        self.release()
+        self.path = gif_path
+        self._cache_key = GifFrameCache.make_key(gif_path, self.max_size) if self.cache else None
+        frames = self.cache.get(self._cache_key) if self._cache_key else None
+        if frames:
+            # 命中内存缓存：直接播放，不再解码
+            self.frames = list(frames)
+            self._show_frame(0)
+            return
+        self._cancelled = threading.Event()
+        self._decoding = True
+        disk_cache = self.cache.disk_cache if self._cache_key else None
+        QThreadPool.globalInstance().start(
+            GifDecodeTask(self._token, gif_path, self.max_size, GIF_FRAME_BUDGET, self._signals, self._cancelled,
+                          disk_cache, self._cache_key))
 
-        try:
-            with open(gif_path, "rb") as f:
-                gif_data = f.read()
-            self.byte_array = QByteArray(gif_data)
-            self.buffer = QBuffer(self.byte_array)
-            self.buffer.open(QIODevice.ReadOnly)
-            self.movie = QMovie(self.buffer)
-            self.movie.setScaledSize(QSize(w, h))
-            if not self.movie.isValid():
-                self.setText("GIF加载失败")
-                self.movie = None
-            else:
-                self.setMovie(self.movie)
-                self.movie.start()
-                self.repaint()  # 关键：强制刷新
-        except Exception as e:
-            self.setText("GIF加载失败")
-            self.movie = None
+    def release(self):
+        """停止播放并丢弃帧；正在进行的解码会被取消，其结果按序号忽略"""
+        self._token += 1
+        if self._cancelled is not None:
+            self._cancelled.set()
+            self._cancelled = None
+        self._timer.stop()
+        self.frames = []
+        self._index = 0
+        self._decoding = False
+        self._waiting = False
 
-    def _release_movie(self):
-        # 断开 QLabel 和 QMovie 的绑定，安全释放
-        try:
-            self.setMovie(None)
-            if self.movie:
-                self.movie.stop()
-                self.movie.deleteLater()
-                self.movie = None
-            if self.buffer:
-                self.buffer.close()
-                self.buffer.deleteLater()
-                self.buffer = None
-            self.byte_array = None
-        except Exception:
-            pass
+    def _show_frame(self, index):
+        self._index = index
+        pixmap, delay = self.frames[index]
+        self.target.setPixmap(pixmap)
+        self._timer.start(delay)
+
+    def _on_frame(self, token, image, delay):
+        if token != self._token:
+            return
+        self.frames.append((QPixmap.fromImage(image), delay))
+        if len(self.frames) == 1 or self._waiting:
+            self._waiting = False
+            self._show_frame(len(self.frames) - 1)
+
+    def _on_finished(self, token, ok):
+        if token != self._token:
+            return
+        self._decoding = False
+        if not ok:
+            self.target.setText("GIF加载失败")
+            self.failed.emit(self.path)
+            return
+        if self._cache_key:
+            self.cache.put(self._cache_key, self.frames)
+        # 播放已追上解码进度时，解码结束后从第一帧重新开始循环
+        if self._waiting and len(self.frames) > 1:
+            self._waiting = False
+            self._show_frame(0)
+
+    def _next_frame(self):
+        if self._index + 1 < len(self.frames):
+            self._show_frame(self._index + 1)
+        elif self._decoding:
+            self._waiting = True
+        elif len(self.frames) > 1:
+            self._show_frame(0)
 
     def closeEvent(self, event):
-        self._release_movie()
+        self.release()
         super().closeEvent(event)
 
+def load_preview_bundle(base, sidecars, disk_cache=None, cached_gif_keys=()):
+    """读取右侧面板显示一个模型所需的全部内容（在后台线程调用）：已缩放的静态预览图及原始尺寸、
+    动态预览帧、合并 civitai.info 后的备注。SHA256 不在此读取，由 Sha256Cache 校验。files 记录读过的文件 {路径: (mtime_ns, 大小)}，用于判断是否过期"""
+    bundle = {"files": {}, "static": [], "dynamic": None, "notes": None}
+
+    def stat(path):
+        st = os.stat(path)
+        bundle["files"][path] = (st.st_mtime_ns, st.st_size)
+        return st.st_size
+
+    for path in sidecars.existing(base, STATIC_PREVIEW_IMAGE_EXTS):
+        file_size = stat(path)
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(240, 240, Qt.KeepAspectRatio))
+        bundle["static"].append((path, reader.read(), size.width(), size.height(), file_size))
+    gif_path = sidecars.first(base, DYNAMIC_PREVIEW_IMAGE_EXTS)
+    if gif_path:
+        file_size = stat(gif_path)
+        size = QImageReader(gif_path).size()
+        key = GifFrameCache.make_key(gif_path, GIF_PREVIEW_SIZE)
+        frames = None
+        if key and key not in cached_gif_keys:
+            frames = list(iter_gif_frames(gif_path, GIF_PREVIEW_SIZE, GIF_FRAME_BUDGET, None, disk_cache, key))
+        bundle["dynamic"] = (gif_path, size.width(), size.height(), file_size, key, frames)
+    try:
+        civitai_path = base + ".civitai.info"
+        civitai_info = {}
+        if sidecars.exists(civitai_path):
+            stat(civitai_path)
+            with open(civitai_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            civitai_info = {
+                "description": info.get("model", {}).get("description", ""),
+                "vae": info.get("model", {}).get("vae", "")
+            }
+        json_path = base + ".json"
+        if sidecars.exists(json_path):
+            stat(json_path)
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.update({k: v for k, v in civitai_info.items() if v})
+        else:
+            data = civitai_info
+        bundle["notes"] = data
+    except Exception:
+        pass  # 留给 load_model_info 重新读取并记录错误
+    return bundle
+
+class PreviewPrefetchSignals(QObject):
+    loaded = Signal(str, object)  # (模型 base 路径, 预取结果或 None)
+
+class PreviewPrefetchTask(QRunnable):
+    def __init__(self, base, sidecars, signals, disk_cache=None, cached_gif_keys=()):
+        super().__init__()
+        self.base = base
+        self.sidecars = sidecars
+        self.signals = signals
+        self.disk_cache = disk_cache
+        self.cached_gif_keys = cached_gif_keys
+
+    def run(self):
+        try:
+            bundle = load_preview_bundle(self.base, self.sidecars, self.disk_cache, self.cached_gif_keys)
+        except Exception as e:
+            print(f"预取预览失败: {self.base}, 错误: {e}")
+            bundle = None
+        self.signals.loaded.emit(self.base, bundle)
+
 class ModelClassifierGUI(QMainWindow):
     refresh_preview_signal = Signal()
     def __init__(self):
@@ -609,8 +2841,26 @@ class ModelClassifierGUI(QMainWindow):
         self.resize(1400, 800)
         self.model_dir = ""
         self.current_json_path = ""
-        self.scan_results = []
-        self.rename_history = {}  # 记录 {row: (old_base, new_base, ext, dir_path)}
+        self.current_record = None
+        self.sha256_cache = Sha256Cache()
+        self.sidecars = SidecarIndex()
+        self.json_writer = JsonWriteBehind(parent=self)
+        self.json_writer.written.connect(self._on_json_written)
+        self.json_writer.failed.connect(lambda path, err: self.log(f"保存JSON失败: {os.path.basename(path)} {err}"))
+        self.gif_cache = GifFrameCache()
+        self.file_ops = FileOperationEngine(self)
+        self.file_ops.sha256_cache = self.sha256_cache
+        self.file_ops.progress.connect(self._on_file_progress)
+        self.file_ops.group_finished.connect(self._on_file_group_finished)
+        self.file_ops.job_finished.connect(self._on_file_job_finished)
+        self._file_jobs = {}  # {任务号: (进度框, 标题, 每组完成回调, 任务完成回调, 组列表)}
+        self.preview_cache = OrderedDict()  # {模型 base 路径: 预取结果}，见 load_preview_bundle
+        self._prefetch_pending = set()
+        self._prefetch_pool = QThreadPool(self)
+        self._prefetch_pool.setMaxThreadCount(PREVIEW_PREFETCH_WORKERS)
+        self._prefetch_signals = PreviewPrefetchSignals()
+        self._prefetch_signals.loaded.connect(self._on_preview_prefetched)
+        self.rename_history = {}  # 记录 {record: (old_base, new_base, ext, dir_path)}
         self.filter_text = "" 
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -631,14 +2881,19 @@ class ModelClassifierGUI(QMainWindow):
         self.batch_sha256_btn.clicked.connect(self.generate_sha256_batch)
         self.dup_btn = QPushButton("查找重复模型")
         self.dup_btn.setEnabled(False)
-        self.dup_btn.clicked.connect(self.check_duplicates_with_sha256_check)
+        self.dup_btn.clicked.connect(self.check_duplicates)
         self.del_empty_json_btn = QPushButton("删除空白json")
         self.del_empty_json_btn.setEnabled(False)
         self.del_empty_json_btn.clicked.connect(self.delete_empty_json_files)
         self.search_label = QLabel("搜索:")
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("输入模型名称or哈希值...")
-        self.search_box.textChanged.connect(self.filter_table)
+        # 输入停顿后再过滤，连续输入时不逐键刷新表格
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._filter_timer.timeout.connect(lambda: self.filter_table(self.search_box.text()))
+        self.search_box.textChanged.connect(lambda _: self._filter_timer.start())
         for btn in [self.select_dir_btn, self.scan_btn, self.export_btn, self.batch_sha256_btn, self.dup_btn, self.del_empty_json_btn]:
             top_bar.addWidget(btn)
         top_bar.addWidget(self.path_label)
@@ -646,8 +2901,9 @@ class ModelClassifierGUI(QMainWindow):
         top_bar.addWidget(self.search_label)
         top_bar.addWidget(self.search_box)
         splitter = QSplitter(Qt.Orientation.Horizontal)
-        self.table = ModelTableWidget()
-        self.table.cellDoubleClicked.connect(self._on_table_cell_double_clicked)
+        self.table = ModelTableView()
+        self.table_model = self.table.model_data
+        self.table.doubleClicked.connect(self._on_table_double_clicked)
         self.table.customContextMenuRequested.connect(self.show_context_menu) 
         self.preview_area = QWidget() 
         preview_layout = QVBoxLayout()
@@ -745,6 +3001,7 @@ class ModelClassifierGUI(QMainWindow):
         self.search_box.setCompleter(self.completer)  
         self.stats_label = QLabel("日志：") 
         main_layout.addWidget(self.stats_label)
+        self.table_model.stats_changed.connect(self.update_stats)
         self.log_output = QTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setFixedHeight(120)
@@ -754,8 +3011,8 @@ class ModelClassifierGUI(QMainWindow):
         self._start_preview_watcher()
         # 连接自定义信号，文件变化时刷新预览区和表格缩略图
         self.refresh_preview_signal.connect(self.refresh_preview_and_table)
-        # 连接表格点击信号，点击行时加载对应模型信息到右侧预览区
-        self.table.cellClicked.connect(self.load_model_info)
+        # 当前行变化（点击或方向键）时加载对应模型信息到右侧预览区
+        self.table.selectionModel().currentRowChanged.connect(self._on_current_row_changed)
         # 备注、说明、VAE输入框内容变化时自动保存到JSON
         self.description_input.textChanged.connect(self.auto_save_json)
         self.notes_input.textChanged.connect(self.auto_save_json)
@@ -807,27 +3064,26 @@ class ModelClassifierGUI(QMainWindow):
             self._first_show = False
             QTimer.singleShot(100, self.select_model_directory)  # 延迟弹出，保证主窗口已显示
         
-    def _on_table_cell_double_clicked(self, row, col):
-    # 只允许双击“文件名”列（索引1）重命名
-        if col == 1:
-            self.rename_model(row)
+    def _on_table_double_clicked(self, index):
+        # 只允许双击“文件名”列（索引1）重命名
+        if index.column() == 1:
+            self.rename_model(self.table.record_at(index))
+
+    def _on_current_row_changed(self, current, previous):
+        self.json_writer.flush()
+        self.load_model_info(self.table.record_at(current))
         
     def update_row_by_path(self, old_path, new_name):
         """根据原始完整路径，刷新表格中对应行的文件名和相关信息"""
-        for row in range(self.table.rowCount()):
-            orig_path = self.table.item(row, 3).text()
-            filename = self.table.item(row, 1).text()
-            full_path = os.path.join(orig_path, filename)
-            if os.path.normcase(os.path.normpath(full_path)) == os.path.normcase(os.path.normpath(old_path)):
-                # 更新文件名
-                self.table.setItem(row, 1, QTableWidgetItem(new_name))
-                # 如有其它需要同步的列，也可在这里更新
-                break
+        rec = self.table.find_record(old_path)
+        if rec:
+            rec.filename = new_name
+            self.table_model.record_changed(rec)
 
     def delete_static_preview(self):
         """删除当前选中模型的静态预览图（当前显示的那张）"""
-        row = self.table.currentRow()
-        if row < 0:
+        rec = self.table.current_record()
+        if rec is None:
             QMessageBox.information(self, "提示", "请先选中一个模型")
             return
         # 只删除当前显示的那张
@@ -837,20 +3093,10 @@ class ModelClassifierGUI(QMainWindow):
             if reply == QMessageBox.Yes:
                 try:
                     os.remove(path)
+                    self.sidecars.discard(path)
                     self.log(f"已删除静态预览图: {path}")
+                    # 同时刷新右侧预览和表格图片缩略图
                     self.refresh_preview_and_table()
-                    # 刷新表格图片缩略图
-                    filename = self.table.item(row, 1).text()
-                    orig_path = self.table.item(row, 3).text()
-                    base_path = os.path.splitext(os.path.join(orig_path, filename))[0]
-                    preview_path, _ = self.find_preview_image(base_path)
-                    image_item = QTableWidgetItem()
-                    if preview_path:
-                        pixmap = QPixmap(preview_path)
-                        if not pixmap.isNull():
-                            pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                            image_item.setData(Qt.ItemDataRole.DecorationRole, pixmap)
-                    self.table.setItem(row, 0, image_item)
                 except Exception as e:
                     self.log(f"删除静态预览图失败: {e}")
                     QMessageBox.warning(self, "删除失败", f"无法删除静态预览图：\n{e}")
@@ -859,15 +3105,11 @@ class ModelClassifierGUI(QMainWindow):
 
     def delete_dynamic_preview(self):
         """删除当前选中模型的动态预览图（GIF）"""
-        row = self.table.currentRow()
-        if row < 0:
+        rec = self.table.current_record()
+        if rec is None:
             QMessageBox.information(self, "提示", "请先选中一个模型")
             return
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path or orig_path
-        base = os.path.splitext(os.path.join(use_path, filename))[0]
+        base = rec.base_path
         for ext in DYNAMIC_PREVIEW_IMAGE_EXTS:
             path = base + ext
             if os.path.exists(path):
@@ -875,6 +3117,7 @@ class ModelClassifierGUI(QMainWindow):
                 if reply == QMessageBox.Yes:
                     try:
                         os.remove(path)
+                        self.sidecars.discard(path)
                         self.log(f"已删除动态预览图: {path}")
                         self.refresh_preview_and_table()
                     except Exception as e:
@@ -898,56 +3141,41 @@ class ModelClassifierGUI(QMainWindow):
         self._watch_path = self.model_dir
     
     def closeEvent(self, event):
+        self.json_writer.flush(wait=True)
         if self._observer:
             self._observer.stop()
             self._observer.join()
+        if getattr(self, "catalog", None):
+            self.catalog.close()
+            self.catalog = None
+        loader = self.table_model.thumbnails
+        loader.clear()
+        loader.pool.waitForDone()
+        self.release_gif_resource()
+        gif_disk_cache, self.gif_cache.disk_cache = self.gif_cache.disk_cache, None
+        self._prefetch_pool.clear()
+        self._prefetch_pool.waitForDone()
+        QThreadPool.globalInstance().waitForDone()
+        if loader.disk_cache:
+            loader.disk_cache.close()
+            loader.disk_cache = None
+        if gif_disk_cache:
+            gif_disk_cache.close()
         super().closeEvent(event)
 
-        # 在释放资源后强制刷新
+    def _ensure_gif_player(self):
+        if getattr(self, "_gif_player", None) is None:
+            self._gif_player = GifPlayer(parent=self.dynamic_image_label, target=self.dynamic_image_label, cache=self.gif_cache)
+            self._gif_player.failed.connect(lambda path: self.log(f"动态预览图像加载失败：{path}"))
+        return self._gif_player
+
     def release_gif_resource(self):
-        try:
-            if hasattr(self, "_gif_player") and self._gif_player:
-                if self._gif_player.movie:
-                    self.dynamic_image_label.setMovie(None)
-                    self._gif_player.movie.stop()
-                    self._gif_player.movie.deleteLater()
-                    self._gif_player.movie = None
-                if self._gif_player.buffer:
-                    self._gif_player.buffer.close()
-                    self._gif_player.buffer.deleteLater()
-                    self._gif_player.buffer = None
-                self._gif_player.byte_array = None
-                del self._gif_player
-                self._gif_player = None
-            if hasattr(self, "_movie") and self._movie:
-                self.dynamic_image_label.setMovie(None)
-                self._movie.stop()
-                self._movie.deleteLater()
-                self._movie = None
-            self.dynamic_image_label.setMovie(None)
-            transparent = QPixmap(240, 240)
-            transparent.fill(Qt.transparent)
-            self.dynamic_image_label.setPixmap(transparent)
-            self.dynamic_image_label.clear()
-            self.dynamic_image_label.setText("无动态预览图\n拖放图片到此处")
-            # ----------- 1. 强制刷新 label -----------
-            self.dynamic_image_label.repaint()
-            self.dynamic_image_label.update()
-            QApplication.processEvents()
-            # ----------- 2. 强制刷新父窗口 -----------
-            parent = self.dynamic_image_label.parentWidget()
-            if parent:
-                parent.update()
-                parent.repaint()
-            window = self.dynamic_image_label.window()
-            if window:
-                window.update()
-                window.repaint()
-            QApplication.processEvents()
-            # ----------------------------------------
-        except Exception as e:
-            self.log(f"释放GIF资源异常: {e}")
-        gc.collect()
+        """停止动态预览并清空显示。GifPlayer 解码完即关闭文件，帧由它独占持有，
+        释放只是丢弃引用，不需要 gc.collect 或嵌套事件循环"""
+        if getattr(self, "_gif_player", None):
+            self._gif_player.release()
+        self.dynamic_image_label.clear()
+        self.dynamic_image_label.setText("无动态预览图\n拖放图片到此处")
         
     def select_model_directory(self): 
         dir_path = QFileDialog.getExistingDirectory(self, "选择模型目录")
@@ -966,14 +3194,20 @@ class ModelClassifierGUI(QMainWindow):
         if not self.model_dir:
             QMessageBox.warning(self, "警告", "请先选择模型目录")
             return
-        self.table.setRowCount(0)
-        self.scan_results.clear()
+        self.current_record = None
+        self.rename_history.clear()
+        self.sidecars.invalidate()
+        self.preview_cache.clear()
+        self.table_model.clear()
         self.filter_text = ""
         self.search_box.clear()
-        self._fill_canceled = False
-        self.progress_dialog = QProgressDialog("正在扫描模型...", "取消", 0, 100, self)
+        # 扫描期间结果分批追加，暂停排序避免每次插入都重排
+        self.table.setSortingEnabled(False)
+        self.progress_dialog = QProgressDialog("正在扫描模型...", "取消", 0, 0, self)
         self.progress_dialog.setWindowTitle("扫描进度")
-        self.progress_dialog.setWindowModality(Qt.ApplicationModal)
+        # 非模态：扫描过程中即可浏览已加入表格的模型
+        self.progress_dialog.setWindowModality(Qt.NonModal)
+        self.progress_dialog.setMinimumDuration(0)
         self.progress_dialog.setValue(0)
         self.progress_dialog.setMinimumWidth(420)
         self.progress_dialog.setMaximumWidth(420)
@@ -982,93 +3216,81 @@ class ModelClassifierGUI(QMainWindow):
         self.progress_dialog.setSizeGripEnabled(False)
         self.progress_dialog.setLabelText("正在扫描模型...")
         self.progress_dialog.setCancelButtonText("取消")
-        self.progress_dialog.canceled.connect(self._on_fill_cancel)
         self.progress_dialog.show()  # 关键：立即显示
-        QApplication.processEvents() # 关键：强制刷新界面
-        self.scan_worker = ScanWorker(self.model_dir) 
+        self.scan_worker = ScanWorker(self.model_dir, self._open_catalog(), self.sidecars, self.sha256_cache)
         self.scan_worker.progress.connect(self._on_scan_progress)
+        self.scan_worker.batch_ready.connect(self._on_scan_batch)
         self.scan_worker.finished.connect(self._on_scan_finished)
         self.progress_dialog.canceled.connect(self.scan_worker.cancel)
         self.scan_btn.setEnabled(False)
         self.scan_worker.start()
-        self.table.setRowCount(0)
         self.static_image_label.setText("无静态预览图")
         self.dynamic_image_label.setText("无动态预览图")
         self.static_info_label.setText("【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
         self.dynamic_info_label.setText("【动态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
 
-    def _on_fill_cancel(self):
-        self._fill_canceled = True
-    
+    def _open_catalog(self):
+        """打开（或复用）当前模型目录下的索引数据库，失败时返回 None，按全量扫描处理"""
+        catalog = getattr(self, "catalog", None)
+        if catalog and catalog.model_dir == self.model_dir:
+            return catalog
+        if catalog:
+            catalog.close()
+        try:
+            self.catalog = ModelCatalog(self.model_dir)
+        except Exception as e:
+            self.catalog = None
+            self.log(f"无法打开模型索引，将进行全量扫描: {e}")
+        self.sha256_cache = Sha256Cache(self.catalog)
+        self.file_ops.sha256_cache = self.sha256_cache
+        loader = self.table_model.thumbnails
+        if loader.disk_cache:
+            loader.disk_cache.close()
+            loader.disk_cache = None
+        try:
+            loader.disk_cache = ThumbnailDiskCache(self.model_dir)
+        except Exception as e:
+            self.log(f"无法打开缩略图缓存: {e}")
+        if self.gif_cache.disk_cache:
+            self.gif_cache.disk_cache.close()
+            self.gif_cache.disk_cache = None
+        try:
+            self.gif_cache.disk_cache = ThumbnailDiskCache(self.model_dir, GIF_FRAMES_DISK_BUDGET, table="gif_frames")
+        except Exception as e:
+            self.log(f"无法打开动图帧缓存: {e}")
+        return self.catalog
+
     def _on_scan_progress(self, idx, total, filename):
+        # total 为 0 表示遍历仍在进行，进度条显示为忙碌状态
         self.progress_dialog.setMaximum(total)
         self.progress_dialog.setValue(idx)
         def wrap_text(text, max_len=30):
             return "\n".join([text[i:i+max_len] for i in range(0, len(text), max_len)])
-        label = f"正在扫描: {wrap_text(filename, 30)}\n({idx}/{total})"
+        count = f"({idx}/{total})" if total else f"(已发现 {idx})"
+        label = f"正在扫描: {wrap_text(filename, 30)}\n{count}"
         self.progress_dialog.setLabelText(label)
-        QApplication.processEvents()
         
-    def _on_scan_finished(self, scan_results, filenames): 
-        total = len(scan_results)
-        self.progress_dialog.setMaximum(total)
-        self.progress_dialog.setWindowTitle("表格填充进度")
-        self.progress_dialog.setLabelText("正在填充表格...")
-        self.progress_dialog.show()
-        QApplication.processEvents()
-        self.scan_results.clear()
-        self._fill_canceled = False
-        batch = 100
-        for i in range(0, total, batch):
-            for j in range(i, min(i+batch, total)):
-                if self._fill_canceled:
-                    self.progress_dialog.close()
-                    self.scan_btn.setEnabled(True)
-                    self.log("用户取消了表格填充")
-                    return
-                full_path, filename, m_type, m_ver, size_str, row = scan_results[j]
-                row = self.table.rowCount()
-                self.table.insertRow(row)
-                base_path = os.path.splitext(full_path)[0]
-                preview_path, preview_type = self.find_preview_image(base_path)
-                image_item = QTableWidgetItem()
-                if preview_path:
-                    pixmap = QPixmap(preview_path)
-                    if not pixmap.isNull():                        
-                        pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        image_item.setData(Qt.ItemDataRole.DecorationRole, pixmap)
-                self.table.setItem(row, 0, image_item)
-                self.table.setItem(row, 1, QTableWidgetItem(filename))
-                self.table.setItem(row, 2, QTableWidgetItem(size_str))
-                self.table.setItem(row, 3, QTableWidgetItem(os.path.normpath(os.path.dirname(full_path))))
-                self.table.setItem(row, 4, QTableWidgetItem(m_type))
-                self.table.setItem(row, 5, QTableWidgetItem(m_ver))
-                self.table.setItem(row, 6, QTableWidgetItem(""))
-                item_content = filename
-                item = QTableWidgetItem(item_content)
-                item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-                item.setData(Qt.ItemDataRole.TextAlignmentRole, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-                item.setToolTip(item_content)
-                sha256_path = os.path.splitext(full_path)[0] + ".sha256"
-                sha256_val = ""
-                if os.path.exists(sha256_path):
-                    try:
-                        with open(sha256_path, "r") as fsha:
-                            sha256_val = fsha.read().strip()
-                    except Exception:
-                        sha256_val = ""
-                self.table.setItem(row, 7, QTableWidgetItem(sha256_val[:10] if sha256_val else ""))
-                self.table.setItem(row, 8, QTableWidgetItem(sha256_val))
-                self.scan_results.append((full_path, filename, m_type, m_ver, size_str, row))
-                def wrap_text(text, max_len=30):
-                    return "\n".join([text[i:i+max_len] for i in range(0, len(text), max_len)])
-                self.progress_dialog.setValue(j+1)
-                self.progress_dialog.setLabelText(f"正在填充表格({j+1}/{total}):\n{filename}")
-            QApplication.processEvents()
+    def _on_scan_batch(self, scan_results):
+        """追加一批扫描结果到表格末尾（在界面线程中执行，不阻塞等待整个扫描结束）"""
+        records = []
+        for full_path, filename, m_type, m_ver, size_bytes, size_str, sha256_val, preview_path, m_quant, m_params, notes in scan_results:
+            records.append(ModelRecord(filename, os.path.normpath(os.path.dirname(full_path)), size_bytes, size_str,
+                                       m_type, m_ver, sha256_val, preview_path, m_quant, m_params, notes))
+        # 缩略图由表格模型在行进入可视区域时异步加载
+        self.table_model.append_records(records)
+
+    def _on_scan_finished(self, cancelled):
         self.progress_dialog.close()
+        self.table.setSortingEnabled(True)
         self.scan_btn.setEnabled(True)
-        self.log(f"已扫描 {len(self.scan_results)} 个模型文件")
-        self.update_stats()
+        count = self.table_model.rowCount()
+        if cancelled:
+            self.log(f"用户取消了扫描，已加载 {count} 个模型文件")
+        else:
+            self.log(f"已扫描 {count} 个模型文件")
+            if self.scan_worker.catalog:
+                stats = self.scan_worker.stats
+                self.log(f"索引增量更新：新增 {stats['added']}，变更 {stats['changed']}，移除 {stats['removed']}，未变 {stats['unchanged']}")
 
     def format_file_size(self, size_bytes):
         if size_bytes < 1024:
@@ -1081,14 +3303,12 @@ class ModelClassifierGUI(QMainWindow):
             return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
         
     def find_preview_image(self, base_path):
-        for ext in STATIC_IMAGE_EXTS:
-            preview_path = base_path + ".preview" + ext
-            if os.path.exists(preview_path):
-                return preview_path, "static"
-        for ext in DYNAMIC_PREVIEW_IMAGE_EXTS:
-            gif_path = base_path + ext
-            if os.path.exists(gif_path):
-                return gif_path, "dynamic"# 这里返回字符串
+        preview_path = self.sidecars.first(base_path, STATIC_PREVIEW_IMAGE_EXTS)
+        if preview_path:
+            return preview_path, "static"
+        gif_path = self.sidecars.first(base_path, DYNAMIC_PREVIEW_IMAGE_EXTS)
+        if gif_path:
+            return gif_path, "dynamic"# 这里返回字符串
         return None, None
 
     def detect_model_type(self, fname):# 检测模型类型
@@ -1120,12 +3340,14 @@ class ModelClassifierGUI(QMainWindow):
     def refresh_static_info_label(self):
         """刷新静态预览信息标签，显示当前图片信息"""
         path = self.static_image_label.current_preview_path()
-        if path and os.path.exists(path):
-            from PySide6.QtGui import QImageReader
-            reader = QImageReader(path)
-            size = reader.size()
-            width, height = size.width(), size.height()
-            file_size = os.path.getsize(path)
+        entry = getattr(self.static_image_label, "prefetched", {}).get(path)
+        if entry or (path and os.path.exists(path)):
+            if entry:
+                _, width, height, file_size = entry
+            else:
+                size = QImageReader(path).size()
+                width, height = size.width(), size.height()
+                file_size = os.path.getsize(path)
             ext = os.path.splitext(path)[1]
             info = (
                 f"【静态预览】\n"
@@ -1137,37 +3359,30 @@ class ModelClassifierGUI(QMainWindow):
             info = "【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n"
         self.static_info_label.setText(info)
 
-    def load_model_info(self, row, col):
-        # 判断是否为分割行或空行
-        if row < 0 or row >= self.table.rowCount():
-            self.static_image_label.setText("无静态预览图")
-            self.dynamic_image_label.setText("无动态预览图")
-            self.static_info_label.setText("【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
-            self.dynamic_info_label.setText("【动态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
-            return
-        # 关键：判断是否为分割行
-        if not self.table.item(row, 1) or not self.table.item(row, 1).text():
+    def load_model_info(self, rec):
+        # 没有选中行（或行已被移除）
+        self.current_record = rec
+        if rec is None:
             self.static_image_label.setText("无静态预览图")
             self.dynamic_image_label.setText("无动态预览图")
             self.static_info_label.setText("【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
             self.dynamic_info_label.setText("【动态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
             return
 
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path or orig_path
-        base = os.path.splitext(os.path.join(use_path, filename))[0]
+        base = rec.base_path
         self.static_image_label.model_base_path = base
         self.dynamic_image_label.model_base_path = base
+        # 已预取且未过期时直接使用，不再读盘解码
+        bundle = self._take_preview_bundle(base)
         # ----------- 静态预览多图切换 -----------
-        static_preview_paths = []
-        for ext in STATIC_PREVIEW_IMAGE_EXTS:
-            path = base + ext
-            if os.path.exists(path):
-                static_preview_paths.append(path)
+        if bundle:
+            static_preview_paths = [path for path, *_ in bundle["static"]]
+            prefetched = {path: entry for path, *entry in bundle["static"]}
+        else:
+            static_preview_paths = self.sidecars.existing(base, STATIC_PREVIEW_IMAGE_EXTS)
+            prefetched = None
         if static_preview_paths:
-            self.static_image_label.set_preview_images(static_preview_paths, 0)
+            self.static_image_label.set_preview_images(static_preview_paths, 0, prefetched)
             # 刷新信息标签
             self.refresh_static_info_label()
         else:
@@ -1176,89 +3391,61 @@ class ModelClassifierGUI(QMainWindow):
             self.static_info_label.setText("【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
 
         # 动态预览
-        dynamic_preview_path = None
-        for ext in DYNAMIC_PREVIEW_IMAGE_EXTS:
-            path = base + ext
-            if os.path.exists(path):
-                dynamic_preview_path = path
-                break
+        if bundle:
+            dynamic = bundle["dynamic"]
+            dynamic_preview_path = dynamic[0] if dynamic else None
+        else:
+            dynamic = None
+            dynamic_preview_path = self.sidecars.first(base, DYNAMIC_PREVIEW_IMAGE_EXTS)
         dynamic_info = ""
         if dynamic_preview_path:
             try:
-                # 初始化或复用 GifPlayer
-                if not hasattr(self, "_gif_player") or self._gif_player is None:
-                    gif_player = GifPlayer(dynamic_preview_path, self.dynamic_image_label)
-                    if gif_player.movie:  # 只有加载成功才赋值
-                        self._gif_player = gif_player
-                    else:
-                        self._gif_player = None
-                        raise Exception("GIF加载失败")
+                # 复用 GifPlayer：后台逐帧解码并缩放，帧直接画到 dynamic_image_label 上（预取过的帧已在 gif_cache 中）
+                self.dynamic_image_label.setText("")
+                self._ensure_gif_player().set_gif(dynamic_preview_path)
+                # 让 dynamic_image_label 记录当前 GIF 路径
+                self.dynamic_image_label.preview_paths = [dynamic_preview_path]
+                self.dynamic_image_label.current_index = 0
+                if dynamic:
+                    _, width, height, file_size = dynamic[:4]
                 else:
-                    if self._gif_player:
-                        self._gif_player.set_gif(dynamic_preview_path)
-                    else:
-                        raise Exception("GIF加载失败")
-                # 设置 Movie 到 label
-                if self._gif_player and self._gif_player.movie:
-                    self.dynamic_image_label.setMovie(self._gif_player.movie)
-                    self.dynamic_image_label.setText("")
-                    # 让 dynamic_image_label 记录当前 GIF 路径
-                    self.dynamic_image_label.preview_paths = [dynamic_preview_path]
-                    self.dynamic_image_label.current_index = 0
-                    from PySide6.QtGui import QImageReader
-                    reader = QImageReader(dynamic_preview_path)
-                    size = reader.size()
+                    size = QImageReader(dynamic_preview_path).size()
                     width, height = size.width(), size.height()
                     file_size = os.path.getsize(dynamic_preview_path)
-                    ext = os.path.splitext(dynamic_preview_path)[1]
-                    dynamic_info = (
-                        f"【动态预览】\n"
-                        f"尺寸：{width}x{height}\n"
-                        f"大小：{self.format_file_size(file_size)}\n"
-                        f"后缀名：{ext.lstrip('.')}\n"
-                    )
-                    # 缩放逻辑
-                    def scale_movie():
-                        size = self._gif_player.movie.currentImage().size()
-                        if size.width() > 0 and size.height() > 0:
-                            max_height = 240
-                            max_width = 240
-                            w, h = size.width(), size.height()
-                            if h > max_height:
-                                w = int(w * max_height / h)
-                                h = max_height
-                            if w > max_width:
-                                h = int(h * max_width / w)
-                                w = max_width
-                            self._gif_player.movie.setScaledSize(QSize(w, h))
-                            self._gif_player.movie.frameChanged.disconnect(scale_movie)
-                    self._gif_player.movie.frameChanged.connect(scale_movie)
-                    self._gif_player.movie.start()
-                    self._gif_player.movie.jumpToFrame(0)
-                else:
-                    raise Exception("GIF加载失败")
+                ext = os.path.splitext(dynamic_preview_path)[1]
+                dynamic_info = (
+                    f"【动态预览】\n"
+                    f"尺寸：{width}x{height}\n"
+                    f"大小：{self.format_file_size(file_size)}\n"
+                    f"后缀名：{ext.lstrip('.')}\n"
+                )
             except Exception as e:
                 self.dynamic_image_label.setText("GIF加载失败")
                 dynamic_info = "【动态预览】\nGIF加载失败\n"
                 self.log(f"动态预览图像加载失败：{dynamic_preview_path} {e}")
         else:
-            self.dynamic_image_label.setText("无动态预览图\n拖放图片到此处")
+            # 停掉上一个模型的动图，避免它继续画在标签上或被当作本模型的预览删除
+            self.release_gif_resource()
+            self.dynamic_image_label.preview_paths = []
             dynamic_info = "【动态预览】\n尺寸：null\n大小：null\n后缀名：null\n"
         # self.static_info_label.setText(static_info)
         self.dynamic_info_label.setText(dynamic_info)
         json_path = base + ".json"
-        civitai_info = self.merge_civitai_info(base)
         self.current_json_path = json_path
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                data.update({k: v for k, v in civitai_info.items() if v})
-            except Exception as e:
-                data = civitai_info
-                self.log(f"加载JSON文件出错: {e}")
+        if bundle and bundle["notes"] is not None:
+            data = bundle["notes"]
         else:
-            data = civitai_info
+            civitai_info = self.merge_civitai_info(base)
+            if self.sidecars.exists(json_path):
+                try:
+                    with open(json_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    data.update({k: v for k, v in civitai_info.items() if v})
+                except Exception as e:
+                    data = civitai_info
+                    self.log(f"加载JSON文件出错: {e}")
+            else:
+                data = civitai_info
         self.description_input.blockSignals(True)
         self.notes_input.blockSignals(True)
         self.vae_input.blockSignals(True)
@@ -1268,21 +3455,74 @@ class ModelClassifierGUI(QMainWindow):
         self.description_input.blockSignals(False)
         self.notes_input.blockSignals(False)
         self.vae_input.blockSignals(False)
-        sha256_path = base + ".sha256"
-        sha256_val = ""
-        if os.path.exists(sha256_path):
-            try:
-                with open(sha256_path, "r") as fsha:
-                    sha256_val = fsha.read().strip()
-            except Exception:
-                sha256_val = ""
+        # 与表格一致：只显示经 Sha256Cache 确认仍然有效的哈希，过期的 .sha256 不采信
+        sha256_val = rec.sha256 or self.sha256_cache.lookup(
+            rec.full_path, check_sidecar=self.sidecars.exists(base + ".sha256"))
         self.sha256_short_box.setText(sha256_val[:10] if sha256_val else "")
         self.sha256_full_box.setText(sha256_val)
-        self.refresh_preview_buttons()
+        self._prefetch_neighbours(rec)
+
+    def _take_preview_bundle(self, base):
+        """取出预取结果；关联文件增删或 mtime/大小变化时视为过期并丢弃"""
+        bundle = self.preview_cache.get(base)
+        if bundle is None:
+            return None
+        expected = self.sidecars.existing(base, STATIC_PREVIEW_IMAGE_EXTS)
+        gif_path = self.sidecars.first(base, DYNAMIC_PREVIEW_IMAGE_EXTS)
+        if gif_path:
+            expected.append(gif_path)
+        expected += self.sidecars.existing(base, [".civitai.info", ".json"])
+        try:
+            fresh = set(expected) == set(bundle["files"]) and all(
+                (st.st_mtime_ns, st.st_size) == bundle["files"][path]
+                for path, st in ((path, os.stat(path)) for path in expected))
+        except OSError:
+            fresh = False
+        if not fresh:
+            del self.preview_cache[base]
+            return None
+        self.preview_cache.move_to_end(base)
+        return bundle
+
+    def _prefetch_neighbours(self, rec):
+        """在后台预取当前行前后各 PREVIEW_PREFETCH_ROWS 个可见行，先近后远"""
+        proxy = self.table.proxy
+        row = proxy.mapFromSource(self.table_model.index(self.table_model.source_row(rec), 0)).row()
+        if row < 0:
+            return
+        self._prefetch_pool.clear()  # 丢弃还没开始的旧预取任务
+        self._prefetch_pending.clear()
+        gif_keys = self.gif_cache.keys()
+        for offset in range(1, PREVIEW_PREFETCH_ROWS + 1):
+            for r in (row + offset, row - offset):
+                if not 0 <= r < proxy.rowCount():
+                    continue
+                neighbour = self.table.record_at(proxy.index(r, 0))
+                base = neighbour.base_path if neighbour else None
+                if not base or base in self.preview_cache or base in self._prefetch_pending:
+                    continue
+                self._prefetch_pending.add(base)
+                self._prefetch_pool.start(PreviewPrefetchTask(
+                    base, self.sidecars, self._prefetch_signals, self.gif_cache.disk_cache, gif_keys))
+
+    def _on_preview_prefetched(self, base, bundle):
+        self._prefetch_pending.discard(base)
+        if bundle is None:
+            return
+        # QPixmap 只能在 GUI 线程创建；动图帧放进 gif_cache，预取结果里只留元数据
+        bundle["static"] = [(path, QPixmap.fromImage(image), w, h, size) for path, image, w, h, size in bundle["static"]]
+        dynamic = bundle["dynamic"]
+        if dynamic and dynamic[5]:
+            self.gif_cache.put(dynamic[4], [(QPixmap.fromImage(image), delay) for image, delay in dynamic[5]])
+            bundle["dynamic"] = dynamic[:5] + (None,)
+        self.preview_cache[base] = bundle
+        self.preview_cache.move_to_end(base)
+        while len(self.preview_cache) > PREVIEW_CACHE_ENTRIES:
+            self.preview_cache.popitem(last=False)
 
     def merge_civitai_info(self, base_path):
         path = base_path + ".civitai.info"
-        if not os.path.exists(path): 
+        if not self.sidecars.exists(path): 
             return {}
         try:
             with open(path, 'r', encoding='utf-8') as f:
@@ -1303,14 +3543,13 @@ class ModelClassifierGUI(QMainWindow):
                 "notes": self.notes_input.toPlainText().strip(),
                 "vae": self.vae_input.toPlainText().strip()
             }
-            with open(self.current_json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            self.log(f"Saved notes to {self.current_json_path}")
+            self.json_writer.schedule(os.path.normpath(self.current_json_path), data)
+            self.json_writer.flush()
         except Exception as e:
             self.log(f"保存备注JSON失败: {e}")
 
     def export_results(self):
-        if not self.scan_results:
+        if not self.table_model.records:
             QMessageBox.warning(self, "提示", "无分析结果")
             return
         export_type, ok = QInputDialog.getItem(
@@ -1330,12 +3569,14 @@ class ModelClassifierGUI(QMainWindow):
         if not save_path:
             return
         data = [{
-            "模型名称": filename,
-            "大小": size_str,
-            "模型的路径": os.path.dirname(p),
-            "类型": t,
-            "版本": v
-        } for p, filename, t, v, size_str, _ in self.scan_results]
+            "模型名称": rec.filename,
+            "大小": rec.size_str,
+            "模型的路径": rec.dir_path,
+            "类型": rec.model_type,
+            "版本": rec.model_version,
+            "量化": rec.quantization,
+            "参数量": format_param_count(rec.param_count)
+        } for rec in self.table_model.records]
         try:
             if export_type.startswith("Excel"):
                 pd.DataFrame(data).to_excel(save_path, index=False)
@@ -1356,7 +3597,6 @@ class ModelClassifierGUI(QMainWindow):
         gen_sha_action = menu.addAction("生成SHA256哈希值")
         undo_rename_action = menu.addAction("撤回重命名")
         undo_move_action = menu.addAction("撤销移动")
-        # undo_delete_action = menu.addAction("撤销删除")
         import_html_action = menu.addAction("导入HTML文件")
         refresh_img_action = menu.addAction("刷新图片")
         action = menu.exec(self.table.viewport().mapToGlobal(pos))
@@ -1365,12 +3605,12 @@ class ModelClassifierGUI(QMainWindow):
         index = self.table.indexAt(pos)
         if not index.isValid():
             return
-        row = index.row()
-        selected_rows = sorted(set(idx.row() for idx in self.table.selectedIndexes()))
-        multi_selected = len(selected_rows) > 1
+        rec = self.table.record_at(index)
+        selected_records = self.table.selected_records()
+        multi_selected = len(selected_records) > 1
     
         # 获取选中模型名
-        model_names = [self.table.item(r, 1).text() for r in selected_rows if self.table.item(r, 1)]
+        model_names = [r.filename for r in selected_records]
         model_names_str = "\n".join(model_names)
     
         if action == move_action:
@@ -1383,7 +3623,7 @@ class ModelClassifierGUI(QMainWindow):
                 if reply == QMessageBox.Yes:
                     self.batch_move_selected_models()
             else:
-                self.move_selected_model(row)
+                self.move_selected_model(rec)
             return
     
         if action == rename_action:
@@ -1396,7 +3636,7 @@ class ModelClassifierGUI(QMainWindow):
                 if reply == QMessageBox.Yes:
                     self.batch_rename_selected_models()
             else:
-                self.rename_model(row)
+                self.rename_model(rec)
             return
     
         if action == delete_action:
@@ -1407,47 +3647,33 @@ class ModelClassifierGUI(QMainWindow):
                     QMessageBox.Yes | QMessageBox.No
                 )
                 if reply == QMessageBox.Yes:
-                    self.batch_delete_selected_models(selected_rows)
+                    self.batch_delete_selected_models()
             else:
                 # 单项删除，无需弹窗
-                self.delete_single_model(row)
+                self.delete_single_model(rec)
             return
     
-        # if action == undo_delete_action:
-        #     self.undo_last_delete()
-        #     return
-    
         if action == gen_sha_action:
-            selected_rows = sorted(set(idx.row() for idx in self.table.selectedIndexes()))
-            if len(selected_rows) > 1:
+            if multi_selected:
                 # 多选，批量检测并生成
                 need_gen = []
-                for row in selected_rows:
-                    filename = self.table.item(row, 1).text()
-                    orig_path = self.table.item(row, 3).text()
-                    full_path = os.path.join(orig_path, filename)
-                    sha256_path = os.path.splitext(full_path)[0] + ".sha256"
-                    hashv = ""
-                    if os.path.exists(sha256_path):
-                        try:
-                            with open(sha256_path, "r") as fsha:
-                                exist_hash = fsha.read().strip()
-                            if len(exist_hash) == 64 and all(c in "0123456789abcdefABCDEF" for c in exist_hash):
-                                continue  # 已有合法哈希值
-                        except Exception:
-                            pass
-                    need_gen.append((row, full_path))
+                for r in selected_records:
+                    full_path = r.full_path
+                    if self.sha256_cache.lookup(full_path):
+                        continue  # 已有仍然有效的哈希值
+                    need_gen.append((r, full_path))
                 if not need_gen:
                     QMessageBox.information(self, "SHA256", "所选模型的SHA256均已存在且合法，无需再生成。")
                     return
-                progress = QProgressDialog("正在批量生成SHA256...", "取消", 0, len(need_gen), self)
+                progress = QProgressDialog("正在批量生成SHA256...", "取消", 0, 1000, self)
                 progress.setWindowTitle("进度")
                 progress.setWindowModality(Qt.ApplicationModal)
                 progress.setValue(0)
-                self.sha256_worker = Sha256BatchWorker(need_gen)
+                self.sha256_worker = Sha256BatchWorker(need_gen, self.sha256_cache)
                 self.sha256_worker.progress_changed.connect(
-                    lambda idx, total, short_hash, full_hash, filename: self._on_sha256_progress(idx, total, short_hash, full_hash, filename, need_gen, progress)
+                    lambda done, total, idx, full_hash, filename: self._on_sha256_progress(done, total, idx, full_hash, filename, need_gen, progress)
                 )
+                self.sha256_worker.bytes_progress.connect(progress.setValue)
                 self.sha256_worker.finished.connect(
                     lambda new_count, skip_count: self._on_sha256_finished(progress, new_count, skip_count)
                 )
@@ -1456,36 +3682,33 @@ class ModelClassifierGUI(QMainWindow):
                 progress.exec()
             else:
                 # 单选，走原有逻辑
-                self.generate_sha256(row)
+                self.generate_sha256(rec)
             return
     
         if action == undo_rename_action:
-            self.undo_rename(row)
+            self.undo_rename(rec)
             return
     
         if action == undo_move_action:
-            self.undo_last_move(row)
+            self.undo_last_move(rec)
             return
     
         if action == import_html_action:
-            self.import_html_for_model(row)
+            self.import_html_for_model(rec)
             return
     
         if action == refresh_img_action:
-            self.refresh_row_image(row)
+            self.refresh_row_image(rec)
             return
     
         if action == open_action:
-            self.open_model_file(row)
+            self.open_model_location(rec)
             return
     
     # 单项删除
-    def delete_single_model(self, row):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path if moved_path else orig_path
-        full_path = os.path.join(use_path, filename)
+    def delete_single_model(self, rec):
+        filename = rec.filename
+        full_path = rec.full_path
         # 新增：弹出确认框
         reply = QMessageBox.question(
             self,
@@ -1498,131 +3721,28 @@ class ModelClassifierGUI(QMainWindow):
     
         self.release_gif_resource()
         base_path = os.path.splitext(full_path)[0]
-        import tempfile, uuid
-        error = None
-        trash_dir = os.path.join(tempfile.gettempdir(), "sd_model_trash", str(uuid.uuid4()))
-        os.makedirs(trash_dir, exist_ok=True)
-        moved_files = []
-        try:
-            for ext in ALL_MODEL_EXTS:
-                file_to_delete = base_path + ext
-                if os.path.exists(file_to_delete):
-                    dst = os.path.join(trash_dir, os.path.basename(file_to_delete))
-                    shutil.move(file_to_delete, dst)
-                    moved_files.append((dst, file_to_delete))
-            for dst, _ in moved_files:
-                try:
-                    os.remove(dst)
-                except Exception as e:
-                    self.log(f"彻底删除失败: {dst}, 错误: {e}")
-            self.table.removeRow(row)
-            self.static_image_label.setText("已删除")
-            self.dynamic_image_label.setText("已删除")
-            self.modified = True
-            try:
-                os.rmdir(trash_dir)
-            except Exception:
-                pass
-            # 记录撤销信息
-            self.last_deleted = {"files": moved_files, "row": row, "filename": filename}
-        except Exception as e:
-            for dst, orig in reversed(moved_files):
-                if os.path.exists(dst):
-                    try:
-                        shutil.move(dst, orig)
-                    except Exception as e2:
-                        self.log(f"回滚删除失败: {e2}")
-            self.log(f"删除失败: {e}")
-            error = str(e)
-        if error:
-            QMessageBox.warning(self, "删除失败", f"无法删除文件，已回滚：\n{error}")
-    
-    # 批量删除
-    def batch_delete_selected_models(self, rows):
-        # rows为已排序的行号列表
-        deleted_info = []
-        for row in sorted(rows, reverse=True):
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            moved_path = self.table.item(row, 6).text()
-            use_path = moved_path if moved_path else orig_path
-            full_path = os.path.join(use_path, filename)
-            base_path = os.path.splitext(full_path)[0]
-            import tempfile, uuid
-            trash_dir = os.path.join(tempfile.gettempdir(), "sd_model_trash", str(uuid.uuid4()))
-            os.makedirs(trash_dir, exist_ok=True)
-            moved_files = []
-            try:
-                for ext in ALL_MODEL_EXTS:
-                    file_to_delete = base_path + ext
-                    if os.path.exists(file_to_delete):
-                        dst = os.path.join(trash_dir, os.path.basename(file_to_delete))
-                        shutil.move(file_to_delete, dst)
-                        moved_files.append((dst, file_to_delete))
-                for dst, _ in moved_files:
-                    try:
-                        os.remove(dst)
-                    except Exception as e:
-                        self.log(f"彻底删除失败: {dst}, 错误: {e}")
-                self.table.removeRow(row)
-                deleted_info.append({"files": moved_files, "row": row, "filename": filename})
-                try:
-                    os.rmdir(trash_dir)
-                except Exception:
-                    pass
-            except Exception as e:
-                for dst, orig in reversed(moved_files):
-                    if os.path.exists(dst):
-                        try:
-                            shutil.move(dst, orig)
-                        except Exception as e2:
-                            self.log(f"回滚删除失败: {e2}")
-                self.log(f"批量删除失败: {e}")
-        # 记录批量撤销信息
-        self.last_deleted = deleted_info
-    
-    # 撤销删除
-    def undo_last_delete(self):
-        if not hasattr(self, "last_deleted") or not self.last_deleted:
-            QMessageBox.information(self, "提示", "没有可撤销的删除操作。")
-            return
-        # 支持批量撤销
-        if isinstance(self.last_deleted, list):
-            for info in self.last_deleted:
-                for dst, orig in info["files"]:
-                    if os.path.exists(dst):
-                        shutil.move(dst, orig)
-                # 你可以在这里恢复表格行（如有需要）
-            QMessageBox.information(self, "撤销删除", "已撤销批量删除。")
-        else:
-            for dst, orig in self.last_deleted["files"]:
-                if os.path.exists(dst):
-                    shutil.move(dst, orig)
-            # 你可以在这里恢复表格行（如有需要）
-            QMessageBox.information(self, "撤销删除", f"已撤销删除：{self.last_deleted['filename']}")
-        self.last_deleted = None
+        group = FileOpGroup("delete", rec, [(f, None) for f in self.sidecars.existing(base_path, ALL_MODEL_EXTS)])
 
-    def refresh_row_image(self, row):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path if moved_path else orig_path
-        base_path = os.path.splitext(os.path.join(use_path, filename))[0]
-        preview_path, _ = self.find_preview_image(base_path)
-        image_item = QTableWidgetItem()
-        if preview_path:
-            pixmap = QPixmap(preview_path)
-            if not pixmap.isNull():
-                pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                image_item.setData(Qt.ItemDataRole.DecorationRole, pixmap)
-        self.table.setItem(row, 0, image_item)
-        self.log(f"已刷新图片缩略图: {filename}")
-
-    def import_html_for_model(self, row):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path if moved_path else orig_path
+        def on_done(groups, cancelled):
+            if group.ok:
+                self.table_model.remove_records([rec])
+                self.static_image_label.setText("已删除")
+                self.dynamic_image_label.setText("已删除")
+                self.modified = True
+            else:
+                self.log(f"删除失败: {group.error}")
+                QMessageBox.warning(self, "删除失败", f"无法删除文件，已回滚：\n{group.error}")
+        self._start_file_job([group], f"正在删除: {filename}", on_done=on_done)
+
+    def refresh_row_image(self, rec):
+        old_preview_path = rec.preview_path
+        rec.preview_path, _ = self.find_preview_image(rec.base_path)
+        self.table_model.refresh_thumbnail(rec, old_preview_path)
+        self.log(f"已刷新图片缩略图: {rec.filename}")
+
+    def import_html_for_model(self, rec):
+        filename = rec.filename
+        use_path = rec.dir_path
         base_name = os.path.splitext(filename)[0]
         html_path, _ = QFileDialog.getOpenFileName(self, "选择HTML文件", "", "HTML文件 (*.html *.htm)")
         if not html_path:
@@ -1630,6 +3750,7 @@ class ModelClassifierGUI(QMainWindow):
         dst_path = os.path.join(use_path, base_name + ".html")
         try:
             shutil.copy2(html_path, dst_path)
+            self.sidecars.add(dst_path)
             self.log(f"已导入HTML文件: {dst_path}")
             QMessageBox.information(self, "导入成功", f"已导入HTML文件为：\n{dst_path}")
         except Exception as e:
@@ -1637,23 +3758,17 @@ class ModelClassifierGUI(QMainWindow):
             QMessageBox.warning(self, "导入失败", f"导入HTML文件失败：\n{e}")
 
     def batch_move_selected_models(self):
-        selected_rows = sorted(set(idx.row() for idx in self.table.selectedIndexes()))
-        if not selected_rows:
+        selected_records = self.table.selected_records()
+        if not selected_records:
             QMessageBox.information(self, "提示", "请先选择要移动的模型")
             return
-        # 记录移动前的唯一标识
-        move_infos = []
-        for row in selected_rows:
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            move_infos.append({"filename": filename, "orig_path": orig_path, "row": row})
         # 收集模型名
-        model_names = [info["filename"] for info in move_infos]
+        model_names = [rec.filename for rec in selected_records]
         model_names_str = "\n".join(model_names)
         reply = QMessageBox.question(
             self,
             "确认批量移动",
-            f"确定要批量移动以下 {len(selected_rows)} 个模型？\n\n模型列表：\n{model_names_str}",
+            f"确定要批量移动以下 {len(selected_records)} 个模型？\n\n模型列表：\n{model_names_str}",
             QMessageBox.Yes | QMessageBox.No
         )
         if reply != QMessageBox.Yes:
@@ -1662,102 +3777,98 @@ class ModelClassifierGUI(QMainWindow):
         target_dir = QFileDialog.getExistingDirectory(self, "选择目标目录", self.model_dir)
         if not target_dir:
             return
-        success_infos = []
+        self.release_gif_resource()  # 只释放一次
+        groups = []
         fail_count = 0
-        for info in move_infos:
-            try:
-                self.move_selected_model(info["row"], target_dir, show_message=False)
-                success_infos.append({"filename": info["filename"], "target_dir": target_dir})
-            except Exception as e:
+        for rec in selected_records:
+            group = self._plan_move(rec, target_dir)
+            if group is None:
                 fail_count += 1
-                self.log(f"批量移动失败: {e}")
-        # 移动后刷新所有成功移动的行的图片（用新路径查找行号）
-        for info in success_infos:
-            # 查找新行号
-            for row in range(self.table.rowCount()):
-                fname = self.table.item(row, 1).text()
-                moved_path = self.table.item(row, 6).text()
-                if fname == info["filename"] and moved_path == win_path(info["target_dir"]):
-                    self.refresh_row_image(row)
-                    break
-        if success_infos:
-            QMessageBox.information(self, "批量移动完成", f"成功移动 {len(success_infos)} 个模型到:\n{win_path(target_dir)}")
-        if fail_count > 0:
-            QMessageBox.warning(self, "批量移动部分失败", f"有 {fail_count} 个模型移动失败，详情见日志。")
+            else:
+                groups.append(group)
+        counts = {"success": 0, "fail": fail_count}
+
+        def on_group(group):
+            # 记录对象不随排序变化，移动后直接刷新对应行，无需按文件名重新查找
+            if group.ok:
+                counts["success"] += 1
+                self._apply_move(group)
+            else:
+                counts["fail"] += 1
+                self.log(f"批量移动失败: {group.rec.filename}, 错误: {group.error}")
+
+        def on_done(groups, cancelled):
+            if cancelled:
+                self.log("批量移动已取消")
+            if counts["success"]:
+                QMessageBox.information(self, "批量移动完成", f"成功移动 {counts['success']} 个模型到:\n{win_path(target_dir)}")
+            if counts["fail"] > 0:
+                QMessageBox.warning(self, "批量移动部分失败", f"有 {counts['fail']} 个模型移动失败，详情见日志。")
+        self._start_file_job(groups, f"正在批量移动 {len(groups)} 个模型...", on_group, on_done)
 
     def batch_delete_selected_models(self):  # 批量删除所选模型
-        selected_rows = sorted(set(idx.row() for idx in self.table.selectedIndexes()), reverse=True)
-        if not selected_rows:
+        selected_records = self.table.selected_records()
+        if not selected_records:
             QMessageBox.information(self, "提示", "请先选择要删除的模型")
             return
         # 收集模型名
-        model_names = [self.table.item(row, 1).text() for row in selected_rows]
+        model_names = [rec.filename for rec in selected_records]
         model_names_str = "\n".join(model_names)
         reply = QMessageBox.question(
             self,
             "确认删除",
-            f"确定要删除选中的 {len(selected_rows)} 个模型及所有关联文件？\n\n模型列表：\n{model_names_str}",
+            f"确定要删除选中的 {len(selected_records)} 个模型及所有关联文件？\n\n模型列表：\n{model_names_str}",
             QMessageBox.Yes | QMessageBox.No
         )
         if reply != QMessageBox.Yes:
             QMessageBox.information(self, "已取消", f"已取消删除操作。\n\n涉及模型：\n{model_names_str}")
             return
-        fail_names = []
-        for row in selected_rows:
-            self.release_gif_resource()
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            moved_path = self.table.item(row, 6).text()
-            use_path = moved_path if moved_path else orig_path
-            full_path = os.path.join(use_path, filename)
-            base_path = os.path.splitext(full_path)[0]
-            try:
-                for ext in ALL_MODEL_EXTS:
-                    file_to_delete = base_path + ext
-                    if os.path.exists(file_to_delete):
-                        try:
-                            os.remove(file_to_delete)
-                            self.log(f"已删除: {file_to_delete}")
-                        except Exception as e:
-                            self.log(f"删除失败: {file_to_delete}, 错误: {e}")
-                            fail_names.append(filename)
-                    else:
-                        self.log(f"文件不存在，跳过: {file_to_delete}")
-                self.table.removeRow(row)
-                self.log(f"已从表格移除: {filename}")
-            except Exception as e:
-                fail_names.append(filename)
-                self.log(f"批量删除失败: {filename}, 错误: {e}")
-        self.static_image_label.setText("已删除")
-        self.dynamic_image_label.setText("已删除")
-        self.modified = True
-        if fail_names:
-            fail_names_str = "\n".join(fail_names)
-            QMessageBox.warning(
-                self,
-                "批量删除部分失败",
-                f"有 {len(fail_names)} 个模型删除失败，详情见日志。\n\n失败模型：\n{fail_names_str}"
-            )
-        else:
-            QMessageBox.information(
-                self,
-                "批量删除完成",
-                f"成功删除 {len(selected_rows)} 个模型：\n{model_names_str}"
-            )
-        self.log(f"批量删除完成，共处理 {len(selected_rows)} 个模型")
+        self.release_gif_resource()
+        groups = [FileOpGroup("delete", rec, [(f, None) for f in self.sidecars.existing(rec.base_path, ALL_MODEL_EXTS)])
+                  for rec in selected_records]
+
+        def on_group(group):
+            if group.ok:
+                for f, _ in group.done:
+                    self.log(f"已删除: {f}")
+                self.log(f"已从表格移除: {group.rec.filename}")
+            else:
+                self.log(f"批量删除失败: {group.rec.filename}, 错误: {group.error}")
+
+        def on_done(groups, cancelled):
+            self.table_model.remove_records([g.rec for g in groups if g.ok])
+            self.static_image_label.setText("已删除")
+            self.dynamic_image_label.setText("已删除")
+            self.modified = True
+            fail_names = [g.rec.filename for g in groups if not g.ok]
+            if fail_names:
+                fail_names_str = "\n".join(fail_names)
+                QMessageBox.warning(
+                    self,
+                    "批量删除部分失败",
+                    f"有 {len(fail_names)} 个模型删除失败，详情见日志。\n\n失败模型：\n{fail_names_str}"
+                )
+            else:
+                QMessageBox.information(
+                    self,
+                    "批量删除完成",
+                    f"成功删除 {len(selected_records)} 个模型：\n{model_names_str}"
+                )
+            self.log(f"批量删除完成，共处理 {len(selected_records)} 个模型")
+        self._start_file_job(groups, f"正在删除 {len(groups)} 个模型...", on_group, on_done)
 
     def batch_rename_selected_models(self): # 批量重命名所选模型
-        selected_rows = sorted(set(idx.row() for idx in self.table.selectedIndexes()))
-        if not selected_rows:
+        selected_records = self.table.selected_records()
+        if not selected_records:
             QMessageBox.information(self, "提示", "请先选择要重命名的模型")
             return
         # 收集模型名
-        model_names = [self.table.item(row, 1).text() for row in selected_rows]
+        model_names = [rec.filename for rec in selected_records]
         model_names_str = "\n".join(model_names)
         reply = QMessageBox.question(
             self,
             "确认批量重命名",
-            f"确定要批量重命名以下 {len(selected_rows)} 个模型？\n\n模型列表：\n{model_names_str}",
+            f"确定要批量重命名以下 {len(selected_records)} 个模型？\n\n模型列表：\n{model_names_str}",
             QMessageBox.Yes | QMessageBox.No
         )
         if reply != QMessageBox.Yes:
@@ -1766,9 +3877,8 @@ class ModelClassifierGUI(QMainWindow):
         # 获取原文件名（不含扩展名）
         old_names = []
         file_exts = []
-        for row in selected_rows:
-            filename = self.table.item(row, 1).text()
-            base, ext = os.path.splitext(filename)
+        for rec in selected_records:
+            base, ext = os.path.splitext(rec.filename)
             old_names.append(base)
             file_exts.append(ext)
         # 批量输入新前缀
@@ -1781,70 +3891,49 @@ class ModelClassifierGUI(QMainWindow):
             new_name = f"{prefix}{i+1}{ext}"
             new_names.append(new_name)
         # 检查是否有重名
-        dir_paths = []
-        for row in selected_rows:
-            moved_path = self.table.item(row, 6).text()
-            orig_path = self.table.item(row, 3).text()
-            dir_paths.append(moved_path if moved_path else orig_path)
+        dir_paths = [rec.dir_path for rec in selected_records]
         for dir_path, new_name in zip(dir_paths, new_names):
-            for ext in ALL_MODEL_EXTS:
-                check_file = os.path.join(dir_path, os.path.splitext(new_name)[0] + ext)
-                if os.path.exists(check_file):
-                    QMessageBox.warning(self, "重命名冲突", f"已存在同名文件：\n{check_file}\n请换个前缀。")
-                    return
-        # 执行批量重命名
-        moved_files = []
-        try:
-            for idx, row in enumerate(selected_rows):
-                filename = self.table.item(row, 1).text()
-                moved_path = self.table.item(row, 6).text()
-                orig_path = self.table.item(row, 3).text()
-                dir_path = moved_path if moved_path else orig_path
-                base_old = os.path.splitext(filename)[0]
-                new_base = os.path.splitext(new_names[idx])[0]
-                file_ext = file_exts[idx]
-                for ext in ALL_MODEL_EXTS:
-                    old_file = os.path.join(dir_path, base_old + ext)
-                    new_file = os.path.join(dir_path, new_base + ext)
-                    if os.path.exists(old_file):
-                        shutil.move(old_file, new_file)
-                        moved_files.append((new_file, old_file, row, new_names[idx]))
+            check_file = self.sidecars.first(os.path.join(dir_path, os.path.splitext(new_name)[0]), ALL_MODEL_EXTS)
+            if check_file:
+                QMessageBox.warning(self, "重命名冲突", f"已存在同名文件：\n{check_file}\n请换个前缀。")
+                return
+        # 执行批量重命名：整个批次在后台作为一个原子任务，任一模型失败则全部回滚
+        groups = []
+        for idx, rec in enumerate(selected_records):
+            dir_path = rec.dir_path
+            old_base_path = os.path.join(dir_path, os.path.splitext(rec.filename)[0])
+            new_base_path = os.path.join(dir_path, os.path.splitext(new_names[idx])[0])
+            pairs = [(old_file, new_base_path + old_file[len(old_base_path):])
+                     for old_file in self.sidecars.existing(old_base_path, ALL_MODEL_EXTS)]
+            groups.append(FileOpGroup("rename", rec, pairs, (new_names[idx], file_exts[idx])))
+
+        def on_done(groups, cancelled):
+            failed = [g for g in groups if not g.ok]
+            if failed:
+                error = next((g.error for g in failed if g.error != "已回滚"), failed[0].error)
+                self.log(f"批量重命名失败: {error}")
+                QMessageBox.warning(self, "批量重命名失败", f"批量重命名时发生错误：\n{error}")
+                return
+            for group in groups:
+                rec = group.rec
+                new_name, file_ext = group.data
+                base_old = os.path.splitext(rec.filename)[0]
                 # 更新表格
-                self.table.setItem(row, 1, QTableWidgetItem(new_names[idx]))
+                rec.filename = new_name
+                self.table_model.record_changed(rec)
                 # 记录重命名历史，便于撤回
-                self.rename_history[row] = (base_old, new_base, file_ext, dir_path)
+                self.rename_history[rec] = (base_old, os.path.splitext(new_name)[0], file_ext, rec.dir_path)
             self.modified = True
-            self.log(f"批量重命名成功: {len(selected_rows)} 个模型")
-            QMessageBox.information(self, "批量重命名", f"已成功重命名 {len(selected_rows)} 个模型")
-        except Exception as e:
-            # 回滚
-            for new_file, old_file, row, _ in reversed(moved_files):
-                if os.path.exists(new_file):
-                    try:
-                        shutil.move(new_file, old_file)
-                    except Exception as e2:
-                        self.log(f"回滚移动失败: {e2}")
-                        try:
-                            os.remove(new_file)
-                            self.log(f"已删除回滚失败残留文件: {new_file}")
-                        except Exception as e3:
-                            self.log(f"删除残留文件失败: {e3}")
-            self.log(f"批量重命名失败: {e}")
-            QMessageBox.warning(self, "批量重命名失败", f"批量重命名时发生错误：\n{e}")
-            return
-        # 刷新预览
-        if selected_rows:
-            self.load_model_info(selected_rows[0], 0)
-
-    def open_model_location(self, row):
-        filename = self.table.item(row, 1).text()
-        moved_path = self.table.item(row, 6).text()
-        orig_path = self.table.item(row, 3).text()
-        if moved_path:
-            file_path = os.path.join(moved_path, filename)
-        else:
-            file_path = os.path.join(orig_path, filename)
-        file_path = os.path.normpath(file_path)
+            self.log(f"批量重命名成功: {len(selected_records)} 个模型")
+            QMessageBox.information(self, "批量重命名", f"已成功重命名 {len(selected_records)} 个模型")
+            # 刷新预览
+            self.load_model_info(selected_records[0])
+        self._start_file_job(groups, f"正在重命名 {len(groups)} 个模型...", on_done=on_done, atomic=True)
+
+    def open_model_location(self, rec):
+        moved_path = rec.moved_path
+        orig_path = rec.orig_path
+        file_path = os.path.normpath(rec.full_path)
         try:
             if os.path.exists(file_path):
                 if platform.system() == "Windows":
@@ -1869,158 +3958,115 @@ class ModelClassifierGUI(QMainWindow):
 
     def filter_table(self, text):
         self.filter_text = text.lower()
-        for row in range(self.table.rowCount()):
-            filename = self.table.item(row, 1).text().lower()
-            sha256_val = ""
-            sha256_short = ""
-            try:
-                sha256_short = self.table.item(row, 8).text().lower() if self.table.columnCount() > 8 and self.table.item(row, 8) else ""
-                sha256_val = self.table.item(row, 9).text().lower() if self.table.columnCount() > 9 and self.table.item(row, 9) else ""
-            except Exception:
-                sha256_short = ""
-                sha256_val = ""
-            if not sha256_val:
-                orig_path = self.table.item(row, 3).text()
-                model_name = self.table.item(row, 1).text()
-                base = os.path.splitext(os.path.join(orig_path, model_name))[0]
-                sha256_path = base + ".sha256"
-                if os.path.exists(sha256_path):
-                    try:
-                        with open(sha256_path, "r") as fsha:
-                            sha256_val = fsha.read().strip().lower()
-                            sha256_short = sha256_val[:10]
-                    except Exception:
-                        sha256_val = ""
-                        sha256_short = ""
-            match = (self.filter_text in filename or (sha256_short and self.filter_text in sha256_short) or (sha256_val and self.filter_text in sha256_val))
-            self.table.setRowHidden(row, not match)
+        # 由代理模型统一过滤，不逐行读写
+        self.table.proxy.set_filter_text(text)
 
-    def undo_last_move(self, row):
+    def undo_last_move(self, rec):
         self.release_gif_resource()
-        filename = self.table.item(row, 1).text()
-        moved_path = self.table.item(row, 6).text()
-        orig_path = self.table.item(row, 3).text()
+        filename = rec.filename
+        moved_path = rec.moved_path
+        orig_path = rec.orig_path
         if not moved_path:
             QMessageBox.information(self, "提示", "该模型未移动，无需撤销")
             return
-        try:
-            base_name = os.path.splitext(filename)[0]
-            for ext in ALL_MODEL_EXTS:
-                src = os.path.join(moved_path, base_name + ext)
-                dst = os.path.join(orig_path, base_name + ext)
-                if not os.path.exists(src):
-                    self.log(f"撤销移动失败: 源文件不存在: {src}")
-                    continue
-                # 检查目标目录是否存在
-                dst_dir = os.path.dirname(dst)
-                if not os.path.exists(dst_dir):
-                    self.log(f"撤销移动失败: 目标文件夹不存在: {dst_dir}")
-                    continue
-                shutil.move(src, dst)
-            self.table.setItem(row, 6, QTableWidgetItem(""))
-            if 0 <= row < self.table.rowCount():
-                self.load_model_info(row, 0)
-            QMessageBox.information(self, "撤销完成", "已撤销该模型的上次移动")
-            src_abs = os.path.normpath(os.path.abspath(moved_path))
-            dst_abs = os.path.normpath(os.path.abspath(orig_path))
-            self.log(f"撤销移动: {filename} 已从 {win_path(moved_path)} 撤回到 {win_path(orig_path)}")
-        except Exception as e:
-            self.log(f"撤销移动失败: {e}\n源: {src}\n目标: {dst}")
-            QMessageBox.warning(self, "撤销错误", f"撤销操作失败: {str(e)}\n源: {src}\n目标: {dst}")
-            self.load_model_info(row, 0)
+        # 检查目标目录是否存在
+        if not os.path.isdir(orig_path):
+            QMessageBox.warning(self, "撤销错误", f"撤销操作失败: 目标文件夹不存在: {orig_path}")
+            return
+        base_name = os.path.splitext(filename)[0]
+        pairs = [(src, os.path.join(orig_path, os.path.basename(src)))
+                 for src in self.sidecars.existing(os.path.join(moved_path, base_name), ALL_MODEL_EXTS)]
+        group = FileOpGroup("move", rec, pairs, orig_path)
+
+        def on_done(groups, cancelled):
+            if group.ok:
+                rec.moved_path = ""
+                self.table_model.record_changed(rec)
+                self.refresh_row_image(rec)
+                if rec is self.table.current_record():
+                    self.load_model_info(rec)
+                QMessageBox.information(self, "撤销完成", "已撤销该模型的上次移动")
+                self.log(f"撤销移动: {filename} 已从 {win_path(moved_path)} 撤回到 {win_path(orig_path)}")
+            else:
+                self.log(f"撤销移动失败: {group.error}\n源: {moved_path}\n目标: {orig_path}")
+                QMessageBox.warning(self, "撤销错误", f"撤销操作失败，已回滚: {group.error}\n源: {moved_path}\n目标: {orig_path}")
+                self.load_model_info(rec)
+        self._start_file_job([group], f"正在撤销移动: {filename}", on_done=on_done)
 
-    def undo_rename(self, row):  # 撤回重命名
-        if row not in self.rename_history:
+    def undo_rename(self, rec):  # 撤回重命名
+        if rec not in self.rename_history:
             QMessageBox.information(self, "提示", "没有可撤回的重命名记录")
             return
-        old_base, new_base, file_ext, dir_path = self.rename_history[row]
+        old_base, new_base, file_ext, dir_path = self.rename_history[rec]
         # 检查是否有重名
-        for ext in ALL_MODEL_EXTS:
-            check_file = os.path.join(dir_path, old_base + ext)
-            if os.path.exists(check_file):
-                QMessageBox.warning(self, "撤回失败", f"已存在同名文件：\n{check_file}\n无法撤回。")
-                return
-        moved_files = []
-        try:
-            for ext in ALL_MODEL_EXTS:
-                old_file = os.path.join(dir_path, new_base + ext)
-                new_file = os.path.join(dir_path, old_base + ext)
-                if os.path.exists(old_file):
-                    shutil.move(old_file, new_file)
-                    moved_files.append((new_file, old_file))
-            self.table.setItem(row, 1, QTableWidgetItem(old_base + file_ext))
-            self.modified = True
-            self.log(f"撤回重命名成功: {new_base + file_ext} → {old_base + file_ext}")
-            QMessageBox.information(self, "撤回重命名", f"已撤回为：{old_base + file_ext}")
-            # 撤回后删除记录
-            del self.rename_history[row]
-        except Exception as e:
-            # 回滚
-            for new_file, old_file in reversed(moved_files):
-                if os.path.exists(new_file):
-                    try:
-                        shutil.move(new_file, old_file)
-                    except Exception as e2:
-                        self.log(f"回滚移动失败: {e2}")
-            self.log(f"撤回重命名失败: {e}")
-            QMessageBox.warning(self, "撤回重命名失败", f"撤回重命名时发生错误：\n{e}")
+        check_file = self.sidecars.first(os.path.join(dir_path, old_base), ALL_MODEL_EXTS)
+        if check_file:
+            QMessageBox.warning(self, "撤回失败", f"已存在同名文件：\n{check_file}\n无法撤回。")
+            return
+        self.release_gif_resource()
+        group = FileOpGroup("rename", rec, self._rename_pairs(dir_path, new_base, old_base), (old_base, file_ext))
+
+        def on_done(groups, cancelled):
+            if group.ok:
+                rec.filename = old_base + file_ext
+                self.table_model.record_changed(rec)
+                self.modified = True
+                self.log(f"撤回重命名成功: {new_base + file_ext} → {old_base + file_ext}")
+                QMessageBox.information(self, "撤回重命名", f"已撤回为：{old_base + file_ext}")
+                # 撤回后删除记录
+                self.rename_history.pop(rec, None)
+            else:
+                self.log(f"撤回重命名失败: {group.error}")
+                QMessageBox.warning(self, "撤回重命名失败", f"撤回重命名时发生错误，已回滚：\n{group.error}")
+            if rec is self.table.current_record():
+                self.load_model_info(rec)
+        self._start_file_job([group], f"正在撤回重命名: {new_base + file_ext}", on_done=on_done)
 
     def update_stats(self):
-        total = self.table.rowCount()
-        type_count = {}
-        hash_count = 0
-        for row in range(total):
-            t = self.table.item(row, 4).text()
-            type_count[t] = type_count.get(t, 0) + 1
-            orig_path = self.table.item(row, 3).text()
-            filename = self.table.item(row, 1).text()
-            base = os.path.splitext(os.path.join(orig_path, filename))[0]
-            sha256_path = base + ".sha256"
-            if os.path.exists(sha256_path):
-                hash_count += 1
-        stat_str = f"总数: {total}  哈希值: {hash_count}  " + "  ".join([f"{k}:{v}" for k, v in type_count.items()])
+        """只读取模型维护的计数器，不遍历记录也不访问磁盘"""
+        stats = self.table_model.stats
+        stat_str = f"总数: {stats.total}  哈希值: {stats.hashed}  " + "  ".join(
+            [f"{k}:{v}({self.format_file_size(stats.type_bytes.get(k, 0))})" for k, v in stats.type_count.items()])
         self.stats_label.setText("日志：" + stat_str)
 
     def check_duplicates(self):
-        info = {}
-        for row in range(self.table.rowCount()):
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            full_path = os.path.join(orig_path, filename)
-            if not os.path.exists(full_path):
-                continue
-            size = os.path.getsize(full_path)
-            sha256_path = os.path.splitext(full_path)[0] + ".sha256"
-            if os.path.exists(sha256_path):
-                try:
-                    with open(sha256_path, "r") as fsha:
-                        hashv = fsha.read().strip()
-                except Exception:
-                    hashv = self.calc_sha256(full_path)
-            else:
-                hashv = self.calc_sha256(full_path)
-            key = (hashv, size)
-            info.setdefault(key, []).append(full_path)
-        duplicates = [files for files in info.values() if len(files) > 1]
+        paths = [rec.full_path for rec in self.table_model.records]
+        progress = QProgressDialog("正在查找重复模型...", "取消", 0, 0, self)
+        progress.setWindowTitle("进度")
+        progress.setWindowModality(Qt.ApplicationModal)
+        progress.setAutoReset(False)
+        progress.setAutoClose(False)
+        progress.setValue(0)
+        self.duplicate_worker = DuplicateFinderWorker(paths, self.sha256_cache)
+        self.duplicate_worker.progress.connect(
+            lambda idx, total, stage: (
+                progress.setMaximum(total),
+                progress.setValue(idx),
+                progress.setLabelText(f"{stage}... ({idx}/{total})")
+            )
+        )
+        self.duplicate_worker.finished.connect(
+            lambda duplicates, cancelled: self._on_duplicates_found(progress, duplicates, cancelled)
+        )
+        progress.canceled.connect(self.duplicate_worker.cancel)
+        self.duplicate_worker.start()
+        progress.exec()
+
+    def _on_duplicates_found(self, progress, duplicates, cancelled):
+        progress.close()
+        if cancelled:
+            self.log("已取消查重")
+            return
         if not duplicates:
             QMessageBox.information(self, "查重", "未发现重复模型文件")
             return
         dlg = DuplicateDialog(duplicates, self)
         dlg.exec()
 
-    def calc_sha256(self, filepath):
-        h = hashlib.sha256()
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                h.update(chunk)
-        return h.hexdigest()
-    
-    def rename_model(self, row, new_name=None):
+    def rename_model(self, rec, new_name=None):
         self.release_gif_resource()
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        dir_path = moved_path if moved_path else orig_path
+        filename = rec.filename
+        dir_path = rec.dir_path
         file_ext = os.path.splitext(filename)[1]
         base_old = os.path.splitext(filename)[0]
         if new_name is None:
@@ -2034,125 +4080,138 @@ class ModelClassifierGUI(QMainWindow):
             new_base = new_name
         new_name_full = new_base + file_ext
         # 检查同目录下是否有同名文件
-        for ext in ALL_MODEL_EXTS:
-            check_file = os.path.join(dir_path, new_base + ext)
-            if os.path.exists(check_file):
-                QMessageBox.warning(self, "重命名冲突", f"已存在同名文件：\n{check_file}\n请换个名字。")
-                return
-        moved_files = []
-        try:
-            for ext in ALL_MODEL_EXTS:
-                old_file = os.path.join(dir_path, base_old + ext)
-                new_file = os.path.join(dir_path, new_base + ext)
-                if os.path.exists(old_file):
-                    shutil.move(old_file, new_file)
-                    moved_files.append((new_file, old_file))  # 记录新->旧，便于回滚
-            self.table.setItem(row, 1, QTableWidgetItem(new_name_full))
-            self.modified = True
-            self.log(f"重命名成功: {base_old + file_ext} → {new_name_full}")
-            self.rename_history[row] = (base_old, new_base, file_ext, dir_path)
-        except Exception as e:
-            # 回滚已移动的文件
-            for new_file, old_file in reversed(moved_files):
-                if os.path.exists(new_file):
-                    try:
-                        shutil.move(new_file, old_file)
-                    except Exception as e2:
-                        self.log(f"回滚移动失败: {e2}")
-                        try:
-                            os.remove(new_file)
-                            self.log(f"已删除回滚失败残留文件: {new_file}")
-                        except Exception as e3:
-                            self.log(f"删除残留文件失败: {e3}")
-            self.log(f"重命名失败: {e}")
-            QMessageBox.warning(self, "重命名失败", f"重命名文件时发生错误：\n{e}")
+        check_file = self.sidecars.first(os.path.join(dir_path, new_base), ALL_MODEL_EXTS)
+        if check_file:
+            QMessageBox.warning(self, "重命名冲突", f"已存在同名文件：\n{check_file}\n请换个名字。")
             return
-        self.load_model_info(row, 0)
+        group = FileOpGroup("rename", rec, self._rename_pairs(dir_path, base_old, new_base), (new_base, file_ext))
 
-    def move_selected_model(self, row, target_dir=None):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        full_path = os.path.join(orig_path, filename)
-        base_path = os.path.splitext(full_path)[0]
-        gif_file = base_path + DYNAMIC_PREVIEW_IMAGE_EXTS[0]
-        # 检查GIF是否被占用
-        if os.path.exists(gif_file) and self.is_file_locked(gif_file):
-            QMessageBox.warning(self, "移动失败", f"GIF预览区正在被占用，无法移动：\n{gif_file}\n请关闭所有预览窗口后重试。")
-            self.log(f"移动中断，GIF被占用：{gif_file}")
-            return
-        # 只有真正要移动时才释放GIF资源
-        self.release_gif_resource()
-        # 检查目标目录同名
-        if target_dir is None:
-            target_dir = QFileDialog.getExistingDirectory(self, "选择目标目录", self.model_dir)
-            if not target_dir:
-                self.log("用户取消了目标目录选择，移动中断")
-                return
+        def on_done(groups, cancelled):
+            if group.ok:
+                rec.filename = new_name_full
+                self.table_model.record_changed(rec)
+                self.modified = True
+                self.log(f"重命名成功: {base_old + file_ext} → {new_name_full}")
+                self.rename_history[rec] = (base_old, new_base, file_ext, dir_path)
+            else:
+                self.log(f"重命名失败: {group.error}")
+                QMessageBox.warning(self, "重命名失败", f"重命名文件时发生错误，已回滚：\n{group.error}")
+            self.load_model_info(rec)
+        self._start_file_job([group], f"正在重命名: {filename}", on_done=on_done)
 
-    def move_selected_model(self, row, target_dir=None, show_message=True):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        full_path = os.path.join(orig_path, filename)
-        base_path = os.path.splitext(full_path)[0]
-        gif_file = base_path + DYNAMIC_PREVIEW_IMAGE_EXTS[0]
-        if os.path.exists(gif_file) and self.is_file_locked(gif_file):
-            if show_message:
-                QMessageBox.warning(self, "移动失败", f"GIF预览区正在被占用，无法移动：\n{gif_file}\n请关闭所有预览窗口后重试。")
-            self.log(f"移动中断，GIF被占用：{gif_file}")
-            return
+    def _rename_pairs(self, dir_path, old_base, new_base):
+        """同目录改名：模型及所有关联文件的 [(旧路径, 新路径)]，保留各自的后缀"""
+        old_base_path = os.path.join(dir_path, old_base)
+        new_base_path = os.path.join(dir_path, new_base)
+        return [(old_file, new_base_path + old_file[len(old_base_path):])
+                for old_file in self.sidecars.existing(old_base_path, ALL_MODEL_EXTS)]
+
+    def move_selected_model(self, rec, target_dir=None, show_message=True):
+        """在后台移动模型及所有关联文件，任务已提交返回 True"""
+        filename = rec.filename
         self.release_gif_resource()
         if target_dir is None:
             target_dir = QFileDialog.getExistingDirectory(self, "选择目标目录", self.model_dir)
             if not target_dir:
                 self.log("用户取消了目标目录选择，移动中断")
-                return
-        for ext in ALL_MODEL_EXTS:
-            dst_file = os.path.join(target_dir, os.path.basename(base_path + ext))
-            if os.path.exists(dst_file):
+                return False
+        group = self._plan_move(rec, target_dir, show_message)
+        if group is None:
+            return False
+
+        def on_done(groups, cancelled):
+            if group.ok:
+                self._apply_move(group)
                 if show_message:
-                    QMessageBox.warning(self, "移动冲突", f"目标目录已存在同名文件：\n{dst_file}\n请先手动处理后再移动。")
-                self.log(f"移动中断，目标目录已存在同名文件：{dst_file}")
-                return
-        error = None
-        moved_files = []
-        try:
-            for ext in ALL_MODEL_EXTS:
-                src_file = base_path + ext
-                dst_file = os.path.join(target_dir, os.path.basename(src_file))
-                if os.path.exists(src_file):
-                    shutil.move(src_file, dst_file)
-                    moved_files.append((dst_file, src_file))
-            self.table.setItem(row, 6, QTableWidgetItem(win_path(target_dir)))
-            self.log(f"模型 {filename} 及关联文件已移动到: {win_path(target_dir)}")
-            if show_message:
-                QMessageBox.information(self, "移动成功", f"模型及关联文件已移动到: {win_path(target_dir)}")
-            # 关键：移动后立即刷新该行图片
-            self.refresh_row_image(row)
-            # 如果当前选中行就是本行，右侧预览也刷新
-            if row == self.table.currentRow():
-                self.load_model_info(row, 0)
-        except Exception as e:
-            for new_file, old_file in reversed(moved_files):
-                if os.path.exists(new_file):
-                    try:
-                        shutil.move(new_file, old_file)
-                    except Exception as e2:
-                        self.log(f"回滚移动失败: {e2}")
-                        try:
-                            if os.path.basename(new_file) == os.path.basename(old_file):
-                                os.remove(new_file)
-                                self.log(f"已删除回滚失败残留文件: {new_file}")
-                        except Exception as e3:
-                            self.log(f"删除残留文件失败: {e3}")
-            error = str(e)
-            self.log(f"移动文件失败: {error}")
+                    QMessageBox.information(self, "移动成功", f"模型及关联文件已移动到: {win_path(target_dir)}")
+            else:
+                self.log(f"移动文件失败: {group.error}")
+                if show_message:
+                    QMessageBox.warning(self, "移动错误", f"移动文件失败，已回滚：{group.error}")
+        self._start_file_job([group], f"正在移动: {filename}", on_done=on_done)
+        return True
+
+    def _plan_move(self, rec, target_dir, show_message=False):
+        """生成移动一个模型及其关联文件的操作组；目标目录已有同名模型时返回 None"""
+        base_path = rec.base_path
+        dst_file = self.sidecars.first(os.path.join(target_dir, os.path.basename(base_path)), ALL_MODEL_EXTS)
+        if dst_file:
             if show_message:
-                QMessageBox.warning(self, "移动错误", f"移动文件失败，已回滚：{error}")
+                QMessageBox.warning(self, "移动冲突", f"目标目录已存在同名文件：\n{dst_file}\n请先手动处理后再移动。")
+            self.log(f"移动中断，目标目录已存在同名文件：{dst_file}")
+            return None
+        pairs = [(src, os.path.join(target_dir, os.path.basename(src)))
+                 for src in self.sidecars.existing(base_path, ALL_MODEL_EXTS)]
+        return FileOpGroup("move", rec, pairs, target_dir)
 
-    def generate_sha256(self, row):
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        full_path = os.path.join(orig_path, filename)
+    def _apply_move(self, group):
+        """移动成功后更新记录和表格行"""
+        rec = group.rec
+        rec.moved_path = win_path(group.data)
+        if group.sha256:
+            rec.sha256 = group.sha256
+        self.table_model.record_changed(rec)
+        self.log(f"模型 {rec.filename} 及关联文件已移动到: {win_path(group.data)}")
+        # 关键：移动后立即刷新该行图片
+        self.refresh_row_image(rec)
+        # 如果当前选中行就是本行，右侧预览也刷新
+        if rec is self.table.current_record():
+            self.load_model_info(rec)
+
+    def _start_file_job(self, groups, title, on_group=None, on_done=None, atomic=False):
+        """把文件操作交给后台引擎执行，界面保持响应；进度按字节显示，可取消（已完成的组保留，进行中的组回滚）"""
+        progress = QProgressDialog(title, "取消", 0, 1000, self)
+        progress.setWindowTitle("进度")
+        progress.setWindowModality(Qt.ApplicationModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoReset(False)
+        progress.setAutoClose(False)
+        progress.setValue(0)
+        job_id = self.file_ops.submit(groups, atomic)
+        progress.canceled.connect(lambda: self.file_ops.cancel(job_id))
+        self._file_jobs[job_id] = (progress, title, on_group, on_done, groups)
+        return job_id
+
+    def _on_file_progress(self, job_id, done, total, name):
+        job = self._file_jobs.get(job_id)
+        if not job:
+            return
+        progress, title = job[0], job[1]
+        progress.setValue(int(done * 1000 / total) if total else 0)
+        progress.setLabelText(f"{title}\n{name}\n{self.format_file_size(done)} / {self.format_file_size(total)}")
+
+    def _on_file_group_finished(self, job_id, group):
+        # 关联文件索引按实际结果更新；失败时文件已回滚，直接让相关目录重新 scandir
+        if group.ok:
+            for src, dst in group.done:
+                if group.kind == "delete":
+                    self.sidecars.discard(src)
+                elif src is None:
+                    self.sidecars.add(dst)
+                else:
+                    self.sidecars.moved(src, dst)
+        else:
+            for src, dst in group.pairs:
+                self.sidecars.invalidate(os.path.dirname(src))
+                if dst:
+                    self.sidecars.invalidate(os.path.dirname(dst))
+        job = self._file_jobs.get(job_id)
+        if job and job[2]:
+            job[2](group)
+
+    def _on_file_job_finished(self, job_id, cancelled):
+        job = self._file_jobs.pop(job_id, None)
+        if not job:
+            return
+        progress, _, _, on_done, groups = job
+        progress.close()
+        progress.deleteLater()
+        if on_done:
+            on_done(groups, cancelled)
+
+    def generate_sha256(self, rec):
+        filename = rec.filename
+        full_path = rec.full_path
         progress = QProgressDialog("正在生成SHA256...", None, 0, 0, self)
         progress.setWindowTitle("进度")
         progress.setWindowModality(Qt.ApplicationModal)
@@ -2165,10 +4224,12 @@ class ModelClassifierGUI(QMainWindow):
             if hashv:
                 with open(sha_path, 'w') as f:
                     f.write(hashv)
-                self.table.setItem(row, 7, QTableWidgetItem(hashv[:10]))
-                self.table.setItem(row, 8, QTableWidgetItem(hashv))
-                if row == self.table.currentRow():
-                    self.load_model_info(row, 0)
+                self.sidecars.add(sha_path)
+                self.sha256_cache.store(full_path, hashv)
+                rec.sha256 = hashv
+                self.table_model.record_changed(rec)
+                if rec is self.table.current_record():
+                    self.load_model_info(rec)
                 now = datetime.now().strftime("%H:%M:%S")
                 self.log_output.append(f"[{now}] 单独生成哈希值：{filename} 已生成哈希值。")
                 self.log_output.moveCursor(QTextCursor.End)
@@ -2181,34 +4242,33 @@ class ModelClassifierGUI(QMainWindow):
         if not self.model_dir:
             QMessageBox.warning(self, "提示", "请先选择模型目录")
             return
-        total = self.table.rowCount()
         file_list = []
-        for row in range(total):
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            full_path = os.path.join(orig_path, filename)
+        for rec in self.table_model.records:
+            full_path = rec.full_path
             if os.path.exists(full_path):
-                file_list.append((row, full_path))
+                file_list.append((rec, full_path))
         if not file_list:
             QMessageBox.information(self, "提示", "没有可处理的模型文件")
             return
-        progress = QProgressDialog("正在批量生成SHA256...", "取消", 0, len(file_list), self)
+        progress = QProgressDialog("正在批量生成SHA256...", "取消", 0, 1000, self)
         progress.setWindowTitle("进度")
         progress.setWindowModality(Qt.ApplicationModal)
         progress.setValue(0)
-        self.sha256_worker = Sha256BatchWorker(file_list)
-        self.sha256_worker.progress_changed.connect( lambda idx, total, short_hash, full_hash, filename: self._on_sha256_progress(idx, total, short_hash, full_hash, filename, file_list, progress))
+        self.sha256_worker = Sha256BatchWorker(file_list, self.sha256_cache)
+        self.sha256_worker.progress_changed.connect( lambda done, total, idx, full_hash, filename: self._on_sha256_progress(done, total, idx, full_hash, filename, file_list, progress))
+        self.sha256_worker.bytes_progress.connect(progress.setValue)
         self.sha256_worker.finished.connect( lambda new_count, skip_count: self._on_sha256_finished(progress, new_count, skip_count))
         progress.canceled.connect(self.sha256_worker.cancel)
         self.sha256_worker.start()
         progress.exec()
 
-    def _on_sha256_progress(self, idx, total, short_hash, full_hash, filename, file_list, progress):
-        row, _ = file_list[idx-1]
-        self.table.setItem(row, 7, QTableWidgetItem(short_hash))
-        self.table.setItem(row, 8, QTableWidgetItem(full_hash))
-        progress.setValue(idx)
-        progress.setLabelText(f"正在生成 {filename} 的SHA256... ({idx}/{total})")
+    def _on_sha256_progress(self, done, total, idx, full_hash, filename, file_list, progress):
+        rec, full_path = file_list[idx]
+        if full_hash:
+            self.sidecars.add(os.path.splitext(full_path)[0] + ".sha256")
+        rec.sha256 = full_hash
+        self.table_model.record_changed(rec)
+        progress.setLabelText(f"已完成 {filename} 的SHA256... ({done}/{total})")
 
     def _on_sha256_finished(self, progress, new_count, skip_count):
         progress.close()
@@ -2237,41 +4297,8 @@ class ModelClassifierGUI(QMainWindow):
         gif_path = base + DYNAMIC_PREVIEW_IMAGE_EXTS[0]
         if os.path.exists(gif_path):
             try:
-                if not hasattr(self, "_gif_player") or self._gif_player is None:
-                    gif_player = GifPlayer(gif_path, self.dynamic_image_label)
-                    if gif_player.movie:
-                        self._gif_player = gif_player
-                    else:
-                        self._gif_player = None
-                        raise Exception("GIF加载失败")
-                else:
-                    if self._gif_player:
-                        self._gif_player.set_gif(gif_path)
-                    else:
-                        raise Exception("GIF加载失败")
-                if self._gif_player and self._gif_player.movie:
-                    self.dynamic_image_label.setMovie(self._gif_player.movie)
-                    self.dynamic_image_label.setText("")
-                    # 缩放逻辑
-                    def scale_movie():
-                        size = self._gif_player.movie.currentImage().size()
-                        if size.width() > 0 and size.height() > 0:
-                            max_height = 240
-                            max_width = 240
-                            w, h = size.width(), size.height()
-                            if h > max_height:
-                                w = int(w * max_height / h)
-                                h = max_height
-                            if w > max_width:
-                                h = int(h * max_width / w)
-                                w = max_width
-                            self._gif_player.movie.setScaledSize(QSize(w, h))
-                            self._gif_player.movie.frameChanged.disconnect(scale_movie)
-                    self._gif_player.movie.frameChanged.connect(scale_movie)
-                    self._gif_player.movie.start()
-                    self._gif_player.movie.jumpToFrame(0)
-                else:
-                    raise Exception("GIF加载失败")
+                self.dynamic_image_label.setText("")
+                self._ensure_gif_player().set_gif(gif_path)
             except Exception as e:
                 self.dynamic_image_label.setText("GIF加载失败")
                 self.log(f"动态预览图像加载失败：{gif_path} {e}")
@@ -2281,216 +4308,58 @@ class ModelClassifierGUI(QMainWindow):
 
     def refresh_preview_and_table(self):
         self.release_gif_resource()
-        row = self.table.currentRow()
-        if row >= 0:
-            self.load_model_info(row, 0)
+        rec = self.table.current_record()
+        if rec is not None:
+            self.load_model_info(rec)
             # 刷新表格图片缩略图
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            moved_path = self.table.item(row, 6).text()
-            use_path = moved_path if moved_path else orig_path
-            base_path = os.path.splitext(os.path.join(use_path, filename))[0]
-            preview_path, _ = self.find_preview_image(base_path)
-            image_item = QTableWidgetItem()
-            if preview_path:
-                pixmap = QPixmap(preview_path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_item.setData(Qt.ItemDataRole.DecorationRole, pixmap)
-            # 先清空再设置，确保刷新
-            self.table.setItem(row, 0, QTableWidgetItem())  # 清空
-            self.table.setItem(row, 0, image_item)
+            old_preview_path = rec.preview_path
+            rec.preview_path, _ = self.find_preview_image(rec.base_path)
+            self.table_model.refresh_thumbnail(rec, old_preview_path)
         else:
             self.static_image_label.setText("无静态预览图")
             self.dynamic_image_label.setText("无动态预览图")
             self.static_info_label.setText("【静态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
             self.dynamic_info_label.setText("【动态预览】\n尺寸：null\n大小：null\n后缀名：null\n")
-        # row = self.table.currentRow()
-        if row >= 0:
-            # self.load_model_info(row, 0)
-# 刷新表格图片缩略图
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            base_path = os.path.splitext(os.path.join(orig_path, filename))[0]
-            preview_path, _ = self.find_preview_image(base_path)
-            image_item = QTableWidgetItem()
-            if preview_path:
-                pixmap = QPixmap(preview_path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_item.setData(Qt.ItemDataRole.DecorationRole, pixmap)
-            self.table.setItem(row, 0, image_item)
-
-    def refresh_preview_buttons(self):
-        row = self.table.currentRow()
-        if row < 0:
-            return
-        filename = self.table.item(row, 1).text()
-        orig_path = self.table.item(row, 3).text()
-        moved_path = self.table.item(row, 6).text()
-        use_path = moved_path or orig_path
-        base = os.path.splitext(os.path.join(use_path, filename))[0]
-        has_static = any(os.path.exists(base + ext) for ext in STATIC_PREVIEW_IMAGE_EXTS)
-        has_gif = any(os.path.exists(base + ext) for ext in DYNAMIC_PREVIEW_IMAGE_EXTS)
 
     def log(self, msg):
         now = datetime.now().strftime("%H:%M:%S")
         self.log_output.append(f"[{now}] {msg}")
         self.log_output.moveCursor(QTextCursor.End)
 
-    @staticmethod
-    def is_file_locked(filepath):
-        """跨平台检测文件是否被占用（Windows下最可靠）"""
-        import sys
-        import os
-        if not os.path.exists(filepath):
-            return False
-        if sys.platform == "win32":
-            import win32con
-            import win32file
-            try:
-                handle = win32file.CreateFile(
-                    filepath,
-                    win32con.GENERIC_READ | win32con.GENERIC_WRITE,
-                    0,  # 不允许共享
-                    None,
-                    win32con.OPEN_EXISTING,
-                    0,
-                    None
-                )
-                win32file.CloseHandle(handle)
-                return False
-            except Exception:
-                return True
-        else:
-            try:
-                with open(filepath, "rb+"):
-                    pass
-                return False
-            except Exception:
-                return True
-
-    def check_duplicates_with_sha256_check(self):
-        model_count = 0
-        sha256_count = 0
-        model_files = []
-        for row in range(self.table.rowCount()):
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            full_path = os.path.join(orig_path, filename)
-            if not os.path.exists(full_path):
-                continue
-            model_count += 1
-            model_files.append(full_path)
-            sha256_path = os.path.splitext(full_path)[0] + ".sha256"
-            if os.path.exists(sha256_path):
-                sha256_count += 1
-        if model_count != sha256_count:
-            ret = QMessageBox.question(
-                self, "SHA256数量不一致",
-                f"模型文件数：{model_count}，SHA256文件数：{sha256_count}\n是否补全缺失的SHA256？",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
-            )
-            if ret == QMessageBox.StandardButton.Yes:
-                missing_files = [f for f in model_files if not os.path.exists(os.path.splitext(f)[0] + ".sha256")]
-                if not missing_files:
-                    self.log("没有缺失的SHA256文件")
-                    self.check_duplicates()
-                    return
-                progress = QProgressDialog("正在补全缺失的SHA256...", "取消", 0, len(missing_files), self)
-                progress.setWindowTitle("进度")
-                progress.setWindowModality(Qt.ApplicationModal)
-                progress.setValue(0)
-
-                class Sha256FillWorker(QThread):
-                    progress_signal = Signal(int, int, str)
-                    finished_signal = Signal()
-
-                    def __init__(self, files, parent=None):
-                        super().__init__(parent)
-                        self.files = files
-                        self._is_cancelled = False
-                        self._removed_once = False
-
-                    def run(self):
-                        for idx, full_path in enumerate(self.files, 1):
-                            if self._is_cancelled:
-                                break
-                            sha256_path = os.path.splitext(full_path)[0] + ".sha256"
-                            hashv = self.parent().calc_sha256(full_path)
-                            with open(sha256_path, 'w') as f:
-                                f.write(hashv)
-                            self.progress_signal.emit(idx, len(self.files), os.path.basename(full_path))
-                        self.finished_signal.emit()
-
-                    def cancel(self):
-                        self._is_cancelled = True
-
-                self.sha256_fill_worker = Sha256FillWorker(missing_files, self)
-                self.sha256_fill_worker.progress_signal.connect(
-                    lambda idx, total, filename: (
-                        progress.setValue(idx),
-                        progress.setLabelText(f"正在生成: {filename} ({idx}/{total})"),
-                        QApplication.processEvents()
-                    )
-                )
-                self.sha256_fill_worker.finished_signal.connect(
-                    lambda: (
-                        progress.close(),
-                        self.log("已补全缺失的SHA256文件"),
-                        self.check_duplicates()
-                    )
-                )
-                progress.canceled.connect(self.sha256_fill_worker.cancel)
-                self.sha256_fill_worker.start()
-                progress.exec()
-                return
-            elif ret == QMessageBox.StandardButton.Cancel:
-                return
-        self.check_duplicates()
-
     def auto_save_json(self):
         description = self.description_input.toPlainText().strip()
         notes = self.notes_input.toPlainText().strip()
         vae = self.vae_input.toPlainText().strip()
         json_path = getattr(self, "current_json_path", None)
         if not json_path:
-            row = self.table.currentRow()
-            if row < 0:
+            rec = self.table.current_record()
+            if rec is None:
                 self.log("auto_save_json: 无有效行")
                 return
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            base = os.path.splitext(os.path.join(orig_path, filename))[0]
-            json_path = base + ".json"
+            json_path = rec.base_path + ".json"
         json_path = os.path.normpath(json_path)
         data = {
             "description": description,
             "notes": notes,
             "vae": vae
         }
-        empty_struct = {
-            "description": "",
-            "notes": "",
-            "vae": ""
-        }
-        if data == empty_struct:
-            json_path = os.path.normpath(json_path)
-            if os.path.exists(json_path):
-                try:
-                    os.remove(json_path)
-                    self.log(f"已删除备注JSON: {os.path.basename(json_path)}")
-                except Exception as e:
-                    self.log(f"删除JSON失败: {e}")
-            else:
-                self.log(f"文件不存在，无需删除: {json_path}")
-            return
-        try:
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        # 备注文本同步到搜索索引（不触发重新过滤，避免正在编辑的行被隐藏）
+        rec = self.current_record
+        if rec is not None:
+            rec.notes = "\n".join((description, notes, vae))
+            self.table_model.search_index.update(rec)
+        if rec is not None:
+            self.preview_cache.pop(rec.base_path, None)  # 预取到的备注已过期
+        # 交给后台延迟写入：连续输入只在停顿后写一次，内容全空时删除文件
+        self.json_writer.schedule(json_path, data)
+
+    def _on_json_written(self, json_path, deleted):
+        if deleted:
+            self.sidecars.discard(json_path)
+            self.log(f"已删除备注JSON: {os.path.basename(json_path)}")
+        else:
+            self.sidecars.add(json_path)
             self.log(f"自动保存备注JSON: {os.path.basename(json_path)}")
-        except Exception as e:
-            self.log(f"保存JSON失败: {e}")
 
     def delete_empty_json_files(self):
         if not self.model_dir:
@@ -2506,6 +4375,7 @@ class ModelClassifierGUI(QMainWindow):
                             content = json.load(jf)
                         if not (content.get("description") or content.get("notes") or content.get("vae")):
                             os.remove(full_path)
+                            self.sidecars.discard(full_path)
                             deleted_files += 1
                             self.log(f"删除空白JSON文件: {full_path}")
                     except Exception as e:
@@ -2521,17 +4391,9 @@ class ModelClassifierGUI(QMainWindow):
 # 操作前释放GIF资源
         self.release_gif_resource()
         deleted_set = set(os.path.normpath(f) for f in deleted_files)
-        rows_to_remove = []
-        for row in range(self.table.rowCount()):
-            filename = self.table.item(row, 1).text()
-            orig_path = self.table.item(row, 3).text()
-            full_path = os.path.normpath(os.path.join(orig_path, filename))
-            if full_path in deleted_set:
-                rows_to_remove.append(row)
-        for row in reversed(rows_to_remove):
-            self.table.removeRow(row)
-        self.update_stats()
-        self.log(f"已从列表移除 {len(rows_to_remove)} 个被删除的模型文件")
+        records_to_remove = [rec for rec in self.table_model.records if os.path.normpath(rec.full_path) in deleted_set]
+        self.table_model.remove_records(records_to_remove)
+        self.log(f"已从列表移除 {len(records_to_remove)} 个被删除的模型文件")
 
 class DuplicateDialog(QDialog):
     def __init__(self, duplicates, parent=None):
@@ -2632,6 +4494,10 @@ class DuplicateDialog(QDialog):
         self.modified = False
         self.deleted_files = []
         self._removed_once = False
+        self.json_writer = JsonWriteBehind(parent=self)
+        self.json_writer.written.connect(self._on_json_written)
+        self.json_writer.failed.connect(lambda path, err: self.log(f"保存JSON失败: {path} {err}"))
+        self.finished.connect(lambda _: self.json_writer.flush(wait=True))  # Esc/accept 关闭时不经过 closeEvent
         self.table.cellClicked.connect(self.update_preview)
         self.desc_edit.textChanged.connect(self.auto_save_json)
         self.notes_edit.textChanged.connect(self.auto_save_json)
@@ -2710,6 +4576,8 @@ class DuplicateDialog(QDialog):
                 except Exception as e:
                     self.log(f"重命名失败: {e}")
                     error = str(e)
+                if self.parent_gui:
+                    self.parent_gui.sidecars.invalidate(dir_path)
                 if 0 <= row < self.table.rowCount():
                     self.release_gif_resource()
                     self.update_preview(row, 0)
@@ -2719,51 +4587,11 @@ class DuplicateDialog(QDialog):
                 self.release_gif_resource()
                 self.update_preview(row, 0)
 
-        # 在释放资源后强制刷新
     def release_gif_resource(self):
-        try:
-            if hasattr(self, "_gif_player") and self._gif_player:
-                if self._gif_player.movie:
-                    self.dynamic_image_label.setMovie(None)
-                    self._gif_player.movie.stop()
-                    self._gif_player.movie.deleteLater()
-                    self._gif_player.movie = None
-                if self._gif_player.buffer:
-                    self._gif_player.buffer.close()
-                    self._gif_player.buffer.deleteLater()
-                    self._gif_player.buffer = None
-                self._gif_player.byte_array = None
-                del self._gif_player
-                self._gif_player = None
-            if hasattr(self, "_movie") and self._movie:
-                self.dynamic_image_label.setMovie(None)
-                self._movie.stop()
-                self._movie.deleteLater()
-                self._movie = None
-            self.dynamic_image_label.setMovie(None)
-            transparent = QPixmap(240, 240)
-            transparent.fill(Qt.transparent)
-            self.dynamic_image_label.setPixmap(transparent)
-            self.dynamic_image_label.clear()
-            self.dynamic_image_label.setText("无动态预览图")
-            # ----------- 1. 强制刷新 label -----------
-            self.dynamic_image_label.repaint()
-            self.dynamic_image_label.update()
-            QApplication.processEvents()
-            # ----------- 2. 强制刷新父窗口 -----------
-            parent = self.dynamic_image_label.parentWidget()
-            if parent:
-                parent.update()
-                parent.repaint()
-            window = self.dynamic_image_label.window()
-            if window:
-                window.update()
-                window.repaint()
-            QApplication.processEvents()
-            # ----------------------------------------
-        except Exception as e:
-            self.log(f"释放GIF资源异常: {e}")
-        gc.collect()
+        if self._gif_player:
+            self._gif_player.release()
+        self.dynamic_image_label.clear()
+        self.dynamic_image_label.setText("无动态预览图")
 
     def fill_table(self):
         self.release_gif_resource()
@@ -2793,16 +4621,12 @@ class DuplicateDialog(QDialog):
                     self.log(f"获取文件大小失败: {file_path}, 错误: {e}")
                     size_str = "N/A"
                 base = os.path.splitext(file_path)[0]
-                sha256_path = base + ".sha256"
                 sha256_val = ""
-                if os.path.exists(sha256_path):
+                if self.parent_gui:
                     try:
-                        with open(sha256_path, "r") as fsha:
-                            sha256_val = fsha.read().strip()
-                    except Exception:
-                        sha256_val = ""
-                else:
-                    sha256_val = self.parent_gui.calc_sha256(file_path) if self.parent_gui else ""
+                        sha256_val, _ = self.parent_gui.sha256_cache.get_or_compute(file_path)
+                    except Exception as e:
+                        self.log(f"计算哈希值失败: {file_path}, 错误: {e}")
                 self.table.insertRow(row_idx)
                 preview_path, _ = self.parent_gui.find_preview_image(base) if self.parent_gui else (None, None)
                 image_item = QTableWidgetItem()
@@ -2906,6 +4730,8 @@ class DuplicateDialog(QDialog):
                                 self.log(f"回滚删除失败: {e2}")
                     self.log(f"删除失败: {e}")
                     error = str(e)
+                if self.parent_gui:
+                    self.parent_gui.sidecars.invalidate(os.path.dirname(full_path))
                 # 只在行还存在时刷新
                 if row < self.table.rowCount():
                     self.release_gif_resource()
@@ -2940,6 +4766,8 @@ class DuplicateDialog(QDialog):
                 except Exception as e:
                     self.log(f"重命名失败: {e}")
                     error = str(e)
+                if self.parent_gui:
+                    self.parent_gui.sidecars.invalidate(dir_path)
                 if 0 <= row < self.table.rowCount():
                     self.release_gif_resource()
                     self.update_preview(row, 0)
@@ -2974,9 +4802,27 @@ class DuplicateDialog(QDialog):
         self._removed_once = True
     
     def closeEvent(self, event):
+        self.json_writer.flush(wait=True)
         self._remove_deleted_once()
         super().closeEvent(event)
 
+    @property
+    def sidecars(self):
+        """关联文件索引属于主窗口，对话框中的文件变动也记到同一个索引里"""
+        return getattr(self.parent_gui, "sidecars", None)
+
+    def refresh_preview_and_table(self):
+        """拖入预览图后刷新当前行的预览，并刷新主窗口表格中对应模型的缩略图"""
+        row = self.table.currentRow()
+        if row < 0 or not self.table.item(row, 1) or not self.table.item(row, 1).text():
+            return
+        self.update_preview(row, 0)
+        if self.parent_gui:
+            full_path = os.path.join(self.table.item(row, 3).text(), self.table.item(row, 1).text())
+            rec = self.parent_gui.table.find_record(full_path)
+            if rec is not None:
+                self.parent_gui.refresh_row_image(rec)
+
     def get_static_info(self):
         path = self.static_image_label.current_preview_path()
         if path and os.path.exists(path):
@@ -2997,6 +4843,7 @@ class DuplicateDialog(QDialog):
         return info
 
     def update_preview(self, row, col):
+        self.json_writer.flush()
         self.release_gif_resource()
         if not self.table.item(row, 1) or not self.table.item(row, 1).text():
             self.static_image_label.setText("无静态预览图")
@@ -3044,55 +4891,26 @@ class DuplicateDialog(QDialog):
         dynamic_info = ""
         if dynamic_preview_path:
             try:
-                if not hasattr(self, "_gif_player") or self._gif_player is None:
-                    gif_player = GifPlayer(dynamic_preview_path, self.dynamic_image_label)
-                    if gif_player.movie:
-                        self._gif_player = gif_player
-                    else:
-                        self._gif_player = None
-                        raise Exception("GIF加载失败")
-                else:
-                    if self._gif_player:
-                        self._gif_player.set_gif(dynamic_preview_path)
-                    else:
-                        raise Exception("GIF加载失败")
-                if self._gif_player and self._gif_player.movie:
-                    self.dynamic_image_label.setMovie(self._gif_player.movie)
-                    self.dynamic_image_label.setText("")
-                    # 让 dynamic_image_label 记录当前 GIF 路径
-                    self.dynamic_image_label.preview_paths = [dynamic_preview_path]
-                    self.dynamic_image_label.current_index = 0
-                    from PySide6.QtGui import QImageReader
-                    reader = QImageReader(dynamic_preview_path)
-                    size = reader.size()
-                    width, height = size.width(), size.height()
-                    file_size = os.path.getsize(dynamic_preview_path)
-                    ext = os.path.splitext(dynamic_preview_path)[1]
-                    dynamic_info = (
-                        f"【动态预览】\n"
-                        f"尺寸：{width}x{height}\n"
-                        f"大小：{self.parent_gui.format_file_size(file_size) if self.parent_gui else f'{file_size}B'}\n"
-                        f"后缀名：{ext.lstrip('.')}\n"
-                    )
-                    def scale_movie():
-                        size = self._gif_player.movie.currentImage().size()
-                        if size.width() > 0 and size.height() > 0:
-                            max_height = 240
-                            max_width = 240
-                            w, h = size.width(), size.height()
-                            if h > max_height:
-                                w = int(w * max_height / h)
-                                h = max_height
-                            if w > max_width:
-                                h = int(h * max_width / w)
-                                w = max_width
-                            self._gif_player.movie.setScaledSize(QSize(w, h))
-                            self._gif_player.movie.frameChanged.disconnect(scale_movie)
-                    self._gif_player.movie.frameChanged.connect(scale_movie)
-                    self._gif_player.movie.start()
-                    self._gif_player.movie.jumpToFrame(0)
-                else:
-                    raise Exception("GIF加载失败")
+                if self._gif_player is None:
+                    self._gif_player = GifPlayer(parent=self.dynamic_image_label, target=self.dynamic_image_label,
+                                                 cache=self.parent_gui.gif_cache if self.parent_gui else None)
+                    self._gif_player.failed.connect(lambda path: self.log(f"动态预览图像加载失败：{path}"))
+                self.dynamic_image_label.setText("")
+                self._gif_player.set_gif(dynamic_preview_path)
+                # 让 dynamic_image_label 记录当前 GIF 路径
+                self.dynamic_image_label.preview_paths = [dynamic_preview_path]
+                self.dynamic_image_label.current_index = 0
+                reader = QImageReader(dynamic_preview_path)
+                size = reader.size()
+                width, height = size.width(), size.height()
+                file_size = os.path.getsize(dynamic_preview_path)
+                ext = os.path.splitext(dynamic_preview_path)[1]
+                dynamic_info = (
+                    f"【动态预览】\n"
+                    f"尺寸：{width}x{height}\n"
+                    f"大小：{self.parent_gui.format_file_size(file_size) if self.parent_gui else f'{file_size}B'}\n"
+                    f"后缀名：{ext.lstrip('.')}\n"
+                )
             except Exception as e:
                 self.dynamic_image_label.setText("GIF加载失败")
                 dynamic_info = "【动态预览】\nGIF加载失败\n"
@@ -3138,26 +4956,23 @@ class DuplicateDialog(QDialog):
             "notes": notes,
             "vae": vae
         }
-        empty_struct = {"description": "", "notes": "", "vae": ""}
-        if data == empty_struct:
-            if os.path.exists(json_path):
-                try:
-                    os.remove(json_path)
-                    self.log(f"已删除空白备注JSON: {os.path.basename(json_path)}")
-                except Exception:
-                    self.log(f"删除空白JSON失败: {json_path}")
+        self.json_writer.schedule(json_path, data)
+
+    def _on_json_written(self, json_path, deleted):
+        if self.parent_gui:
+            if deleted:
+                self.parent_gui.sidecars.discard(json_path)
             else:
-                self.log(f"空白JSON不存在，无需删除: {json_path}")
-            return
-        try:
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                self.parent_gui.sidecars.add(json_path)
+        if deleted:
+            self.log(f"已删除空白备注JSON: {os.path.basename(json_path)}")
+        else:
             self.log(f"自动保存备注JSON: {os.path.basename(json_path)}")
-        except Exception:
-            self.log(f"保存JSON失败: {json_path}")
-            pass
 
 if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--bench-sha256":
+        benchmark_sha256(sys.argv[2])
+        sys.exit(0)
     try:
         app = QApplication(sys.argv)
         window = ModelClassifierGUI()
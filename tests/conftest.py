@@ -0,0 +1,34 @@
+import importlib.util
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+from PySide6.QtWidgets import QApplication, QMessageBox
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "StableDiffusion_ComfyUI_Model_Classifier V1.0.py")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(scope="session")
+def app(qapp):
+    """脚本文件名含空格，不能直接 import，按路径加载一次供所有测试共用"""
+    spec = importlib.util.spec_from_file_location("model_classifier", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def gui(app, monkeypatch):
+    monkeypatch.setattr(QMessageBox, "information", staticmethod(lambda *a, **k: None))
+    monkeypatch.setattr(QMessageBox, "warning", staticmethod(lambda *a, **k: None))
+    window = app.ModelClassifierGUI()
+    yield window
+    window.close()
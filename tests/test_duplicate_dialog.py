@@ -0,0 +1,30 @@
+import os
+
+from PySide6.QtGui import QImage
+
+
+def test_preview_drop_in_duplicate_dialog(app, gui, tmp_path):
+    # 查重对话框没有自己的关联文件索引，拖入预览图应记到主窗口的索引并刷新预览
+    models = []
+    for name in ("a.safetensors", "b.safetensors"):
+        path = tmp_path / name
+        path.write_bytes(b"same")
+        models.append(str(path))
+    src = tmp_path / "drop.png"
+    image = QImage(4, 4, QImage.Format.Format_RGB32)
+    image.fill(0)
+    image.save(str(src))
+
+    base = os.path.splitext(models[0])[0]
+    gui.sidecars.first(base, app.STATIC_PREVIEW_IMAGE_EXTS)  # 预先建立目录索引
+    dlg = app.DuplicateDialog([models], gui)
+    try:
+        dlg.table.setCurrentCell(1, 1)
+        dlg.update_preview(1, 1)
+        dlg.static_image_label.handle_preview_drop(str(src))
+        assert os.path.exists(base + ".preview.png")
+        assert gui.sidecars.first(base, app.STATIC_PREVIEW_IMAGE_EXTS) == base + ".preview.png"
+        assert dlg.static_image_label.preview_paths == [base + ".preview.png"]
+    finally:
+        dlg.json_writer.flush(wait=True)
+        dlg.close()
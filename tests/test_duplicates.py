@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_find_groups_narrows_by_size_samples_and_full_hash(app, tmp_path):
+    size = app.DUPLICATE_SAMPLE_SIZE * 4  # 大于三段抽样，抽样之间有未读取的区域
+    base = bytearray(b"m" * size)
+    a = write(tmp_path / "a.safetensors", bytes(base))
+    b = write(tmp_path / "b.safetensors", bytes(base))
+    head_differs = bytearray(base)
+    head_differs[0] = ord("x")
+    c = write(tmp_path / "c.safetensors", bytes(head_differs))
+    gap_differs = bytearray(base)
+    gap_differs[app.DUPLICATE_SAMPLE_SIZE + 10] = ord("x")  # 只在抽样范围之外不同
+    d = write(tmp_path / "d.safetensors", bytes(gap_differs))
+    e = write(tmp_path / "e.safetensors", b"m" * (size - 1))
+
+    cache = app.Sha256Cache()
+    hashed = []
+    compute = cache.get_or_compute
+    cache.get_or_compute = lambda path, *args: hashed.append(path) or compute(path, *args)
+    worker = app.DuplicateFinderWorker([a, b, c, d, e], cache)
+
+    assert worker.find_groups() == [[a, b]]
+    # 大小不同的 e 和抽样不同的 c 都不会计算完整哈希；抽样相同的 d 由完整哈希排除
+    assert sorted(hashed) == [a, b, d]
+
+
+def test_find_groups_stops_when_cancelled(app, tmp_path):
+    paths = [write(tmp_path / f"{i}.safetensors", b"same") for i in range(4)]
+    worker = app.DuplicateFinderWorker(paths, app.Sha256Cache())
+    worker.progress.connect(lambda *args: worker.cancel())
+    results = []
+    worker.finished.connect(lambda groups, cancelled: results.append((groups, cancelled)))
+    worker.run()
+
+    assert results == [([], True)]
+    assert not any(os.path.exists(os.path.splitext(p)[0] + ".sha256") for p in paths)
+
+
+def test_batch_hashing_limits_workers_per_device(app, tmp_path, monkeypatch):
+    other_root = "/dev/shm"
+    if not os.path.isdir(other_root) or os.stat(other_root).st_dev == os.stat(tmp_path).st_dev:
+        pytest.skip("需要另一个设备上的可写目录")
+    other_dir = tempfile.mkdtemp(dir=other_root)
+    try:
+        files = [write(tmp_path / f"{i}.safetensors", b"a" * 1024) for i in range(4)]
+        files += [write(os.path.join(other_dir, f"{i}.safetensors"), b"b" * 1024) for i in range(4)]
+        worker = app.Sha256BatchWorker([(os.path.basename(p), p) for p in files], max_workers=8, device_workers=1)
+        lock = threading.Lock()
+        running, peak = {}, {}
+        process = worker.process_file
+
+        def tracked(full_path, size):
+            dev = os.stat(full_path).st_dev
+            with lock:
+                running[dev] = running.get(dev, 0) + 1
+                peak[dev] = max(peak.get(dev, 0), running[dev])
+                peak["all"] = max(peak.get("all", 0), sum(running.values()))
+            threading.Event().wait(0.02)
+            try:
+                return process(full_path, size)
+            finally:
+                with lock:
+                    running[dev] -= 1
+
+        monkeypatch.setattr(worker, "process_file", tracked)
+        results = []
+        worker.finished.connect(lambda new, skipped: results.append((new, skipped)))
+        worker.run()
+
+        assert results == [(8, 0)]
+        assert peak[os.stat(tmp_path).st_dev] == 1 and peak[os.stat(other_dir).st_dev] == 1
+        assert peak["all"] == 2  # 两个设备同时在读
+    finally:
+        shutil.rmtree(other_dir)
+
+
+def test_batch_hashing_stops_when_cancelled(app, tmp_path):
+    files = [write(tmp_path / f"{i}.safetensors", b"x" * 1024) for i in range(5)]
+    worker = app.Sha256BatchWorker([(os.path.basename(p), p) for p in files], max_workers=1, device_workers=1)
+    worker.progress_changed.connect(lambda *args: worker.cancel())
+    results = []
+    worker.finished.connect(lambda new, skipped: results.append((new, skipped)))
+    worker.run()
+
+    assert results == [(1, 0)]
+    assert sum(os.path.exists(os.path.splitext(p)[0] + ".sha256") for p in files) == 1
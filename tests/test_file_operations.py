@@ -0,0 +1,227 @@
+import hashlib
+import os
+import threading
+
+import pytest
+from PySide6.QtCore import Qt
+
+
+@pytest.fixture
+def engine(app):
+    return app.FileOperationEngine()
+
+
+def run_job(engine, groups, atomic=False, on_progress=None):
+    """提交任务并等待后台线程完成；信号直接在引擎线程中回调，不依赖事件循环"""
+    finished = threading.Event()
+    result = {}
+
+    def on_job_finished(job_id, cancelled):
+        if job_id == result.get("job_id"):
+            result["cancelled"] = cancelled
+            finished.set()
+
+    engine.job_finished.connect(on_job_finished, Qt.DirectConnection)
+    if on_progress:
+        engine.progress.connect(on_progress, Qt.DirectConnection)
+    result["job_id"] = engine.submit(groups, atomic)
+    assert finished.wait(10), "timeout"
+    return result["cancelled"]
+
+
+def make_model(directory, name, content=b"model data"):
+    """创建模型文件及其预览图、备注，返回 [(源, 目标)] 所需的源路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+    paths = []
+    for ext, data in ((".safetensors", content), (".preview.png", b"png"), (".json", b"{}")):
+        with open(base + ext, "wb") as f:
+            f.write(data)
+        paths.append(base + ext)
+    return paths
+
+
+def move_group(app, sources, target_dir):
+    return app.FileOpGroup("move", None, [(src, os.path.join(target_dir, os.path.basename(src))) for src in sources])
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.startswith(".sd_model_")]
+
+
+@pytest.fixture
+def cross_device(engine):
+    # 强制走跨设备路径：暂存、提交、回收、清理
+    engine._device_lane = lambda group: (1, 2)
+    return engine
+
+
+def test_staged_move_commits_whole_group(app, cross_device, tmp_path):
+    src_dir, dst_dir = str(tmp_path / "src"), str(tmp_path / "dst")
+    os.makedirs(dst_dir)
+    sources = make_model(src_dir, "a")
+    group = move_group(app, sources, dst_dir)
+    run_job(cross_device, [group])
+
+    assert group.ok, group.error
+    digest = hashlib.sha256(b"model data").hexdigest()
+    assert group.sha256 == digest
+    assert not any(os.path.exists(src) for src in sources)
+    assert sorted(os.listdir(dst_dir)) == ["a.json", "a.preview.png", "a.safetensors", "a.sha256"]
+    with open(os.path.join(dst_dir, "a.sha256")) as f:
+        assert f.read() == digest
+    assert cross_device.sha256_cache.lookup(os.path.join(dst_dir, "a.safetensors"), check_sidecar=False) == digest
+    # 回收目录和暂存目录都已清理
+    assert leftovers(src_dir) == [] and leftovers(dst_dir) == []
+    assert (None, os.path.join(dst_dir, "a.sha256")) in group.done
+
+
+def test_staged_move_keeps_source_on_sha256_mismatch(app, cross_device, tmp_path):
+    src_dir, dst_dir = str(tmp_path / "src"), str(tmp_path / "dst")
+    os.makedirs(dst_dir)
+    sources = make_model(src_dir, "a")
+    cross_device.sha256_cache.store(sources[0], "0" * 64)
+    group = move_group(app, sources, dst_dir)
+    run_job(cross_device, [group])
+
+    assert not group.ok
+    assert "SHA256" in group.error
+    assert all(os.path.exists(src) for src in sources)
+    assert os.listdir(dst_dir) == []
+    assert leftovers(src_dir) == []
+
+
+def test_staged_move_rolls_back_on_destination_conflict(app, cross_device, tmp_path, monkeypatch):
+    src_dir, dst_dir = str(tmp_path / "src"), str(tmp_path / "dst")
+    os.makedirs(dst_dir)
+    sources = make_model(src_dir, "a")
+    conflict = os.path.join(dst_dir, "a.json")
+    copy = cross_device._copy
+
+    def copy_then_conflict(src, dst, cancelled, h=None):
+        copy(src, dst, cancelled, h)
+        if src == sources[-1]:
+            with open(conflict, "w") as f:
+                f.write("someone else")  # 复制期间目标处出现了同名文件
+
+    monkeypatch.setattr(cross_device, "_copy", copy_then_conflict)
+    group = move_group(app, sources, dst_dir)
+    run_job(cross_device, [group])
+
+    assert not group.ok
+    assert "目标文件已存在" in group.error
+    assert all(os.path.exists(src) for src in sources)
+    assert os.listdir(dst_dir) == ["a.json"]
+    with open(conflict) as f:
+        assert f.read() == "someone else"
+    assert leftovers(src_dir) == []
+
+
+def test_staged_move_keeps_destination_when_source_cannot_be_restored(app, cross_device, tmp_path, monkeypatch):
+    src_dir, dst_dir = str(tmp_path / "src"), str(tmp_path / "dst")
+    os.makedirs(dst_dir)
+    sources = make_model(src_dir, "a")
+    rename = os.rename
+
+    def flaky_rename(src, dst):
+        if app.FILE_TRASH_DIRNAME in str(src):
+            raise OSError("restore failed")  # 从回收目录还原失败
+        if app.FILE_TRASH_DIRNAME in str(dst) and str(src) == sources[-1]:
+            raise OSError("trash failed")    # 最后一个源文件无法移入回收目录
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", flaky_rename)
+    group = move_group(app, sources, dst_dir)
+    run_job(cross_device, [group])
+    monkeypatch.undo()
+
+    assert not group.ok
+    assert "还原失败" in group.error
+    # 前两个源文件只剩回收目录中的副本，已提交的目标文件必须保留
+    assert sorted(os.listdir(dst_dir)) == ["a.json", "a.preview.png", "a.safetensors", "a.sha256"]
+    trash_root = os.path.join(src_dir, app.FILE_TRASH_DIRNAME)
+    (trash_dir,) = os.listdir(trash_root)
+    assert sorted(os.listdir(os.path.join(trash_root, trash_dir))) == ["a.preview.png", "a.safetensors"]
+    assert os.path.exists(sources[-1])
+
+
+def test_atomic_job_rolls_back_earlier_groups(app, engine, tmp_path):
+    first = str(tmp_path / "a.safetensors")
+    second = str(tmp_path / "b.safetensors")
+    for path in (first, second, str(tmp_path / "taken.safetensors")):
+        with open(path, "w") as f:
+            f.write(path)
+    groups = [
+        app.FileOpGroup("rename", None, [(first, str(tmp_path / "renamed.safetensors"))]),
+        app.FileOpGroup("rename", None, [(second, str(tmp_path / "taken.safetensors"))]),
+    ]
+    run_job(engine, groups, atomic=True)
+
+    assert not any(group.ok for group in groups)
+    assert groups[0].error == "已回滚"
+    assert "目标文件已存在" in groups[1].error
+    assert sorted(os.listdir(tmp_path)) == ["a.safetensors", "b.safetensors", "taken.safetensors"]
+
+
+def test_scheduler_limits_copies_per_device_pair(app, tmp_path):
+    engine = app.FileOperationEngine(max_workers=4, copy_workers=1)
+    engine._device_lane = lambda group: group.data
+    lock = threading.Lock()
+    running, peak = {}, {}
+
+    def fake_run_group(group, cancelled):
+        lane = group.data
+        with lock:
+            running[lane] = running.get(lane, 0) + 1
+            peak[lane] = max(peak.get(lane, 0), running[lane])
+            peak["all"] = max(peak.get("all", 0), sum(running.values()))
+        threading.Event().wait(0.05)
+        with lock:
+            running[lane] -= 1
+        group.ok = True
+
+    engine._run_group = fake_run_group
+    lanes = [(1, 2)] * 3 + [(3, 4)] * 3 + [None] * 3
+    groups = [app.FileOpGroup("move", None, [], lane) for lane in lanes]
+    finished = []
+    engine.group_finished.connect(lambda job_id, group: finished.append(group), Qt.DirectConnection)
+    run_job(engine, groups)
+
+    assert sorted(map(id, finished)) == sorted(map(id, groups))
+    assert peak[(1, 2)] == 1 and peak[(3, 4)] == 1
+    assert peak[None] >= 2  # 同设备改名用剩余线程并行
+    assert peak["all"] <= 4
+
+
+def test_delete_goes_through_trash(app, engine, tmp_path):
+    sources = make_model(str(tmp_path), "a")
+    group = app.FileOpGroup("delete", None, [(src, None) for src in sources])
+    run_job(engine, [group])
+
+    assert group.ok, group.error
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_delete_restores_files_from_trash(app, engine, tmp_path):
+    sources = make_model(str(tmp_path), "a")
+    missing = str(tmp_path / "a.civitai.info")
+    group = app.FileOpGroup("delete", None, [(src, None) for src in sources + [missing]])
+    run_job(engine, [group])
+
+    assert not group.ok
+    assert all(os.path.exists(src) for src in sources)
+    assert leftovers(str(tmp_path)) == []
+
+
+def test_cancel_during_copy_keeps_sources(app, engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "FILE_COPY_CHUNK_SIZE", 1024)
+    engine._device_lane = lambda group: (1, 2)
+    src_dir, dst_dir = str(tmp_path / "src"), str(tmp_path / "dst")
+    os.makedirs(dst_dir)
+    groups = [move_group(app, make_model(src_dir, name, b"x" * 64 * 1024), dst_dir) for name in ("a", "b")]
+    cancelled = run_job(engine, groups, on_progress=lambda job_id, done, total, name: engine.cancel(job_id))
+
+    assert cancelled
+    assert all(not group.ok and "已取消" in group.error for group in groups)
+    assert len(os.listdir(src_dir)) == 6
+    assert os.listdir(dst_dir) == []
@@ -0,0 +1,23 @@
+from PySide6.QtGui import QImage
+
+
+def test_waiting_playback_restarts_when_decoding_finishes_with_cache(app):
+    player = app.GifPlayer(cache=app.GifFrameCache())
+    player.path = "x.gif"
+    player._cache_key = "gif|x.gif"
+    player._decoding = True
+    image = QImage(4, 4, QImage.Format_RGB32)
+    for _ in range(2):
+        player._signals.frame_ready.emit(player._token, image, 50)
+    # 播放追上了解码进度：停在最后一帧等待
+    player._timer.stop()
+    player._index = 1
+    player._next_frame()
+    assert player._waiting
+
+    player._signals.finished.emit(player._token, True)
+    assert player.cache.get("gif|x.gif")
+    assert not player._waiting
+    assert player._index == 0
+    assert player._timer.isActive()
+    player.release()
@@ -0,0 +1,254 @@
+import collections
+import io
+import json
+import pickle
+import struct
+import sys
+import types
+import zipfile
+
+import pytest
+
+
+class FakeStorage:
+    pass
+
+
+class FakeTensor:
+    """按 torch.save 的方式序列化：REDUCE torch._utils._rebuild_tensor_v2(存储引用, 偏移, 形状, ...)"""
+    def __init__(self, *shape):
+        self.shape = shape
+
+    def __reduce_ex__(self, protocol):
+        rebuild = sys.modules["torch._utils"]._rebuild_tensor_v2
+        return rebuild, (FakeStorage(), 0, self.shape, (1,) * len(self.shape), False, collections.OrderedDict())
+
+
+class Exploit:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        import os
+        return os.system, (f"touch {self.marker}",)
+
+
+@pytest.fixture
+def torch_globals(monkeypatch):
+    # 只用于生成测试数据：pickle 保存全局函数时要求能按 模块.名字 找回同一个对象
+    torch = types.ModuleType("torch")
+    utils = types.ModuleType("torch._utils")
+
+    def _rebuild_tensor_v2(*args):
+        raise AssertionError("读取时不应调用")
+    _rebuild_tensor_v2.__module__ = "torch._utils"
+    _rebuild_tensor_v2.__qualname__ = "_rebuild_tensor_v2"
+    utils._rebuild_tensor_v2 = _rebuild_tensor_v2
+    torch._utils = utils
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "torch._utils", utils)
+
+
+def dumps(obj, protocol=2):
+    class Pickler(pickle.Pickler):
+        def persistent_id(self, obj):
+            if isinstance(obj, FakeStorage):
+                return ("storage", "FloatStorage", "0", "cpu", 1)
+            return None
+    buf = io.BytesIO()
+    Pickler(buf, protocol=protocol).dump(obj)
+    return buf.getvalue()
+
+
+def state_dict():
+    return {
+        "model.diffusion_model.input_blocks.0.0.weight": FakeTensor(320, 4, 3, 3),
+        "model.diffusion_model.input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight": FakeTensor(320, 768),
+    }
+
+
+EXPECTED_SHAPES = {
+    "model.diffusion_model.input_blocks.0.0.weight": (320, 4, 3, 3),
+    "model.diffusion_model.input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight": (320, 768),
+}
+
+
+def write_zip_checkpoint(path, data_pkl):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("archive/data.pkl", data_pkl)
+        zf.writestr("archive/data/0", b"\0" * 4)
+
+
+def write_legacy_checkpoint(path, data_pkl):
+    # 旧格式：magic、协议版本、sys_info 三段 pickle，之后是对象本身和张量存储
+    with open(path, "wb") as f:
+        f.write(pickle.dumps(0x1950a86a20f9469cfc6c, protocol=2))
+        f.write(pickle.dumps(1001, protocol=2))
+        f.write(pickle.dumps({"protocol_version": 1001, "little_endian": True}, protocol=2))
+        f.write(data_pkl)
+        f.write(pickle.dumps(["0"], protocol=2))
+        f.write(b"\0" * 16)
+
+
+def test_zip_checkpoint_shapes(app, torch_globals, tmp_path):
+    path = str(tmp_path / "model.ckpt")
+    write_zip_checkpoint(path, dumps({"state_dict": state_dict(), "global_step": 1}))
+    assert app.read_pickle_tensors(path) == EXPECTED_SHAPES
+    assert app.classify_model_file(path)[:2] == ("Checkpoint", "SD1.5")
+
+
+def test_legacy_checkpoint_shapes(app, torch_globals, tmp_path):
+    path = str(tmp_path / "model.pt")
+    write_legacy_checkpoint(path, dumps(state_dict()))
+    assert app.read_pickle_tensors(path) == EXPECTED_SHAPES
+
+
+def test_reduce_payload_is_never_executed(app, torch_globals, tmp_path):
+    marker = tmp_path / "pwned"
+    path = str(tmp_path / "model.ckpt")
+    payload = state_dict()
+    payload["evil"] = Exploit(marker)
+    write_zip_checkpoint(path, dumps(payload))
+    assert app.read_pickle_tensors(path) == EXPECTED_SHAPES
+    assert not marker.exists()
+
+
+def test_inst_payload_is_rejected(app, tmp_path):
+    marker = tmp_path / "pwned"
+    path = str(tmp_path / "model.pt")
+    # 协议 0 的 INST 操作码：导入 os.system 并以 MARK 之后的参数调用
+    write_legacy_checkpoint(path, f"(S'touch {marker}'\nios\nsystem\n.".encode())
+    with pytest.raises(ValueError):
+        app.read_pickle_tensors(path)
+    assert not marker.exists()
+
+
+def test_truncated_stream(app, torch_globals, tmp_path):
+    data_pkl = dumps(state_dict())
+    zip_path = str(tmp_path / "model.ckpt")
+    write_zip_checkpoint(zip_path, data_pkl[:len(data_pkl) // 2])
+    with pytest.raises(ValueError):
+        app.read_pickle_tensors(zip_path)
+    legacy_path = str(tmp_path / "model.pt")
+    with open(legacy_path, "wb") as f:
+        f.write(pickle.dumps(0x1950a86a20f9469cfc6c, protocol=2) + data_pkl[:len(data_pkl) // 2])
+    with pytest.raises(ValueError):
+        app.read_pickle_tensors(legacy_path)
+
+
+def write_safetensors(path, tensors, metadata=None):
+    """只写文件头：{张量名: {dtype, shape, data_offsets}}，不写张量数据"""
+    header = {name: {"dtype": "F16", "shape": list(shape), "data_offsets": [0, 0]} for name, shape in tensors.items()}
+    if metadata:
+        header["__metadata__"] = metadata
+    data = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(data)))
+        f.write(data)
+
+
+UNET_TO_K = "model.diffusion_model.input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight"
+LORA_TO_K = "lora_unet_down_blocks_0_attentions_0_transformer_blocks_0_attn2_to_k.lora_down.weight"
+
+
+@pytest.mark.parametrize("tensors, expected", [
+    ({LORA_TO_K: (4, 768), LORA_TO_K.replace("down", "up"): (320, 4)}, ("LoRA", "SD1.5")),
+    ({LORA_TO_K: (4, 1024)}, ("LoRA", "SD2.0")),
+    ({"lora_te2_text_model_encoder_layers_0_mlp_fc1.lora_down.weight": (4, 1280)}, ("LoRA", "SDXL")),
+    ({"lora_unet_double_blocks_0_img_attn_proj.lora_down.weight": (4, 3072)}, ("LoRA", "FLUX")),
+    ({"emb_params": (2, 768)}, ("TextualInversion", "SD1.5")),
+    ({"string_to_param.*": (2, 1024)}, ("TextualInversion", "SD2.0")),
+    ({"clip_g": (2, 1280), "clip_l": (2, 768)}, ("TextualInversion", "SDXL")),
+    ({"encoder.conv_in.weight": (128, 3, 3, 3), "decoder.conv_in.weight": (512, 4, 3, 3)}, ("VAE", "")),
+    ({"encoder.conv_in.weight": (128, 3, 3, 3), "decoder.conv_in.weight": (512, 16, 3, 3)}, ("VAE", "FLUX")),
+    ({"control_model.input_hint_block.0.weight": (16, 3, 3, 3),
+      "control_model.input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight": (320, 1024)}, ("ControlNet", "SD2.0")),
+    ({"model.diffusion_model.input_blocks.0.0.weight": (320, 4, 3, 3), UNET_TO_K: (320, 768)}, ("Checkpoint", "SD1.5")),
+    ({"model.diffusion_model.input_blocks.0.0.weight": (320, 4, 3, 3), UNET_TO_K: (320, 1024)}, ("Checkpoint", "SD2.0")),
+    ({UNET_TO_K: (640, 2048), "conditioner.embedders.1.model.ln_final.weight": (1280,)}, ("Checkpoint", "SDXL")),
+    ({"double_blocks.0.img_attn.proj.weight": (3072, 3072)}, ("Checkpoint", "FLUX")),
+    ({"some.other.weight": (1,)}, (None, "")),
+])
+def test_classify_safetensors_header(app, tmp_path, tensors, expected):
+    path = str(tmp_path / "model.safetensors")
+    write_safetensors(path, tensors, {"format": "pt"})
+    read, metadata = app.read_safetensors_header(path)
+    assert read == tensors and metadata == {"format": "pt"}
+    assert app.classify_tensors(read, metadata) == expected
+
+
+@pytest.mark.parametrize("length", [0, 1, 100 * 1024 * 1024 + 1, 2 ** 63])
+def test_safetensors_header_length_is_bounded(app, tmp_path, length):
+    path = str(tmp_path / "bad.safetensors")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", length) + b"{}")
+    with pytest.raises(ValueError):
+        app.read_safetensors_header(path)
+
+
+def test_unreadable_header_falls_back_to_filename(app, tmp_path):
+    path = str(tmp_path / "my_lora_v1.safetensors")
+    with open(path, "wb") as f:
+        f.write(b"\x01\x02")
+    assert app.classify_model_file(path)[0] == "LoRA"
+
+
+def gguf_string(text, count_fmt="<Q"):
+    data = text.encode()
+    return struct.pack(count_fmt, len(data)) + data
+
+
+def write_gguf(path, version, metadata, tensors):
+    """metadata 为 [(键, 值类型, 已编码的值)]，tensors 为 [(名字, PyTorch 顺序的形状, ggml 类型)]"""
+    count_fmt = "<I" if version == 1 else "<Q"
+    out = [b"GGUF", struct.pack("<I", version), struct.pack(count_fmt, len(tensors)), struct.pack(count_fmt, len(metadata))]
+    for key, value_type, value in metadata:
+        out += [gguf_string(key, count_fmt), struct.pack("<I", value_type), value]
+    for name, shape, ggml_type in tensors:
+        out += [gguf_string(name, count_fmt), struct.pack("<I", len(shape))]
+        out += [struct.pack(count_fmt, dim) for dim in reversed(shape)]
+        out += [struct.pack("<I", ggml_type), struct.pack("<Q", 0)]
+    with open(path, "wb") as f:
+        f.write(b"".join(out))
+
+
+def test_gguf_v3_with_string_array(app, tmp_path):
+    tokens = ["<s>", "</s>", "hello"]
+    token_array = struct.pack("<IQ", 8, len(tokens)) + b"".join(gguf_string(t) for t in tokens)
+    path = str(tmp_path / "model.gguf")
+    write_gguf(path, 3, [
+        ("general.architecture", 8, gguf_string("flux")),
+        ("tokenizer.ggml.tokens", 9, token_array),
+        ("general.file_type", 4, struct.pack("<I", 8)),
+        ("scores", 9, struct.pack("<IQ", 6, 2) + struct.pack("<2f", 0.5, 1.5)),
+    ], [
+        ("double_blocks.0.img_attn.qkv.weight", (9216, 3072), 8),
+        ("final_layer.linear.bias", (64,), 0),
+    ])
+    metadata, tensors = app.read_gguf_header(path)
+    assert metadata == {"general.architecture": "flux", "tokenizer.ggml.tokens": 3,
+                        "general.file_type": 8, "scores": 2}
+    assert tensors == {"double_blocks.0.img_attn.qkv.weight": ((9216, 3072), 8),
+                       "final_layer.linear.bias": ((64,), 0)}
+    assert app.classify_gguf(metadata, tensors) == ("FLUX", "Q8_0", 9216 * 3072 + 64)
+    assert app.classify_model_file(path) == ("GGUF", "FLUX", "Q8_0", 9216 * 3072 + 64)
+
+
+def test_gguf_v1_uses_32_bit_counts(app, tmp_path):
+    path = str(tmp_path / "model.gguf")
+    write_gguf(path, 1, [
+        ("names", 9, struct.pack("<II", 8, 2) + gguf_string("a", "<I") + gguf_string("bc", "<I")),
+    ], [
+        ("model.diffusion_model.input_blocks.1.1.transformer_blocks.0.attn2.to_k.weight", (320, 768), 12),
+    ])
+    metadata, tensors = app.read_gguf_header(path)
+    assert metadata == {"names": 2}
+    assert app.classify_gguf(metadata, tensors) == ("SD1.5", "Q4_K", 320 * 768)
+
+
+def test_gguf_truncated_header(app, tmp_path):
+    path = str(tmp_path / "model.gguf")
+    with open(path, "wb") as f:
+        f.write(b"GGUF" + struct.pack("<IQQ", 3, 1, 1) + gguf_string("general.architecture"))
+    with pytest.raises(ValueError):
+        app.read_gguf_header(path)
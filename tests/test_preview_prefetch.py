@@ -0,0 +1,78 @@
+import json
+import os
+import struct
+import time
+
+
+# 1x1 单帧 GIF
+TINY_GIF = (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00!\xf9\x04\x00\x00\x00\x00\x00"
+            b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")
+
+
+def pump(qapp, condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        qapp.processEvents()
+        time.sleep(0.01)
+        assert time.time() < deadline, "timeout"
+    qapp.processEvents()
+
+
+def write_model(path, description):
+    header = json.dumps({"__metadata__": {"format": "pt"}}).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+    with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"description": description, "notes": "", "vae": ""}, f)
+
+
+def select(window, rec):
+    table = window.table
+    row = table.proxy.mapFromSource(window.table_model.index(window.table_model.source_row(rec), 0)).row()
+    table.selectRow(row)
+
+
+def test_prefetched_row_without_gif_loads_its_own_notes(gui, qapp, tmp_path):
+    window = gui
+    write_model(str(tmp_path / "a.safetensors"), "notes of a")
+    (tmp_path / "a.gif").write_bytes(TINY_GIF)
+    write_model(str(tmp_path / "b.safetensors"), "notes of b")
+
+    window.model_dir = str(tmp_path)
+    window.scan_models()
+    pump(qapp, lambda: window.scan_btn.isEnabled() and window.table_model.rowCount() == 2)
+    records = {rec.filename: rec for rec in window.table_model.records}
+    a, b = records["a.safetensors"], records["b.safetensors"]
+
+    select(window, a)
+    pump(qapp, lambda: b.base_path in window.preview_cache)
+    assert window.preview_cache[b.base_path]["dynamic"] is None
+
+    select(window, b)
+    assert window.description_input.toPlainText() == "notes of b"
+    assert window.current_json_path == b.base_path + ".json"
+    assert window.dynamic_image_label.preview_paths == []
+
+
+def test_panel_ignores_stale_sha256_sidecar(gui, qapp, tmp_path):
+    window = gui
+    for name in ("fresh", "stale"):
+        write_model(str(tmp_path / f"{name}.safetensors"), "")
+        (tmp_path / f"{name}.sha256").write_text("ab" * 32)
+    sha_mtime = os.stat(tmp_path / "stale.sha256").st_mtime
+    os.utime(tmp_path / "stale.safetensors", (sha_mtime + 10, sha_mtime + 10))
+    os.utime(tmp_path / "fresh.safetensors", (sha_mtime - 10, sha_mtime - 10))
+
+    window.model_dir = str(tmp_path)
+    window.scan_models()
+    pump(qapp, lambda: window.scan_btn.isEnabled() and window.table_model.rowCount() == 2)
+    records = {rec.filename: rec for rec in window.table_model.records}
+    fresh, stale = records["fresh.safetensors"], records["stale.safetensors"]
+
+    select(window, fresh)
+    assert window.sha256_full_box.text() == "ab" * 32
+    pump(qapp, lambda: stale.base_path in window.preview_cache)
+    select(window, stale)
+    assert window.sha256_full_box.text() == ""
+    assert window.sha256_short_box.text() == ""
@@ -0,0 +1,133 @@
+import json
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def write_model(path, description):
+    header = json.dumps({"__metadata__": {"format": "pt"}}).encode()
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+    with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"description": description, "notes": "", "vae": ""}, f)
+
+
+def scan(app, model_dir, catalog):
+    """在当前线程执行一次扫描，返回 ({文件名: 备注文本}, 读取备注 JSON 的次数)"""
+    worker = app.ScanWorker(model_dir, catalog)
+    reads = []
+    original = worker.read_notes_in_names
+    worker.read_notes_in_names = lambda *args: reads.append(args[1]) or original(*args)
+    results = {}
+    worker.batch_ready.connect(lambda batch: results.update((row[1], row[10]) for row in batch))
+    worker.run()
+    return results, len(reads)
+
+
+def test_rescan_reuses_cached_notes(app, tmp_path):
+    for name in ("a", "b", "c"):
+        write_model(str(tmp_path / f"{name}.safetensors"), f"notes of {name}")
+    catalog = app.ModelCatalog(str(tmp_path))
+    try:
+        notes, reads = scan(app, str(tmp_path), catalog)
+        assert reads == 3
+        assert notes["b.safetensors"].startswith("notes of b")
+
+        notes, reads = scan(app, str(tmp_path), catalog)
+        assert reads == 0
+        assert notes["b.safetensors"].startswith("notes of b")
+
+        with open(tmp_path / "b.json", "w", encoding="utf-8") as f:
+            json.dump({"description": "edited notes of b", "notes": "", "vae": ""}, f)
+        notes, reads = scan(app, str(tmp_path), catalog)
+        assert reads == 1
+        assert notes["b.safetensors"].startswith("edited notes of b")
+    finally:
+        catalog.close()
+
+
+def scan_hashes(app, model_dir, catalog):
+    worker = app.ScanWorker(model_dir, catalog)
+    results = {}
+    worker.batch_ready.connect(lambda batch: results.update((row[1], row[6]) for row in batch))
+    worker.run()
+    return results
+
+
+def test_scan_ignores_stale_sha256_sidecars(app, tmp_path):
+    write_model(str(tmp_path / "fresh.safetensors"), "")
+    write_model(str(tmp_path / "stale.safetensors"), "")
+    for name in ("fresh", "stale"):
+        (tmp_path / f"{name}.sha256").write_text("ab" * 32)
+    # stale 的模型文件在写入 .sha256 之后被修改过
+    sha_mtime = os.stat(tmp_path / "stale.sha256").st_mtime
+    os.utime(tmp_path / "stale.safetensors", (sha_mtime + 10, sha_mtime + 10))
+    os.utime(tmp_path / "fresh.safetensors", (sha_mtime - 10, sha_mtime - 10))
+    catalog = app.ModelCatalog(str(tmp_path))
+    try:
+        hashes = scan_hashes(app, str(tmp_path), catalog)
+        assert hashes == {"fresh.safetensors": "ab" * 32, "stale.safetensors": ""}
+        # 重新扫描（索引中记录未变）结果一致
+        assert scan_hashes(app, str(tmp_path), catalog) == hashes
+    finally:
+        catalog.close()
+
+
+def test_hash_entry_survives_stat_without_inode(app, tmp_path):
+    # Windows 上扫描用的 DirEntry.stat() 没有 inode，不能因此判定缓存失效
+    model = tmp_path / "a.safetensors"
+    write_model(str(model), "")
+    catalog = app.ModelCatalog(str(tmp_path))
+    try:
+        cache = app.Sha256Cache(catalog)
+        cache.store(str(model), "cd" * 32)
+        writes = []
+        catalog.upsert_hash = lambda *args: writes.append(args)
+        st = os.stat(model)
+        dir_entry_st = os.stat_result((st.st_mode, 0, st.st_dev, st.st_nlink, st.st_uid, st.st_gid,
+                                       st.st_size, int(st.st_atime), int(st.st_mtime), int(st.st_ctime),
+                                       st.st_atime, st.st_mtime, st.st_ctime,
+                                       st.st_atime_ns, st.st_mtime_ns, st.st_ctime_ns))
+        assert dir_entry_st.st_ino == 0 and dir_entry_st.st_mtime_ns == st.st_mtime_ns
+        assert cache.lookup(str(model), dir_entry_st, check_sidecar=False) == "cd" * 32
+        assert cache.lookup(str(model)) == "cd" * 32
+        assert writes == []
+    finally:
+        catalog.close()
+
+
+def run_scan(scanner, timeout=10):
+    """在线程中消费 scan()，返回 (是否按时结束, 扫描到的文件名)"""
+    names = []
+    thread = threading.Thread(target=lambda: names.extend(row[1] for batch in scanner.scan() for row in batch),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive(), names
+
+
+class ExplodingExts(set):
+    def __contains__(self, ext):
+        raise RuntimeError("boom")
+
+
+def test_dir_scanner_finishes_when_a_directory_fails(app, tmp_path):
+    (tmp_path / "sub").mkdir()
+    write_model(str(tmp_path / "sub" / "a.safetensors"), "")
+    scanner = app.ParallelDirScanner(str(tmp_path), [".safetensors"])
+    scanner.sidecar_exts = ExplodingExts()  # 扫描 .json 时抛出非 OSError 异常
+    finished, _ = run_scan(scanner)
+    assert finished
+
+
+def test_dir_scanner_does_not_submit_after_shutdown(app, tmp_path):
+    scanner = app.ParallelDirScanner(str(tmp_path), [".safetensors"])
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    scanner._submit(executor, str(tmp_path))
+    assert scanner._pending == 0
+    scanner.cancel()
+    scanner._submit(executor, str(tmp_path))
+    assert scanner._pending == 0
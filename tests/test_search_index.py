@@ -0,0 +1,25 @@
+def visible_names(view):
+    proxy = view.proxy
+    return [view.record_at(proxy.index(row, 0)).filename for row in range(proxy.rowCount())]
+
+
+def test_record_changed_keeps_search_index_current(app):
+    view = app.ModelTableView()
+    renamed = app.ModelRecord("old_name.safetensors", "/models", 1, "1B", "LoRA", "SD1.5")
+    other = app.ModelRecord("other.safetensors", "/models", 1, "1B", "LoRA", "SD1.5")
+    view.model_data.append_records([renamed, other])
+
+    view.proxy.set_filter_text("new_name")
+    assert visible_names(view) == []
+
+    renamed.filename = "new_name.safetensors"
+    view.model_data.record_changed(renamed)
+    assert visible_names(view) == ["new_name.safetensors"]
+
+    view.proxy.set_filter_text("old_name")
+    assert visible_names(view) == []
+
+    other.sha256 = "ab" * 32
+    view.model_data.record_changed(other)
+    view.proxy.set_filter_text("abab")
+    assert visible_names(view) == ["other.safetensors"]
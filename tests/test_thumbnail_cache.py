@@ -0,0 +1,45 @@
+def test_gif_frames_do_not_evict_thumbnails(app, tmp_path):
+    thumbs = app.ThumbnailDiskCache(str(tmp_path), budget=1000)
+    gifs = app.ThumbnailDiskCache(str(tmp_path), budget=1000, table="gif_frames")
+    try:
+        for i in range(5):
+            thumbs.put(f"thumb{i}", b"t" * 100)
+        gifs.put("gif|a", b"g" * 900)
+        gifs.put("gif|b", b"g" * 900)
+        assert all(thumbs.get(f"thumb{i}") for i in range(5))
+        assert gifs.get("gif|b") and gifs.get("gif|a") is None
+        assert thumbs.get("gif|b") is None
+    finally:
+        thumbs.close()
+        gifs.close()
+
+
+def test_hits_update_last_used_in_batches(app, tmp_path):
+    cache = app.ThumbnailDiskCache(str(tmp_path), budget=10_000)
+    for i in range(3):
+        cache.put(f"thumb{i}", b"t" * 10)
+    commits = cache.conn.total_changes
+    for _ in range(10):
+        assert cache.get("thumb0")
+    assert cache.conn.total_changes == commits  # 命中不再逐条写库
+    cache.close()
+
+    reopened = app.ThumbnailDiskCache(str(tmp_path), budget=10_000)
+    try:
+        order = [key for key, in reopened.conn.execute("SELECT key FROM thumbs ORDER BY last_used")]
+        assert order[-1] == "thumb0"  # 关闭时写回了最近使用时间
+    finally:
+        reopened.close()
+
+
+def test_eviction_uses_pending_hits(app, tmp_path):
+    cache = app.ThumbnailDiskCache(str(tmp_path), budget=300)
+    try:
+        for i in range(3):
+            cache.put(f"thumb{i}", b"t" * 100)
+        cache.get("thumb0")
+        cache.put("thumb3", b"t" * 100)
+        assert cache.get("thumb0") is not None
+        assert cache.get("thumb1") is None
+    finally:
+        cache.close()